@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of string_to_timestamp against the previous strptime implementation.
+
+    python benchmarks/bench_timestamp.py [--count 100000] [--repeat 5]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta  # noqa: E402
+from venmo_api import string_to_timestamp  # noqa: E402
+import argparse  # noqa: E402
+import random  # noqa: E402
+import timeit  # noqa: E402
+
+
+def strptime_to_timestamp(utc):
+    """
+    The previous implementation, kept as the baseline
+    """
+    if not utc:
+        return
+    try:
+        _date = datetime.strptime(utc, '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        _date = datetime.strptime(utc, '%Y-%m-%dT%H:%M:%S.%f')
+    return int(_date.timestamp())
+
+
+def make_dates(count, seed=0):
+    """
+    Dates spread over one year, a third of them with microseconds (like the comments)
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    dates = []
+    for _ in range(count):
+        date = start + timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        utc = date.strftime('%Y-%m-%dT%H:%M:%S')
+        if rng.random() < 1 / 3:
+            utc += f".{rng.randint(0, 999999):06d}"
+        dates.append(utc)
+    return dates
+
+
+def bench(function, dates, repeat):
+    return min(timeit.repeat(lambda: [function(utc) for utc in dates], number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    dates = make_dates(args.count)
+    assert [string_to_timestamp(utc) for utc in dates] == [strptime_to_timestamp(utc) for utc in dates]
+
+    baseline = bench(strptime_to_timestamp, dates, args.repeat)
+    fast = bench(string_to_timestamp, dates, args.repeat)
+
+    print(f"{args.count} dates, best of {args.repeat}")
+    print(f"strptime:            {baseline:.3f}s ({baseline / args.count * 1e6:.2f} us/date)")
+    print(f"string_to_timestamp: {fast:.3f}s ({fast / args.count * 1e6:.2f} us/date)")
+    print(f"speedup:             {baseline / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
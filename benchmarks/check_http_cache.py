@@ -0,0 +1,87 @@
+"""
+Checks that a write drops the cached GETs of its path, whatever their params, against the local mock server
+(benchmarks/mock_server.py): GET /payments?limit=5, then POST /payments, then the same GET must miss the cache.
+For ApiClient and AsyncApiClient, with the memory and the disk backends. Exit code 1 on failure.
+
+    python benchmarks/check_http_cache.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockVenmoServer  # noqa: E402
+from venmo_api import ApiClient, AsyncApiClient, HttpCache, MemoryCacheBackend, DiskCacheBackend  # noqa: E402
+import asyncio  # noqa: E402
+import tempfile  # noqa: E402
+
+
+def check(name, server, calls, failures):
+    """
+    :param calls: <function> calls(method, params) making one request
+    """
+    before = server.requests
+    calls('GET', {'limit': 5})
+    calls('GET', {'limit': 5})
+    if server.requests - before != 1:
+        failures.append(f"{name}: the second GET was not served from the cache")
+
+    calls('POST', None)
+    before = server.requests
+    calls('GET', {'limit': 5})
+    if server.requests - before != 1:
+        failures.append(f"{name}: the GET with params was served from the cache after a POST")
+
+
+def run_sync(server, http_cache):
+    api_client = ApiClient(access_token="Bearer cache-check", http_cache=http_cache)
+    api_client.configuration['host'] = server.url
+
+    def call(method, params):
+        api_client.call_api(resource_path='/payments', method=method, params=params,
+                            body={"user_id": "1", "amount": 1, "note": "cache"} if method == 'POST' else None)
+
+    return call, api_client.shutdown
+
+
+def main():
+    failures = []
+    with MockVenmoServer() as server, tempfile.TemporaryDirectory() as directory:
+        for backend_name, backend in (("memory", MemoryCacheBackend()), ("disk", DiskCacheBackend(directory))):
+            call, close = run_sync(server, HttpCache(backend=backend, default_ttl=60))
+            check(f"ApiClient/{backend_name}", server, call, failures)
+            close()
+            backend.clear()
+
+        async def run_async():
+            async_api_client = AsyncApiClient(access_token="Bearer cache-check",
+                                              http_cache=HttpCache(default_ttl=60))
+            async_api_client.configuration['host'] = server.url
+            async with async_api_client:
+                async def call(method, params):
+                    await async_api_client.call_api(
+                        resource_path='/payments', method=method, params=params,
+                        body={"user_id": "1", "amount": 1, "note": "cache"} if method == 'POST' else None)
+
+                before = server.requests
+                await call('GET', {'limit': 5})
+                await call('GET', {'limit': 5})
+                if server.requests - before != 1:
+                    failures.append("AsyncApiClient: the second GET was not served from the cache")
+                await call('POST', None)
+                before = server.requests
+                await call('GET', {'limit': 5})
+                if server.requests - before != 1:
+                    failures.append("AsyncApiClient: the GET with params was served from the cache after a POST")
+
+        asyncio.run(run_async())
+
+    for failure in failures:
+        print(f"FAILURE {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == '__main__':
+    main()
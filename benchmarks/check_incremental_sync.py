@@ -0,0 +1,101 @@
+"""
+Checks that an incremental sync bounded by max_pages never skips a story, against the local mock server
+(benchmarks/mock_server.py): runs of one page each, with new stories showing up between the runs, must return every
+story exactly once, for UserApi and AsyncUserApi. Exit code 1 on failure.
+
+    python benchmarks/check_incremental_sync.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockVenmoServer, generate_payloads  # noqa: E402
+from venmo_api import ApiClient, AsyncApiClient, UserApi, AsyncUserApi, MemoryStateStore  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+
+NUM_STORIES = 45
+NUM_NEW_STORIES = 12
+
+
+class GrowingHistoryServer(MockVenmoServer):
+    """
+    Serves only the [visible] oldest stories, newest first, paged by before_id
+    """
+
+    def __init__(self):
+        super().__init__(payloads=generate_payloads(num_users=10, num_stories=NUM_STORIES, num_payments=1))
+        self.visible = NUM_STORIES - NUM_NEW_STORIES
+
+    def handle(self, method: str, path: str, query: dict, body: dict, authorization: str = None):
+        if not path.startswith('/stories/'):
+            return super().handle(method, path, query, body, authorization=authorization)
+
+        stories = self.payloads['stories'][NUM_STORIES - self.visible:]
+        ids = [story['id'] for story in stories]
+        start = ids.index(query['before_id']) + 1 if query.get('before_id') in ids else 0
+        limit = int(query.get('limit', 50))
+        return 200, json.dumps({"data": stories[start:start + limit]}).encode('utf-8')
+
+
+def check(name, server, sync, failures):
+    """
+    :param sync: <function> sync(state_store) running one sync of one page of 10 stories, returning the story ids
+    """
+    state_store = MemoryStateStore()
+    synced = []
+    for run in range(12):
+        if run == 2:
+            server.visible = NUM_STORIES
+        synced.extend(sync(state_store))
+
+    expected = [story['id'] for story in server.payloads['stories']]
+    if sorted(synced) != sorted(expected):
+        missing = len(set(expected) - set(synced))
+        failures.append(f"{name}: {len(synced)} stories synced for {len(expected)}, {missing} missing")
+    if state_store.get('user:1') != expected[0]:
+        failures.append(f"{name}: the high-water mark is {state_store.get('user:1')}, expected {expected[0]}")
+    server.visible = NUM_STORIES - NUM_NEW_STORIES
+
+
+def main():
+    failures = []
+    with GrowingHistoryServer() as server:
+        api_client = ApiClient(access_token="Bearer sync-check")
+        api_client.configuration['host'] = server.url
+        user_api = UserApi(api_client)
+
+        def sync(state_store):
+            page = user_api.sync_user_transactions(state_store, user_id='1', limit=10, max_pages=1)
+            return [transaction.id for transaction in page]
+
+        check("UserApi", server, sync, failures)
+        api_client.shutdown()
+
+        async def run_async():
+            async_api_client = AsyncApiClient(access_token="Bearer sync-check")
+            async_api_client.configuration['host'] = server.url
+            async with async_api_client:
+                async_user_api = AsyncUserApi(async_api_client)
+                loop = asyncio.get_running_loop()
+
+                def async_sync(state_store):
+                    # check() runs in a worker thread, each sync runs on the event loop
+                    page = asyncio.run_coroutine_threadsafe(async_user_api.sync_user_transactions(
+                        state_store, user_id='1', limit=10, max_pages=1), loop).result()
+                    return [transaction.id for transaction in page]
+
+                await loop.run_in_executor(None, check, "AsyncUserApi", server, async_sync, failures)
+
+        asyncio.run(run_async())
+
+    for failure in failures:
+        print(f"FAILURE {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Checks that PayoutBatch never pays twice, against the local mock server (benchmarks/mock_server.py).
+Venmo answers 500 to POST /payments after the payment was made. The payouts must be UNKNOWN, and a resumed run
+with retry_failed=True must not send them again. Payouts rejected with a 4xx are FAILED and are sent again.
+A refused connection is FAILED, a connection dropped after the request was sent is UNKNOWN. After a payment fails
+on a default funding source that changed, the next payouts of the batch use the new default.
+Exit code 1 on failure.
+
+    python benchmarks/check_payout_resume.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockVenmoServer  # noqa: E402
+from venmo_api import ApiClient, PaymentApi, PayoutBatch, Payout, PayoutStatus, RetryPolicy, User  # noqa: E402
+import socket  # noqa: E402
+import tempfile  # noqa: E402
+
+
+class FlakyPaymentServer(MockVenmoServer):
+    """
+    Makes the payments, then answers 500 (or 403 for the notes starting with 'reject', without paying them).
+    The notes starting with 'drop' are paid, then the connection is dropped without an answer.
+    The notes starting with 'switch' are paid and answered normally, unless they use a funding source that is not
+    the default one: then they fail with a payment error. The first one switches the default funding source before.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.payments_made = []
+        self.funding_sources_used = []
+
+    def handle(self, method: str, path: str, query: dict, body: dict, authorization: str = None):
+        status_code, content = super().handle(method, path, query, body, authorization=authorization)
+        if method == 'POST' and path == '/payments':
+            note = body.get('note', '')
+            if note.startswith('reject'):
+                return 403, b'{"error": {"code": 403, "message": "Forbidden."}}'
+            if note.startswith('switch'):
+                return self.__pay_with_switched_funding_source(body, status_code, content)
+            self.payments_made.append(note)
+            if note.startswith('drop'):
+                return 500, None
+            return 500, b'{"error": {"code": 500, "message": "Internal error."}}'
+        return status_code, content
+
+    def __pay_with_switched_funding_source(self, body: dict, status_code: int, content: bytes):
+        payment_methods = self.payloads['payment_methods']
+        self.funding_sources_used.append(body.get('funding_source_id'))
+        if len(self.funding_sources_used) == 1:
+            for method in payment_methods:
+                method['peer_payment_role'] = 'backup' if method['peer_payment_role'] == 'default' else 'default'
+
+        default_id = next(method['id'] for method in payment_methods if method['peer_payment_role'] == 'default')
+        if body.get('funding_source_id') == default_id:
+            self.payments_made.append(body.get('note'))
+            return status_code, content
+        return 200, b'{"data": {"error_code": 1396, "title": "Bank error", "error_msg": "Declined."}}'
+
+
+def main():
+    failures = []
+    with FlakyPaymentServer() as server, tempfile.TemporaryDirectory() as directory:
+        api_client = ApiClient(access_token="Bearer payout-check")
+        api_client.configuration['host'] = server.url
+        profile = User.from_json(server.payloads['users'][0])
+        payment_api = PaymentApi(profile=profile, api_client=api_client, payment_methods_ttl=0)
+
+        target_user_id = server.payloads['users'][1]['id']
+        payouts = [Payout(amount=1, note=f"payout {i}", target_user_id=target_user_id) for i in range(3)]
+        payouts.append(Payout(amount=1, note="rejected", target_user_id=target_user_id))
+        checkpoint_path = os.path.join(directory, "checkpoint.jsonl")
+
+        results = PayoutBatch(payment_api, checkpoint_path=checkpoint_path).run(payouts)
+        statuses = [result.status for result in results]
+        if statuses != [PayoutStatus.UNKNOWN] * 3 + [PayoutStatus.FAILED]:
+            failures.append(f"first run: {statuses}, expected 3 UNKNOWN and 1 FAILED")
+
+        results = PayoutBatch(payment_api, checkpoint_path=checkpoint_path, retry_failed=True).run(payouts)
+        statuses = [(result.status, result.resumed) for result in results]
+        if statuses != [(PayoutStatus.UNKNOWN, True)] * 3 + [(PayoutStatus.FAILED, False)]:
+            failures.append(f"resumed run: {statuses}, expected 3 resumed UNKNOWN and 1 sent again")
+
+        if len(server.payments_made) != 3:
+            failures.append(f"{len(server.payments_made)} payments made for 3 payouts: {server.payments_made}")
+
+        # A connection dropped after the payment was sent: UNKNOWN
+        results = PayoutBatch(payment_api).run([Payout(amount=1, note="drop", target_user_id=target_user_id)])
+        if results[0].status is not PayoutStatus.UNKNOWN:
+            failures.append(f"dropped connection: {results[0].status}, expected UNKNOWN")
+
+        # The default funding source changes during the batch: only the first payout fails
+        payment_api = PaymentApi(profile=profile, api_client=api_client)
+        payouts = [Payout(amount=1, note=f"switch {i}", target_user_id=target_user_id) for i in range(3)]
+        results = PayoutBatch(payment_api, max_workers=1).run(payouts)
+        statuses = [result.status for result in results]
+        if statuses != [PayoutStatus.PAYMENT_ERROR] + [PayoutStatus.SUCCEEDED] * 2:
+            failures.append(f"changed funding source: {statuses}, expected 1 PAYMENT_ERROR then 2 SUCCEEDED "
+                            f"(funding sources used: {server.funding_sources_used})")
+        api_client.shutdown()
+
+    # A refused connection, nothing was sent: FAILED
+    with socket.socket() as closed_socket:
+        closed_socket.bind(('127.0.0.1', 0))
+        closed_port = closed_socket.getsockname()[1]
+    api_client = ApiClient(access_token="Bearer payout-check", retry_policy=RetryPolicy(max_retries=0))
+    api_client.configuration['host'] = f"http://127.0.0.1:{closed_port}"
+    payment_api = PaymentApi(profile=profile, api_client=api_client)
+    payout = Payout(amount=1, note="refused", target_user_id=target_user_id, funding_source_id="1")
+    results = PayoutBatch(payment_api).run([payout])
+    if results[0].status is not PayoutStatus.FAILED:
+        failures.append(f"refused connection: {results[0].status}, expected FAILED ({results[0].error!r})")
+    api_client.shutdown()
+
+    print({"payments_made": len(server.payments_made)})
+    for failure in failures:
+        print(f"FAILURE {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Local stand-in for the Venmo API, for the benchmarks. It replays /stories, /users, /payments and /payment-methods
+payloads with a configurable latency. The payloads are generated (deterministic, anonymized) unless a directory of
+recorded ones is given: stories.json, users.json, payments.json and payment_methods.json, each a JSON list of the
+objects found in the 'data' of the matching responses.
+
+    python benchmarks/mock_server.py [--port 8080] [--latency-ms 20] [--payloads DIR]
+    python benchmarks/mock_server.py --dump DIR    # write the generated payloads, as a template for recordings
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+
+PAYLOAD_NAMES = ('stories', 'users', 'payments', 'payment_methods')
+
+
+def generate_payloads(num_users: int = 500, num_stories: int = 2000, num_payments: int = 200, seed: int = 0):
+    """
+    Payloads shaped like the Venmo responses
+    :return: <dict> {'stories': [...], 'users': [...], 'payments': [...], 'payment_methods': [...]}
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+
+    def date(seconds, microseconds=False):
+        value = (start + timedelta(seconds=seconds)).strftime('%Y-%m-%dT%H:%M:%S')
+        return value + f".{rng.randint(0, 999999):06d}" if microseconds else value
+
+    users = [{"id": str(2000000000000000000 + i),
+              "username": f"user-{i}",
+              "first_name": f"First{i}",
+              "last_name": f"Last{i}",
+              "display_name": f"First{i} Last{i}",
+              "phone": None,
+              "profile_picture_url": f"https://pics.example.com/{i}.jpg",
+              "about": "No bio",
+              "date_joined": date(rng.randint(0, 10 ** 7)),
+              "is_group": False,
+              "is_active": True,
+              "friends_count": rng.randint(0, 500),
+              "identity_type": "personal"} for i in range(num_users)]
+
+    def payment(payment_id, seconds):
+        actor, target = rng.sample(users, 2)
+        return {"id": str(payment_id),
+                "status": rng.choice(("settled", "settled", "settled", "pending", "cancelled")),
+                "action": rng.choice(("pay", "charge")),
+                "amount": round(rng.uniform(1, 200), 2),
+                "note": rng.choice(("🍕", "rent", "thanks!", "dinner", "tickets")),
+                "audience": rng.choice(("private", "friends", "public")),
+                "date_created": date(seconds),
+                "date_reminded": None,
+                "date_completed": date(seconds + 60),
+                "actor": actor,
+                "target": {"type": "user", "user": target, "phone": None, "email": None}}
+
+    stories = []
+    for i in range(num_stories):
+        seconds = (num_stories - i) * 3600
+        story_payment = payment(4000000000000000000 - i, seconds)
+        comments = [{"id": str(rng.getrandbits(60)),
+                     "message": "👍",
+                     "date_created": date(seconds + 120, microseconds=True),
+                     "user": rng.choice(users),
+                     "mentions": {"data": [], "count": 0}}
+                    for _ in range(rng.choice((0, 0, 0, 1, 2)))]
+        stories.append({"id": str(3000000000000000000 - i),
+                        "type": "payment",
+                        "date_created": date(seconds),
+                        "date_updated": date(seconds + 60),
+                        "audience": story_payment['audience'],
+                        "note": story_payment['note'],
+                        "app": {"id": 1, "name": "Venmo for iPhone"},
+                        "likes": {"count": 0, "data": []},
+                        "comments": {"count": len(comments), "data": comments},
+                        "payment": story_payment})
+
+    payments = [payment(5000000000000000000 - i, i * 3600) for i in range(num_payments)]
+    payment_methods = [{"id": "1000000000000000001", "peer_payment_role": "default", "name": "Venmo balance",
+                        "type": "balance"},
+                       {"id": "1000000000000000002", "peer_payment_role": "backup", "name": "Checking",
+                        "type": "bank"}]
+
+    return {"stories": stories, "users": users, "payments": payments, "payment_methods": payment_methods}
+
+
+def load_payloads(directory: str):
+    payloads = generate_payloads()
+    for name in PAYLOAD_NAMES:
+        path = os.path.join(directory, name + '.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as payload_file:
+                payloads[name] = json.load(payload_file)
+    return payloads
+
+
+def dump_payloads(payloads, directory: str):
+    os.makedirs(directory, exist_ok=True)
+    for name in PAYLOAD_NAMES:
+        with open(os.path.join(directory, name + '.json'), 'w', encoding='utf-8') as payload_file:
+            json.dump(payloads[name], payload_file, ensure_ascii=False, indent=1)
+
+
+class MockVenmoServer(object):
+    """
+    Threaded HTTP server replaying the payloads. Use it as a context manager, or start() and stop().
+    """
+
+    def __init__(self, payloads=None, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param payloads: <dict> [optional] Defaults to generate_payloads().
+        :param latency: <float> Seconds every response is delayed by.
+        """
+        super().__init__()
+        self.payloads = payloads or generate_payloads()
+        self.latency = latency
+        self.requests = 0
+        # Authorization header -> number of requests sent with it
+        self.authorizations = Counter()
+
+        self.__lock = threading.Lock()
+        self.__users_by_id = {user['id']: user for user in self.payloads['users']}
+        self.__story_index = {story['id']: i for i, story in enumerate(self.payloads['stories'])}
+        self.__encoded_users = {user_id: self.__encode({"data": user}) for user_id, user in self.__users_by_id.items()}
+        self.__server = ThreadingHTTPServer((host, port), self.__build_handler())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def serve_forever(self):
+        self.__server.serve_forever()
+
+    def handle(self, method: str, path: str, query: dict, body: dict, authorization: str = None):
+        """
+        :return: <tuple> (status code, encoded JSON body). A body of None drops the connection without answering.
+        """
+        with self.__lock:
+            self.requests += 1
+            self.authorizations[authorization] += 1
+
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', 50))
+        payloads = self.payloads
+
+        if method == 'POST' and path == '/payments':
+            target = self.__users_by_id.get(str(body.get('user_id'))) or payloads['users'][0]
+            created = dict(payloads['payments'][0], id=str(random.getrandbits(62)), amount=abs(body.get('amount', 0)),
+                           note=body.get('note'), target={"type": "user", "user": target})
+            return 200, self.__encode({"data": created})
+
+        if path.startswith('/stories/'):
+            stories = payloads['stories']
+            start = self.__story_index.get(query.get('before_id'), -1) + 1
+            return 200, self.__encode({"data": stories[start:start + limit]})
+
+        match = re.match(r'^/users/([^/]+)(/friends)?$', path)
+        if match:
+            if match.group(2):
+                users = payloads['users']
+                return 200, self.__encode({"data": users[offset:offset + limit]})
+            encoded_user = self.__encoded_users.get(match.group(1))
+            if encoded_user is None:
+                return 400, self.__encode({"error": {"code": 283, "message": "Resource not found."}})
+            return 200, encoded_user
+
+        if path == '/users':
+            users = [user for user in payloads['users'] if query.get('query', '').lower() in user['username']]
+            return 200, self.__encode({"data": users[offset:offset + limit]})
+
+        if path == '/account':
+            return 200, self.__encode({"data": {"user": payloads['users'][0]}})
+
+        if path == '/payments':
+            return 200, self.__encode({"data": payloads['payments'][:limit]})
+
+        if path == '/payment-methods':
+            return 200, self.__encode({"data": payloads['payment_methods']})
+
+        return 404, self.__encode({"error": {"code": 404, "message": "Not found."}})
+
+    @staticmethod
+    def __encode(payload) -> bytes:
+        return json.dumps(payload).encode('utf-8')
+
+    def __build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # The headers and the body are written separately, Nagle would hold the body back ~40ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.__reply('GET')
+
+            def do_POST(self):
+                self.__reply('POST')
+
+            def do_PUT(self):
+                self.__reply('PUT')
+
+            def __reply(self, method):
+                url = urlparse(self.path)
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status_code, content = server.handle(method, url.path, query, body,
+                                                     authorization=self.headers.get('Authorization'))
+                if content is None:
+                    self.close_connection = True
+                    return
+
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--payloads', help="directory of recorded payloads")
+    parser.add_argument('--dump', help="write the generated payloads to this directory and exit")
+    args = parser.parse_args()
+
+    if args.dump:
+        dump_payloads(generate_payloads(), args.dump)
+        return
+
+    payloads = load_payloads(args.payloads) if args.payloads else None
+    server = MockVenmoServer(payloads=payloads, latency=args.latency_ms / 1000, port=args.port)
+    print(f"Serving on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
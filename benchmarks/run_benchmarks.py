@@ -0,0 +1,332 @@
+"""
+Throughput, latency, JSON decoding and deserialization cost and peak memory of UserApi, PaymentApi and Page
+pagination, measured against the local mock server (benchmarks/mock_server.py). The results are written as JSON;
+compare them with a previous run to catch regressions (exit code 1 on regression).
+
+    python benchmarks/run_benchmarks.py [--latency-ms 0] [--requests 200] [--output results.json]
+    python benchmarks/run_benchmarks.py --baseline results.json [--tolerance 0.15]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockVenmoServer, generate_payloads, load_payloads  # noqa: E402
+from venmo_api import (ApiClient, UserApi, PaymentApi, User, Transaction, Payment, JsonDecoder,  # noqa: E402
+                       TypedDecoder, deserialize, iter_pages)
+import argparse  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+
+# Whether a metric is better when higher (True) or lower (False), for the regression check
+METRICS = {"requests_per_sec": True,
+           "latency_p50_ms": False,
+           "latency_p99_ms": False,
+           "us_per_record": False,
+           "mb_per_sec": True,
+           "speedup": True,
+           "peak_memory_kb": False}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Benchmarks(object):
+
+    def __init__(self, server: MockVenmoServer, num_requests: int):
+        super().__init__()
+        self.server = server
+        self.num_requests = num_requests
+        self.payloads = server.payloads
+        self.user_ids = [user['id'] for user in self.payloads['users']]
+
+    def new_apis(self):
+        api_client = ApiClient(access_token="Bearer benchmark")
+        api_client.configuration['host'] = self.server.url
+        profile = User.from_json(self.payloads['users'][0])
+        return (api_client, UserApi(api_client),
+                PaymentApi(profile=profile, api_client=api_client, payment_methods_ttl=0))
+
+    def scenarios(self):
+        """
+        :return: <dict> name -> function(user_api, payment_api) returning the latencies (one per call, in seconds)
+        """
+        n = self.num_requests
+        user_ids = self.user_ids
+
+        def timed(calls):
+            latencies = []
+            for call in calls:
+                start = time.perf_counter()
+                call()
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        def get_user(user_api, payment_api):
+            return timed(lambda user_id=user_ids[i % len(user_ids)]: user_api.get_user(user_id) for i in range(n))
+
+        def get_user_threaded(user_api, payment_api):
+            # Callbacks run on the client's worker pool; the latency goes from the submission to the callback
+            latencies = []
+
+            def callback(user, start):
+                latencies.append(time.perf_counter() - start)
+
+            futures = [user_api.get_user(user_ids[i % len(user_ids)],
+                                         callback=lambda user, start=time.perf_counter(): callback(user, start))
+                       for i in range(n)]
+            for future in futures:
+                future.result()
+            return latencies
+
+        def search_for_users(user_api, payment_api):
+            return timed(lambda i=i: user_api.search_for_users(query=f"user-{i % 50}") for i in range(n))
+
+        def get_user_friends_list(user_api, payment_api):
+            return timed(lambda: user_api.get_user_friends_list(user_id=user_ids[0], limit=50) for _ in range(n))
+
+        def get_user_friends_list_large(user_api, payment_api):
+            return timed(lambda: user_api.get_user_friends_list(user_id=user_ids[0], limit=500)
+                         for _ in range(max(n // 10, 1)))
+
+        def get_user_transactions_large(user_api, payment_api):
+            return timed(lambda: user_api.get_user_transactions(user_id=user_ids[0], limit=500)
+                         for _ in range(max(n // 10, 1)))
+
+        def page_transactions(user_api, payment_api):
+            latencies = []
+            start = time.perf_counter()
+            page = user_api.get_user_transactions(user_id=user_ids[0], limit=50)
+            while page:
+                latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                page = page.get_next_page()
+            return latencies
+
+        def iter_transactions_prefetch(user_api, payment_api):
+            latencies = []
+            start = time.perf_counter()
+            first_page = user_api.get_user_transactions(user_id=user_ids[0], limit=50)
+            for _ in iter_pages(first_page, prefetch=2):
+                latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+            return latencies
+
+        def get_payment_methods(user_api, payment_api):
+            return timed(lambda: payment_api.get_payment_methods(force_update=True) for _ in range(n))
+
+        def get_charge_payments(user_api, payment_api):
+            return timed(lambda: payment_api.get_charge_payments(limit=50) for _ in range(n))
+
+        def send_money(user_api, payment_api):
+            return timed(lambda: payment_api.send_money(1.0, "benchmark", target_user_id=user_ids[1],
+                                                        funding_source_id="1000000000000000001")
+                         for _ in range(n))
+
+        return {"user_api.get_user": get_user,
+                "user_api.get_user.threaded": get_user_threaded,
+                "user_api.search_for_users": search_for_users,
+                "user_api.get_user_friends_list": get_user_friends_list,
+                "user_api.get_user_friends_list.large": get_user_friends_list_large,
+                "user_api.get_user_transactions.large": get_user_transactions_large,
+                "page.get_next_page.transactions": page_transactions,
+                "page.iter_user_transactions.prefetch": iter_transactions_prefetch,
+                "payment_api.get_payment_methods": get_payment_methods,
+                "payment_api.get_charge_payments": get_charge_payments,
+                "payment_api.send_money": send_money}
+
+    def run_scenario(self, scenario, measure_memory: bool):
+        api_client, user_api, payment_api = self.new_apis()
+        requests_before = self.server.requests
+        start = time.perf_counter()
+        latencies = scenario(user_api, payment_api)
+        elapsed = time.perf_counter() - start
+        num_requests = self.server.requests - requests_before
+        api_client.shutdown()
+
+        result = {"requests": num_requests,
+                  "seconds": round(elapsed, 4),
+                  "requests_per_sec": round(num_requests / elapsed, 1),
+                  "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+                  "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3)}
+
+        if measure_memory:
+            # A second run under tracemalloc, which would skew the timings of the first one
+            api_client, user_api, payment_api = self.new_apis()
+            tracemalloc.start()
+            scenario(user_api, payment_api)
+            result["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+            api_client.shutdown()
+
+        return result
+
+    def deserialization(self, repeat: int):
+        """
+        Cost of deserializing one record of a response, without the network
+        """
+        stories = self.payloads['stories'][:50]
+        cases = {"deserialize.transaction": ({"body": {"data": stories}}, Transaction, False),
+                 "deserialize.transaction.lazy": ({"body": {"data": stories}}, Transaction, True),
+                 "deserialize.user": ({"body": {"data": self.payloads['users'][:50]}}, User, False),
+                 "deserialize.payment": ({"body": {"data": self.payloads['payments'][:50]}}, Payment, False)}
+
+        results = {}
+        for name, (response, data_type, lazy) in cases.items():
+            records = len(response['body']['data'])
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                deserialize(response, data_type, lazy=lazy)
+                timings.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            page = deserialize(response, data_type, lazy=lazy)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del page
+
+            results[name] = {"records": records,
+                             "us_per_record": round(statistics.median(timings) / records * 1e6, 3),
+                             "peak_memory_kb": round(peak / 1024, 1)}
+
+        # From the raw bytes to the models: JSON decoding and from_json, against the one typed pass of TypedDecoder
+        try:
+            typed_decoder = TypedDecoder()
+        except ImportError:
+            return results
+
+        json_decoder = JsonDecoder()
+        for name, (response, data_type, lazy) in cases.items():
+            if lazy:
+                continue
+            content = json.dumps(response['body']).encode('utf-8')
+            records = len(response['body']['data'])
+            builds = {"from_json": lambda: deserialize({"body": json_decoder.decode(content)}, data_type),
+                      "typed": lambda: typed_decoder.deserialize(content, data_type)}
+            if typed_decoder.deserialize(content, data_type) is NotImplemented:
+                # The payloads don't match the typed schema: the typed case would only time the fallback
+                del builds["typed"]
+
+            # The two paths take turns, so a noisy machine slows both of them alike
+            timings = {suffix: [] for suffix in builds}
+            for _ in range(repeat):
+                for suffix, build in builds.items():
+                    start = time.perf_counter()
+                    build()
+                    timings[suffix].append(time.perf_counter() - start)
+
+            for suffix in builds:
+                results[f"{name}.bytes.{suffix}"] = {
+                    "records": records, "us_per_record": round(statistics.median(timings[suffix]) / records * 1e6, 3)}
+            if "typed" in builds:
+                results[f"{name}.bytes.typed"]["speedup"] = round(statistics.median(timings["from_json"])
+                                                                   / statistics.median(timings["typed"]), 2)
+            else:
+                results[f"{name}.bytes.typed"] = {"records": records, "schema_mismatch": True}
+        return results
+
+    def decoding(self, repeat: int):
+        """
+        Cost of decoding one record of large /stories and /friends bodies, per installed JSON backend
+        """
+        bodies = {"stories": json.dumps({"data": self.payloads['stories']}).encode('utf-8'),
+                  "friends": json.dumps({"data": self.payloads['users']}).encode('utf-8')}
+
+        results = {}
+        for backend in JsonDecoder.backends:
+            try:
+                json_decoder = JsonDecoder(backend)
+            except ImportError:
+                continue
+            for name, content in bodies.items():
+                records = len(self.payloads[name if name == 'stories' else 'users'])
+                timings = []
+                for _ in range(max(repeat // 10, 1)):
+                    start = time.perf_counter()
+                    json_decoder.decode(content)
+                    timings.append(time.perf_counter() - start)
+
+                median = statistics.median(timings)
+                results[f"decode.{name}.{backend}"] = {"records": records,
+                                                        "bytes": len(content),
+                                                        "us_per_record": round(median / records * 1e6, 3),
+                                                        "mb_per_sec": round(len(content) / median / 1e6, 1)}
+        return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    :return: <list> the regressions, as readable lines
+    """
+    regressions = []
+    for name, metrics in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in metrics or not previous.get(metric):
+                continue
+            change = (metrics[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name} {metric}: {previous[metric]} -> {metrics[metric]} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=0, help="latency added by the mock server")
+    parser.add_argument('--requests', type=int, default=200, help="calls per request scenario")
+    parser.add_argument('--repeat', type=int, default=200, help="repetitions per deserialization case")
+    parser.add_argument('--payloads', help="directory of recorded payloads (see mock_server.py)")
+    parser.add_argument('--only', help="run the scenarios whose name contains this")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory runs")
+    parser.add_argument('--output', help="write the results to this file instead of stdout")
+    parser.add_argument('--baseline', help="results of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads) if args.payloads else generate_payloads()
+    results = {"meta": {"python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "latency_ms": args.latency_ms,
+                        "requests": args.requests,
+                        "time": time.strftime('%Y-%m-%dT%H:%M:%S')},
+               "results": {}}
+
+    with MockVenmoServer(payloads=payloads, latency=args.latency_ms / 1000) as server:
+        benchmarks = Benchmarks(server, args.requests)
+        for name, scenario in benchmarks.scenarios().items():
+            if args.only and args.only not in name:
+                continue
+            print(f"running {name}", file=sys.stderr)
+            results['results'][name] = benchmarks.run_scenario(scenario, measure_memory=not args.no_memory)
+
+        decoding_results = benchmarks.decoding(args.repeat)
+        for name, result in {**decoding_results, **benchmarks.deserialization(args.repeat)}.items():
+            if not args.only or args.only in name:
+                results['results'][name] = result
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Stress check of the concurrency model of ApiClient and AsyncApiClient, against the local mock server
+(benchmarks/mock_server.py). Many threads (and tasks) share one client while the token is rotated and hooks are
+added and removed. It checks that:
+    - last_response is the response of the caller's own last call (thread or task local),
+    - every request carries one of the tokens that were set, never a missing or mixed one,
+    - the metrics count every call.
+Exit code 1 on failure.
+
+    python benchmarks/stress_thread_safety.py [--threads 16] [--calls 200]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockVenmoServer  # noqa: E402
+from venmo_api import ApiClient, AsyncApiClient, UserApi, AsyncUserApi, MetricsCollector  # noqa: E402
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import random  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+
+
+class StressCheck(object):
+
+    def __init__(self, server: MockVenmoServer, num_threads: int, num_calls: int):
+        super().__init__()
+        self.server = server
+        self.num_threads = num_threads
+        self.num_calls = num_calls
+        self.user_ids = [user['id'] for user in server.payloads['users']]
+        self.tokens = {"Bearer stress-0"}
+        self.failures = []
+        self.__lock = threading.Lock()
+
+    def fail(self, message: str):
+        with self.__lock:
+            if len(self.failures) < 20:
+                self.failures.append(message)
+
+    def check_last_response(self, api_client, user_id: str, where: str):
+        last_response = api_client.last_response
+        last_user_id = last_response and last_response['body']['data']['id']
+        if last_user_id != user_id:
+            self.fail(f"{where}: last_response is user {last_user_id}, expected {user_id}")
+
+    def rotate_tokens(self, api_clients, stop: threading.Event):
+        """
+        Switch the token of the clients, the way a refresh would, until [stop] is set
+        """
+        i = 0
+        while not stop.is_set():
+            i += 1
+            token = f"Bearer stress-{i}"
+            with self.__lock:
+                self.tokens.add(token)
+            for api_client in api_clients:
+                api_client.update_access_token(token)
+            time.sleep(0.001)
+
+    def toggle_hooks(self, api_client, stop: threading.Event):
+        def hook(request_info):
+            pass
+
+        while not stop.is_set():
+            api_client.add_pre_request_hook(hook)
+            api_client.add_post_request_hook(hook)
+            time.sleep(0.001)
+            api_client.remove_request_hook(hook)
+
+    def run_threads(self, api_client, metrics: MetricsCollector):
+        user_api = UserApi(api_client)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(self.num_calls):
+                user_id = rng.choice(self.user_ids)
+                user_api.get_user(user_id)
+                # Let the other threads run between the call and the read, as real code would
+                time.sleep(0)
+                self.check_last_response(api_client, user_id, "thread")
+
+        def callback_check(user_id):
+            def callback(response):
+                # Runs on a worker thread, right after that thread's own call
+                self.check_last_response(api_client, user_id, "callback")
+            return callback
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.num_threads)]
+        for thread in threads:
+            thread.start()
+
+        futures = [api_client.call_api(resource_path=f"/users/{user_id}", method='GET',
+                                       callback=callback_check(user_id))
+                   for user_id in random.Random(-1).choices(self.user_ids, k=self.num_calls)]
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            future.result()
+
+        requests = sum(route['requests'] for route in metrics.get_stats().values())
+        # Coalesced calls share a request, so there can be fewer requests than calls, never more
+        expected = self.num_threads * self.num_calls + self.num_calls
+        if not 0 < requests <= expected:
+            self.fail(f"metrics: {requests} requests recorded for {expected} calls")
+
+    async def run_tasks(self, api_client):
+        user_api = AsyncUserApi(api_client)
+
+        async def task(seed):
+            rng = random.Random(seed)
+            for _ in range(self.num_calls // 10):
+                user_id = rng.choice(self.user_ids)
+                await user_api.get_user(user_id)
+                self.check_last_response(api_client, user_id, "task")
+
+        await asyncio.gather(*[task(i) for i in range(self.num_threads * 4)])
+
+    def check_tokens(self):
+        for authorization, count in self.server.authorizations.items():
+            if authorization not in self.tokens:
+                self.fail(f"{count} requests sent with the token {authorization!r}")
+
+    def run(self):
+        metrics = MetricsCollector()
+        api_client = ApiClient(access_token="Bearer stress-0", max_workers=self.num_threads, metrics=metrics)
+        api_client.configuration['host'] = self.server.url
+        async_api_client = AsyncApiClient(access_token="Bearer stress-0")
+        async_api_client.configuration['host'] = self.server.url
+
+        stop = threading.Event()
+        background = [threading.Thread(target=self.rotate_tokens, args=([api_client, async_api_client], stop)),
+                      threading.Thread(target=self.toggle_hooks, args=(api_client, stop))]
+        for thread in background:
+            thread.start()
+
+        async def run_async():
+            async with async_api_client:
+                await self.run_tasks(async_api_client)
+
+        start = time.perf_counter()
+        try:
+            self.run_threads(api_client, metrics)
+            asyncio.run(run_async())
+        finally:
+            stop.set()
+            for thread in background:
+                thread.join()
+            api_client.shutdown()
+
+        self.check_tokens()
+        return {"seconds": round(time.perf_counter() - start, 2),
+                "requests": self.server.requests,
+                "tokens": len(self.tokens)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--calls', type=int, default=200, help="calls per thread")
+    args = parser.parse_args()
+
+    with MockVenmoServer() as server:
+        stress_check = StressCheck(server, args.threads, args.calls)
+        summary = stress_check.run()
+
+    print(summary)
+    for failure in stress_check.failures:
+        print(f"FAILURE {failure}", file=sys.stderr)
+    if stress_check.failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -32,7 +32,9 @@ setup(
     long_description_content_type="text/markdown",
     packages=find_packages(),
     install_requires=requirements,
-    python_requires='>=3.6',
+    extras_require={'async': ['aiohttp>=3.6'], 'numpy': ['numpy'], 'arrow': ['pyarrow'],
+                    'otel': ['opentelemetry-api'], 'fast': ['orjson'], 'msgspec': ['msgspec']},
+    python_requires='>=3.7',
     include_package_data=True,
     classifiers=[
         'Development Status :: 3 - Alpha',
@@ -44,7 +46,6 @@ setup(
         'Topic :: Internet',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ]
@@ -1,5 +1,10 @@
 from .utils.model_util import (string_to_timestamp, get_phone_model_from_json, random_device_id)
 from .models.exception import *
+from .utils.identity_map import IdentityMap
+from .utils.json_decoder import JsonDecoder
+from .utils.instrumentation import (RequestInfo, ApiResponse, MetricsCollector, OpenTelemetryExporter,
+                                    get_path_template)
+from .utils.single_flight import SingleFlight, AsyncSingleFlight, SharedResponse
 from .models.base_model import BaseModel
 from .models.json_schema import JSONSchema
 from .models.user import User
@@ -9,21 +14,50 @@ from .models.transaction import Transaction
 from .models.payment import Payment, PaymentStatus
 from .models.payment_method import (PaymentMethod, PaymentRole, PaymentPrivacy)
 from .models.page import Page
-from .utils.api_util import (deserialize, wrap_callback, warn, get_user_id, confirm, validate_access_token)
+from .models.payout import Payout, PayoutResult, PayoutAction, PayoutStatus
+from .utils.typed_decoder import TypedDecoder, LazyBody
+from .utils.api_util import (deserialize, wrap_callback, cached_result, warn, get_user_id, confirm,
+                             validate_access_token)
+from .utils.paginator import iter_pages, async_iter_pages
+from .utils.columnar import TransactionColumns
+from .utils.sync_state import SyncStateStore, MemoryStateStore, JSONFileStateStore, StorySync, is_newer_story
+from .utils.local_store import LocalStore
+from .utils.cache import LRUCache, UserCache
+from .utils.http_cache import HttpCache, MemoryCacheBackend, DiskCacheBackend
+from .utils.rate_limiter import RateLimiter
+from .utils.retry_policy import RetryPolicy
+from .utils.friends_crawler import FriendsCrawler, EdgeSink, CallbackEdgeSink, CSVEdgeSink, SQLiteEdgeSink
+from .utils.payout_batch import PayoutBatch
+from .utils.worker_pool import WorkerPool
+from .utils.pool_config import PoolConfig
+from .utils.http_adapter import PooledHTTPAdapter
 from .utils.api_client import ApiClient
+from .utils.async_api_client import AsyncApiClient
 from .apis.auth_api import AuthenticationApi
 from .apis.payment_api import PaymentApi
 from .apis.user_api import UserApi
+from .apis.async_auth_api import AsyncAuthenticationApi
+from .apis.async_payment_api import AsyncPaymentApi
+from .apis.async_user_api import AsyncUserApi
 from .venmo import Client
 
 __all__ = ["AuthenticationFailedError", "InvalidArgumentError", "InvalidHttpMethodError", "ArgumentMissingError",
            "JSONDecodeError", "ResourceNotFoundError", "HttpCodeError", "NoPaymentMethodFoundError",
            "NoPendingPaymentToUpdateError", "AlreadyRemindedPaymentError", "NotEnoughBalanceError",
-           "GeneralPaymentError",
-           "get_phone_model_from_json", "random_device_id", "string_to_timestamp",
-           "deserialize", "wrap_callback", "warn", "confirm", "get_user_id", "validate_access_token",
+           "GeneralPaymentError", "WorkerPoolFullError",
+           "get_phone_model_from_json", "random_device_id", "string_to_timestamp", "IdentityMap",
+           "JsonDecoder", "TypedDecoder", "LazyBody",
+           "RequestInfo", "ApiResponse", "MetricsCollector", "OpenTelemetryExporter", "get_path_template",
+           "SingleFlight", "AsyncSingleFlight", "SharedResponse",
+           "deserialize", "wrap_callback", "cached_result", "warn", "confirm", "get_user_id", "validate_access_token",
+           "iter_pages", "async_iter_pages", "TransactionColumns", "SyncStateStore", "MemoryStateStore",
+           "JSONFileStateStore", "StorySync", "is_newer_story", "LocalStore", "LRUCache", "UserCache", "HttpCache",
+           "MemoryCacheBackend", "DiskCacheBackend", "RateLimiter", "RetryPolicy",
+           "FriendsCrawler", "EdgeSink", "CallbackEdgeSink", "CSVEdgeSink", "SQLiteEdgeSink",
+           "PayoutBatch",
            "JSONSchema",  "User", "Mention", "Comment", "Transaction", "Payment", "PaymentStatus", "PaymentMethod",
-           "PaymentRole", "Page",   "BaseModel",
-           "PaymentPrivacy", "ApiClient", "AuthenticationApi", "UserApi", "PaymentApi",
+           "PaymentRole", "Page",   "BaseModel", "Payout", "PayoutResult", "PayoutAction", "PayoutStatus",
+           "PaymentPrivacy", "WorkerPool", "PoolConfig", "ApiClient", "AuthenticationApi", "UserApi", "PaymentApi",
+           "AsyncApiClient", "AsyncAuthenticationApi", "AsyncUserApi", "AsyncPaymentApi",
            "Client"
            ]
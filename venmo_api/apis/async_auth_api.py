@@ -0,0 +1,127 @@
+from venmo_api import random_device_id, confirm, AuthenticationFailedError, AsyncApiClient
+
+
+class AsyncAuthenticationApi(object):
+    """
+    asyncio version of the AuthenticationApi. The interactive (CLI) login stays on the AuthenticationApi;
+    this class exposes the awaitable building blocks of the same flow.
+    """
+
+    TWO_FACTOR_ERROR_CODE = 81109
+
+    def __init__(self, api_client: AsyncApiClient = None, device_id: str = None):
+        super().__init__()
+
+        self.__device_id = device_id or random_device_id()
+        self.__api_client = api_client or AsyncApiClient()
+
+    @staticmethod
+    async def log_out(access_token: str) -> bool:
+        """
+        Revoke your access_token
+        :param access_token: <str>
+        :return:
+        """
+
+        resource_path = '/oauth/access_token'
+        async with AsyncApiClient(access_token=access_token) as api_client:
+            await api_client.call_api(resource_path=resource_path,
+                                      method='DELETE')
+
+        confirm(f"Successfully logged out.")
+        return True
+
+    async def authenticate_using_username_password(self, username: str, password: str) -> dict:
+        """
+        Authenticate with username and password. Raises exception if either be incorrect.
+        Check returned response:
+            if have an error (response.body.error), 2-factor is needed
+            if no error, (response.body.access_token) gives you the access_token
+        :param username: <str>
+        :param password: <str>
+        :return: <dict>
+        """
+
+        resource_path = '/oauth/access_token'
+        header_params = {'device-id': self.__device_id,
+                         'Content-Type': 'application/json',
+                         'Host': 'api.venmo.com'
+                         }
+        body = {"phone_email_or_username": username,
+                "client_id": "1",
+                "password": password
+                }
+
+        return await self.__api_client.call_api(resource_path=resource_path, header_params=header_params,
+                                                body=body, method='POST', ok_error_codes=[self.TWO_FACTOR_ERROR_CODE])
+
+    async def send_text_otp(self, otp_secret: str) -> dict:
+        """
+        Send one-time-password to user phone-number
+        :param otp_secret: <str> the otp-secret from response_headers.venmo-otp-secret
+        :return: <dict>
+        """
+
+        resource_path = '/account/two-factor/token'
+        header_params = {'device-id': self.__device_id,
+                         'Content-Type': 'application/json',
+                         'venmo-otp-secret': otp_secret
+                         }
+        body = {"via": "sms"}
+
+        response = await self.__api_client.call_api(resource_path=resource_path, header_params=header_params,
+                                                    body=body, method='POST')
+
+        if response['status_code'] != 200:
+            reason = None
+            try:
+                reason = response['body']['error']['message']
+            finally:
+                raise AuthenticationFailedError(f"Failed to send the One-Time-Password to"
+                                                f" your phone number because: {reason}")
+
+        return response
+
+    async def authenticate_using_otp(self, user_otp: str, otp_secret: str) -> str:
+        """
+        Login using one-time-password, for 2-factor process
+        :param user_otp: <str> otp user received on their phone
+        :param otp_secret: <str> otp_secret obtained from 2-factor process
+        :return: <str> access_token
+        """
+
+        resource_path = '/oauth/access_token'
+        header_params = {'device-id': self.__device_id,
+                         'venmo-otp': user_otp,
+                         'venmo-otp-secret': otp_secret
+                         }
+        params = {'client_id': 1}
+
+        response = await self.__api_client.call_api(resource_path=resource_path, header_params=header_params,
+                                                    params=params,
+                                                    method='POST')
+        access_token = response['body']['access_token']
+        self.__api_client.update_access_token(access_token=access_token)
+
+        return access_token
+
+    async def trust_this_device(self, device_id=None):
+        """
+        Add device_id or self.device_id (if no device_id passed) to the trusted devices on Venmo
+        :return:
+        """
+        device_id = device_id or self.__device_id
+        header_params = {'device-id': device_id}
+        resource_path = '/users/devices'
+
+        await self.__api_client.call_api(resource_path=resource_path,
+                                         header_params=header_params,
+                                         method='POST')
+
+        confirm(f"Successfully added your device id to the list of the trusted devices.")
+
+    def get_device_id(self):
+        return self.__device_id
+
+    def set_access_token(self, access_token):
+        self.__api_client.update_access_token(access_token=access_token)
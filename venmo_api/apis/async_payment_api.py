@@ -0,0 +1,282 @@
+from venmo_api import Payment, ArgumentMissingError, AlreadyRemindedPaymentError, \
+    NoPendingPaymentToUpdateError, NoPaymentMethodFoundError, NotEnoughBalanceError, GeneralPaymentError, \
+    User, PaymentMethod, PaymentRole, PaymentPrivacy, LRUCache, IdentityMap, deserialize, get_user_id
+from typing import List, Union
+
+
+class AsyncPaymentApi(object):
+    """
+    asyncio version of the PaymentApi. Every method that talks to Venmo is a coroutine and must be awaited.
+    """
+
+    def __init__(self, profile, api_client, payment_methods_ttl: float = 300,
+                 refresh_funding_source_on_error: bool = True, identity_map: IdentityMap = None,
+                 lazy: bool = False, keep_json: bool = True):
+        """
+        :param profile: <User> profile of the access token's owner
+        :param api_client: <AsyncApiClient>
+        :param payment_methods_ttl: <float> Seconds the payment methods (and so the default funding source)
+        are cached for. Pass 0 to fetch them on every call.
+        :param refresh_funding_source_on_error: <bool> Drop the cached payment methods when a payment that used
+        the default funding source fails, so the next payment resolves it again.
+        :param identity_map: <IdentityMap> [optional] Share the User objects across all the calls of this API.
+        By default they are shared within one response only.
+        :param lazy: <bool> Return lazy payments, that parse each field on its first access. Cheap when only a few
+        fields of many records are read.
+        :param keep_json: <bool> Keep the raw JSON of each model. Pass False to save memory on long histories;
+        to_json() then rebuilds it from the attributes.
+        """
+        super().__init__()
+        self.__profile = profile
+        self.__api_client = api_client
+        self.__payment_methods_cache = LRUCache(max_size=1, ttl=payment_methods_ttl)
+        self.__refresh_funding_source_on_error = refresh_funding_source_on_error
+        self.__identity_map = identity_map
+        self.__lazy = lazy
+        self.__keep_json = keep_json
+        self.__payment_error_codes = {
+            "already_reminded_error": 2907,
+            "no_pending_payment_error": 2901,
+            "no_pending_payment_error2": 2905,
+            "not_enough_balance_error": 13006
+        }
+
+    async def get_charge_payments(self, limit=100000):
+        """
+        Get a list of charge ongoing payments (pending request money)
+        :param limit:
+        :return:
+        """
+        return await self.__get_payments(action="charge",
+                                         limit=limit)
+
+    async def get_pay_payments(self, limit=100000):
+        """
+        Get a list of pay ongoing payments (pending requested money from your profile)
+        :param limit:
+        :return:
+        """
+        return await self.__get_payments(action="pay",
+                                         limit=limit)
+
+    async def remind_payment(self, payment: Payment = None, payment_id: int = None) -> bool:
+        """
+        Send a reminder for payment/payment_id
+        :param payment: either payment object or payment_id must be be provided
+        :param payment_id:
+        :return: True or raises AlreadyRemindedPaymentError
+        """
+
+        payment_id = payment_id or payment.id
+        action = 'remind'
+
+        response = await self.__update_payment(action=action,
+                                               payment_id=payment_id)
+
+        # if the reminder has already sent
+        if 'error' in response.get('body'):
+            if response['body']['error']['code'] == self.__payment_error_codes['no_pending_payment_error2']:
+                raise NoPendingPaymentToUpdateError(payment_id=payment_id,
+                                                    action=action)
+            raise AlreadyRemindedPaymentError(payment_id=payment_id)
+        return True
+
+    async def cancel_payment(self, payment: Payment = None, payment_id: int = None) -> bool:
+        """
+        Cancel the payment/payment_id provided. Only applicable to payments you have access to (requested payments)
+        :param payment:
+        :param payment_id:
+        :return: True or raises NoPendingPaymentToCancelError
+        """
+        payment_id = payment_id or payment.id
+        action = 'cancel'
+
+        response = await self.__update_payment(action=action,
+                                               payment_id=payment_id)
+
+        if 'error' in response.get('body'):
+            raise NoPendingPaymentToUpdateError(payment_id=payment_id,
+                                                action=action)
+        return True
+
+    async def get_payment_methods(self, force_update=False) -> Union[List[PaymentMethod], None]:
+        """
+        Get a list of available payment_methods. They are cached for payment_methods_ttl seconds.
+        :param force_update: <bool> Skip the cache and fetch them again.
+        :return:
+        """
+        if not force_update:
+            payment_methods = self.__payment_methods_cache.get('payment_methods')
+            if payment_methods is not None:
+                return list(payment_methods)
+
+        resource_path = '/payment-methods'
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET')
+
+        payment_methods = deserialize(response=response, data_type=PaymentMethod, identity_map=self.__identity_map,
+                                      keep_json=self.__keep_json)
+        self.__payment_methods_cache.set('payment_methods', list(payment_methods))
+        return payment_methods
+
+    def invalidate_payment_methods(self):
+        """
+        Drop the cached payment methods. The next call fetches them (and the default funding source) again.
+        :return:
+        """
+        self.__payment_methods_cache.clear()
+
+    async def send_money(self, amount: float,
+                         note: str,
+                         target_user_id: int = None,
+                         funding_source_id: str = None,
+                         target_user: User = None,
+                         privacy_setting: PaymentPrivacy = PaymentPrivacy.PRIVATE) -> bool:
+        """
+        send [amount] money with [note] to the ([target_user_id] or [target_user]) from the [funding_source_id]
+        If no [funding_source_id] is provided, it will find the default source_id and uses that.
+        :param amount: <float>
+        :param note: <str>
+        :param funding_source_id: <str> Your payment_method id for this payment
+        :param privacy_setting: <PaymentPrivacy> PRIVATE/FRIENDS/PUBLIC (enum)
+        :param target_user_id: <str>
+        :param target_user: <User>
+        :return: <bool> Either the transaction was successful or an exception will rise.
+        """
+
+        return await self.__send_or_request_money(amount=amount,
+                                                  note=note,
+                                                  is_send_money=True,
+                                                  funding_source_id=funding_source_id,
+                                                  privacy_setting=privacy_setting.value,
+                                                  target_user_id=target_user_id,
+                                                  target_user=target_user)
+
+    async def request_money(self, amount: float,
+                            note: str,
+                            target_user_id: int = None,
+                            privacy_setting: PaymentPrivacy = PaymentPrivacy.PRIVATE,
+                            target_user: User = None) -> bool:
+        """
+        Request [amount] money with [note] from the ([target_user_id] or [target_user])
+        :param amount: <float> amount of money to be requested
+        :param note: <str> message/note of the transaction
+        :param privacy_setting: <PaymentPrivacy> PRIVATE/FRIENDS/PUBLIC (enum)
+        :param target_user_id: <str> the user id of the person you are asking the money from
+        :param target_user: <User> The user object or user_id is required
+        :return: <bool> Either the transaction was successful or an exception will rise.
+        """
+        return await self.__send_or_request_money(amount=amount,
+                                                  note=note,
+                                                  is_send_money=False,
+                                                  funding_source_id=None,
+                                                  privacy_setting=privacy_setting.value,
+                                                  target_user_id=target_user_id,
+                                                  target_user=target_user)
+
+    async def get_default_payment_method(self, force_update=False) -> PaymentMethod:
+        """
+        Search in all payment_methods and find the one that has payment_role of Default
+        :param force_update: <bool> Skip the cached payment methods.
+        :return:
+        """
+        payment_methods = await self.get_payment_methods(force_update=force_update)
+
+        for p_method in payment_methods:
+            if not p_method:
+                continue
+
+            if p_method.role == PaymentRole.DEFAULT:
+                return p_method
+
+        raise NoPaymentMethodFoundError()
+
+    async def __update_payment(self, action, payment_id):
+
+        if not payment_id:
+            raise ArgumentMissingError(arguments=('payment', 'payment_id'))
+
+        resource_path = f'/payments/{payment_id}'
+        body = {
+            "action": action,
+        }
+        return await self.__api_client.call_api(resource_path=resource_path,
+                                                body=body,
+                                                method='PUT',
+                                                ok_error_codes=list(self.__payment_error_codes.values())[:-1])
+
+    async def __get_payments(self, action, limit):
+        """
+        Get a list of ongoing payments with the given action
+        :return:
+        """
+        resource_path = '/payments'
+        parameters = {
+            "action": action,
+            "actor": self.__profile.id,
+            "limit": limit
+        }
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    params=parameters,
+                                                    method='GET')
+
+        return deserialize(response=response, data_type=Payment, identity_map=self.__identity_map,
+                           lazy=self.__lazy, keep_json=self.__keep_json)
+
+    async def __send_or_request_money(self, amount: float,
+                                      note: str,
+                                      is_send_money,
+                                      funding_source_id: str = None,
+                                      privacy_setting: str = PaymentPrivacy.PRIVATE.value,
+                                      target_user_id: int = None, target_user: User = None) -> bool:
+        """
+        Generic method for sending and requesting money
+        :param amount:
+        :param note:
+        :param is_send_money:
+        :param funding_source_id:
+        :param privacy_setting:
+        :param target_user_id:
+        :param target_user:
+        :return:
+        """
+        target_user_id = str(get_user_id(target_user, target_user_id))
+
+        amount = abs(amount)
+        if not is_send_money:
+            amount = -amount
+
+        body = {
+            "user_id": target_user_id,
+            "audience": privacy_setting,
+            "amount": amount,
+            "note": note
+        }
+
+        used_default_funding_source = False
+        if is_send_money:
+            if not funding_source_id:
+                funding_source_id = (await self.get_default_payment_method()).id
+                used_default_funding_source = True
+            body.update({"funding_source_id": funding_source_id})
+
+        resource_path = '/payments'
+
+        result = await self.__api_client.call_api(resource_path=resource_path,
+                                                  method='POST',
+                                                  body=body)
+        # handle 200 status code errors
+        error_code = result['body']['data'].get('error_code')
+        if error_code:
+            # The default funding source may have changed since it was cached
+            if used_default_funding_source and self.__refresh_funding_source_on_error:
+                self.invalidate_payment_methods()
+
+            if error_code == self.__payment_error_codes['not_enough_balance_error']:
+                raise NotEnoughBalanceError(amount, target_user_id)
+
+            error = result['body']['data']
+            raise GeneralPaymentError(f"{error.get('title')}\n{error.get('error_msg')}")
+
+        # if no exception raises, then it was successful
+        return True
@@ -0,0 +1,446 @@
+from venmo_api import User, Page, Transaction, UserCache, IdentityMap, TransactionColumns, SyncStateStore, \
+    ResourceNotFoundError, deserialize, async_iter_pages, get_user_id, StorySync
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Union
+import asyncio
+
+
+class AsyncUserApi(object):
+    """
+    asyncio version of the UserApi. Every method is a coroutine and must be awaited.
+    """
+
+    def __init__(self, api_client, user_cache: UserCache = None, identity_map: IdentityMap = None,
+                 lazy: bool = False, keep_json: bool = True):
+        """
+        :param api_client: <AsyncApiClient>
+        :param user_cache: <UserCache> [optional] Cache for get_user, get_user_by_username and search_for_users.
+        :param identity_map: <IdentityMap> [optional] Share the User objects across all the calls of this API.
+        By default they are shared within one response only.
+        :param lazy: <bool> Return lazy models, that parse each field on its first access. Cheap when only a few
+        fields of many records are read.
+        :param keep_json: <bool> Keep the raw JSON of each model. Pass False to save memory on long histories;
+        to_json() then rebuilds it from the attributes.
+        """
+        super().__init__()
+        self.__api_client = api_client
+        self.__profile = None
+        self.__user_cache = user_cache
+        self.__identity_map = identity_map
+        self.__lazy = lazy
+        self.__keep_json = keep_json
+
+    def get_user_cache(self) -> Union[UserCache, None]:
+        return self.__user_cache
+
+    async def get_my_profile(self, force_update=False) -> Union[User, None]:
+        """
+        Get my profile info and return as a <User>
+        :return my_profile: <User>
+        """
+        if self.__profile and not force_update:
+            return self.__profile
+
+        # Prepare the request
+        resource_path = '/account'
+        nested_response = ['user']
+        # Make the request
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET')
+
+        self.__profile = deserialize(response=response, data_type=User, nested_response=nested_response,
+                                     identity_map=self.__identity_map, lazy=self.__lazy, keep_json=self.__keep_json)
+        if self.__user_cache:
+            self.__user_cache.put(self.__profile)
+        return self.__profile
+
+    async def search_for_users(self, query: str, offset: int = 0, limit: int = 50,
+                               username=False) -> Union[List[User], None]:
+        """
+        search for [query] in users
+        :param query:
+        :param offset:
+        :param limit:
+        :param username: default: False; Pass True if search is by username
+        :return users_list: <list> A list of <User> objects or empty
+        """
+
+        search_key = (query, offset, limit, bool(username))
+        users = self.__user_cache.get_search(search_key) if self.__user_cache else None
+
+        if users is None:
+            resource_path = '/users'
+
+            params = {'query': query, 'limit': limit, 'offset': offset}
+            # update params for querying by username
+            if username or '@' in query:
+                params.update({'query': query.replace('@', ''), 'type': 'username'})
+
+            response = await self.__api_client.call_api(resource_path=resource_path, params=params,
+                                                        method='GET')
+            users = deserialize(response=response, data_type=User, identity_map=self.__identity_map,
+                                lazy=self.__lazy, keep_json=self.__keep_json)
+            if self.__user_cache:
+                self.__user_cache.put_search(search_key, users)
+
+        page = Page()
+        page.extend(users)
+        return page.set_method(method=self.search_for_users,
+                               kwargs={"query": query, "limit": limit, "username": username},
+                               current_offset=offset
+                               )
+
+    def iter_search_users(self, query: str, limit: int = 50, username=False, prefetch: int = 0) -> AsyncIterator[User]:
+        """
+        Lazily iterate (async for) over all the users matching [query], one page at a time.
+        :param query:
+        :param limit: <int> page size
+        :param username: default: False; Pass True if search is by username
+        :param prefetch: <int> Number of pages to fetch concurrently ahead of the consumer
+        :return: <AsyncIterator[User]>
+        """
+        return self.__iter_pages(self.search_for_users, prefetch, query=query, limit=limit, username=username)
+
+    async def get_user(self, user_id: str) -> Union[User, None]:
+        """
+        Get the user profile with [user_id]
+        :param user_id: <str>, example: '2859950549165568970'
+        :return user: <User> <NoneType>
+        """
+
+        if self.__user_cache:
+            cached_user = self.__user_cache.get_by_id(user_id)
+            if cached_user is not None:
+                return cached_user
+
+        # Prepare the request
+        resource_path = f'/users/{user_id}'
+        # Make the request
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET')
+
+        user = deserialize(response=response, data_type=User, identity_map=self.__identity_map,
+                           lazy=self.__lazy, keep_json=self.__keep_json)
+        if self.__user_cache:
+            self.__user_cache.put(user)
+        return user
+
+    async def get_user_by_username(self, username: str) -> Union[User, None]:
+        """
+        Get the user profile with [username]
+        :param username: case-insensitive
+        :return user: <User> <NoneType>
+        """
+        if self.__user_cache:
+            cached_user = self.__user_cache.get_by_username(username)
+            if cached_user is not None:
+                return cached_user
+
+        users = await self.search_for_users(query=username, username=True)
+        for user in users:
+            if (user.username or '').lower() == username.lower():
+                return user
+
+        # username not found
+        return None
+
+    async def get_users(self, ids: Iterable[str] = None, usernames: Iterable[str] = None,
+                        max_concurrency: int = 8) -> Tuple[Dict[str, User], Dict[str, Exception]]:
+        """
+        Resolve many users at once. The inputs are deduplicated, the users in the cache are served from it and the
+        rest is fetched with [max_concurrency] requests in flight. A username is not searched for if a user fetched
+        by id already has it. One failed lookup doesn't stop the others.
+        :param ids: <Iterable[str]> [optional] user ids
+        :param usernames: <Iterable[str]> [optional] usernames, case-insensitive
+        :param max_concurrency: <int> Number of lookups in flight at the same time.
+        :return: <Tuple[Dict[str, User], Dict[str, Exception]]> the users and the errors, by the given id or username
+        """
+        users = {}
+        errors = {}
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def resolve_one(lookup, key):
+            async with semaphore:
+                try:
+                    user = await lookup(key)
+                except Exception as e:
+                    errors[key] = e
+                    return
+            if user is None:
+                errors[key] = ResourceNotFoundError(f"Couldn't find the user {key}.")
+            else:
+                users[key] = user
+
+        async def resolve(lookup, keys):
+            await asyncio.gather(*[resolve_one(lookup, key) for key in keys])
+
+        await resolve(self.get_user, list(dict.fromkeys(str(user_id) for user_id in ids or [])))
+
+        # Each username is looked up once, under its first spelling, and the result is given to every spelling
+        spellings = {}
+        for username in usernames or []:
+            spellings.setdefault(username.lstrip('@').lower(), []).append(username)
+        unique_usernames = {key: names[0] for key, names in spellings.items()}
+        for user in list(users.values()):
+            username = unique_usernames.pop((user.username or '').lower(), None)
+            if username is not None:
+                users[username] = user
+
+        await resolve(lambda username: self.get_user_by_username(username.lstrip('@')),
+                      list(unique_usernames.values()))
+        for names in spellings.values():
+            for results in (users, errors):
+                if names[0] in results:
+                    results.update(dict.fromkeys(names[1:], results[names[0]]))
+        return users, errors
+
+    async def get_user_friends_list(self, user_id: str = None,
+                                    user: User = None,
+                                    offset: int = 0,
+                                    limit: int = 3337) -> Union[Page, None]:
+        """
+        Get ([user_id]'s or [user]'s) friends list as a list of <User>s
+        :return users_list: <list> A list of <User> objects or empty
+        """
+        user_id = get_user_id(user, user_id)
+        params = {"limit": limit, "offset": offset}
+
+        # Prepare the request
+        resource_path = f'/users/{user_id}/friends'
+        # Make the request
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET', params=params)
+
+        return deserialize(
+            response=response,
+            data_type=User,
+            identity_map=self.__identity_map,
+            keep_json=self.__keep_json,
+            lazy=self.__lazy).set_method(method=self.get_user_friends_list,
+                                         kwargs={"user_id": user_id, "limit": limit},
+                                         current_offset=offset
+                                         )
+
+    def iter_user_friends(self, user_id: str = None, user: User = None, limit: int = 3337,
+                          prefetch: int = 0) -> AsyncIterator[User]:
+        """
+        Lazily iterate (async for) over ([user_id]'s or [user]'s) friends, one page at a time.
+        :param user_id:
+        :param user:
+        :param limit: <int> page size
+        :param prefetch: <int> Number of pages to fetch concurrently ahead of the consumer
+        :return: <AsyncIterator[User]>
+        """
+        user_id = get_user_id(user, user_id)
+        return self.__iter_pages(self.get_user_friends_list, prefetch, user_id=user_id, limit=limit)
+
+    async def get_user_transactions(self, user_id: str = None, user: User = None,
+                                    limit: int = 50,
+                                    before_id=None) -> Union[Page, None]:
+        """
+        Get ([user_id]'s or [user]'s) transactions visible to yourself as a list of <Transaction>s
+        :param user_id:
+        :param user:
+        :param limit:
+        :param before_id:
+        :return:
+        """
+        user_id = get_user_id(user, user_id)
+
+        params = {'limit': limit}
+        if before_id:
+            params['before_id'] = before_id
+
+        # Prepare the request
+        resource_path = f'/stories/target-or-actor/{user_id}'
+
+        # Make the request
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET', params=params)
+
+        return deserialize(response=response,
+                           data_type=Transaction,
+                           identity_map=self.__identity_map,
+                           keep_json=self.__keep_json,
+                           lazy=self.__lazy).set_method(method=self.get_user_transactions,
+                                                        kwargs={"user_id": user_id, "limit": limit})
+
+    def iter_user_transactions(self, user_id: str = None, user: User = None,
+                               limit: int = 50, before_id=None, prefetch: int = 0) -> AsyncIterator[Transaction]:
+        """
+        Lazily iterate (async for) over ([user_id]'s or [user]'s) transactions, newest first, one page at a time.
+        :param user_id:
+        :param user:
+        :param limit: <int> page size
+        :param before_id: [optional] start after this story id
+        :param prefetch: <int> Number of pages to fetch in the background while the current one is consumed
+        :return: <AsyncIterator[Transaction]>
+        """
+        user_id = get_user_id(user, user_id)
+        return self.__iter_pages(self.get_user_transactions, prefetch,
+                                 user_id=user_id, limit=limit, before_id=before_id)
+
+    async def export_user_transactions(self, user_id: str = None, user: User = None,
+                                       limit: int = 50, before_id=None, max_pages: int = None,
+                                       columns: TransactionColumns = None) -> TransactionColumns:
+        """
+        Page through ([user_id]'s or [user]'s) transactions straight into columns, without building <Transaction>s.
+        Call to_numpy() or to_arrow() on the result.
+        :param user_id:
+        :param user:
+        :param limit: <int> page size
+        :param before_id: [optional] start after this story id
+        :param max_pages: <int> [optional] stop after this many pages
+        :param columns: <TransactionColumns> [optional] add the rows to these columns
+        :return: <TransactionColumns>
+        """
+        user_id = get_user_id(user, user_id)
+        columns = columns if columns is not None else TransactionColumns()
+        resource_path = f'/stories/target-or-actor/{user_id}'
+
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            params = {'limit': limit}
+            if before_id:
+                params['before_id'] = before_id
+
+            response = await self.__api_client.call_api(resource_path=resource_path,
+                                                        method='GET', params=params)
+            stories = response['body'].get('data') or []
+            if not stories:
+                break
+
+            columns.add_page(stories)
+            before_id = columns.last_story_id
+            pages += 1
+
+        return columns
+
+    async def get_transaction_between_two_users(self, user_id_one: str = None,
+                                                user_id_two: str = None,
+                                                user_one: User = None,
+                                                user_two: User = None,
+                                                limit: int = 50,
+                                                before_id=None) -> Union[Page, None]:
+        """
+        Get the transactions between two users. Note that user_one must be the owner of the access token.
+        Otherwise it raises an unauthorized error.
+        :param user_id_one:
+        :param user_id_two:
+        :param user_one:
+        :param user_two:
+        :param limit:
+        :param before_id:
+        :return:
+        """
+        user_id_one = get_user_id(user_one, user_id_one)
+        user_id_two = get_user_id(user_two, user_id_two)
+
+        params = {'limit': limit}
+        if before_id:
+            params['before_id'] = before_id
+
+        # Prepare the request
+        resource_path = f'/stories/target-or-actor/{user_id_one}/target-or-actor/{user_id_two}'
+
+        # Make the request
+        response = await self.__api_client.call_api(resource_path=resource_path,
+                                                    method='GET', params=params)
+
+        return deserialize(response=response,
+                           data_type=Transaction,
+                           identity_map=self.__identity_map,
+                           keep_json=self.__keep_json,
+                           lazy=self.__lazy).set_method(method=self.get_transaction_between_two_users,
+                                                        kwargs={"user_id_one": user_id_one,
+                                                                "user_id_two": user_id_two,
+                                                                "limit": limit})
+
+    async def sync_user_transactions(self, state_store: SyncStateStore, user_id: str = None, user: User = None,
+                                     limit: int = 50, max_pages: int = None) -> Page:
+        """
+        Incremental sync: get only the ([user_id]'s or [user]'s) transactions that are newer than the last sync,
+        and move the high-water mark in the [state_store] to the newest story. Paging stops at the first known story.
+        :param state_store: <SyncStateStore> e.g. MemoryStateStore() or JSONFileStateStore(path)
+        :param user_id:
+        :param user:
+        :param limit: <int> page size
+        :param max_pages: <int> [optional] Max pages per run, e.g. to bound the first sync of a long history.
+        A run that stops before the last synced story leaves the mark in place; the next runs page on from where it
+        stopped and return the older stories, then the mark moves to the newest story of the interrupted run.
+        :return: <Page> of the new <Transaction>s, newest first
+        """
+        user_id = get_user_id(user, user_id)
+        return await self.__sync_stories(resource_path=f'/stories/target-or-actor/{user_id}',
+                                         key=f'user:{user_id}',
+                                         state_store=state_store, limit=limit, max_pages=max_pages)
+
+    async def sync_transactions_between_two_users(self, state_store: SyncStateStore,
+                                                  user_id_one: str = None,
+                                                  user_id_two: str = None,
+                                                  user_one: User = None,
+                                                  user_two: User = None,
+                                                  limit: int = 50, max_pages: int = None) -> Page:
+        """
+        Incremental sync of the transactions between two users (see get_transaction_between_two_users),
+        with one high-water mark per user pair.
+        :param state_store: <SyncStateStore>
+        :param user_id_one:
+        :param user_id_two:
+        :param user_one:
+        :param user_two:
+        :param limit: <int> page size
+        :param max_pages: <int> [optional] Max pages per run, resumed by the next runs (see sync_user_transactions).
+        :return: <Page> of the new <Transaction>s, newest first
+        """
+        user_id_one = get_user_id(user_one, user_id_one)
+        user_id_two = get_user_id(user_two, user_id_two)
+        resource_path = f'/stories/target-or-actor/{user_id_one}/target-or-actor/{user_id_two}'
+        return await self.__sync_stories(resource_path=resource_path,
+                                         key=f'pair:{user_id_one}:{user_id_two}',
+                                         state_store=state_store, limit=limit, max_pages=max_pages)
+
+    async def __sync_stories(self, resource_path: str, key: str, state_store: SyncStateStore,
+                             limit: int, max_pages: int = None) -> Page:
+        """
+        Page backward from the newest story (or from where the previous run stopped) until a story of the previous
+        sync shows up.
+        :return: <Page> of the new <Transaction>s
+        """
+        sync = StorySync(state_store=state_store, key=key)
+        new_stories = []
+
+        pages = 0
+        while not sync.complete and (max_pages is None or pages < max_pages):
+            params = {'limit': limit}
+            if sync.before_id:
+                params['before_id'] = sync.before_id
+
+            response = await self.__api_client.call_api(resource_path=resource_path,
+                                                        method='GET', params=params)
+            new_stories.extend(sync.add_page(response['body'].get('data') or []))
+            pages += 1
+
+        transactions = deserialize(response={'body': {'data': new_stories}},
+                                   data_type=Transaction,
+                                   identity_map=self.__identity_map,
+                                   lazy=self.__lazy,
+                                   keep_json=self.__keep_json)
+
+        # Only save the progress once every new story was fetched and deserialized, so a failure leaves them to the
+        # next sync
+        sync.commit()
+
+        return transactions
+
+    @staticmethod
+    async def __iter_pages(method, prefetch=0, **kwargs) -> AsyncIterator:
+        """
+        Yield the objects of every page, following the pages until an empty one.
+        :param method: <coroutine function> the paginated api method
+        :param prefetch: <int> Number of pages to fetch ahead
+        :param kwargs: arguments of the first call
+        :return: <AsyncIterator>
+        """
+        async for page in async_iter_pages(await method(**kwargs), prefetch=prefetch):
+            for item in page:
+                yield item
@@ -1,15 +1,38 @@
 from venmo_api import ApiClient, Payment, ArgumentMissingError, AlreadyRemindedPaymentError, \
     NoPendingPaymentToUpdateError, NoPaymentMethodFoundError, NotEnoughBalanceError, GeneralPaymentError, \
-    User, PaymentMethod, PaymentRole, PaymentPrivacy, deserialize, wrap_callback, get_user_id
+    User, PaymentMethod, PaymentRole, PaymentPrivacy, LRUCache, IdentityMap, Payout, PayoutResult, PayoutBatch, \
+    RateLimiter, deserialize, wrap_callback, cached_result, get_user_id
+from concurrent.futures import Future
 from typing import List, Union
 
 
 class PaymentApi(object):
 
-    def __init__(self, profile, api_client: ApiClient):
+    def __init__(self, profile, api_client: ApiClient, payment_methods_ttl: float = 300,
+                 refresh_funding_source_on_error: bool = True, identity_map: IdentityMap = None,
+                 lazy: bool = False, keep_json: bool = True):
+        """
+        :param profile: <User> profile of the access token's owner
+        :param api_client: <ApiClient>
+        :param payment_methods_ttl: <float> Seconds the payment methods (and so the default funding source)
+        are cached for. Pass 0 to fetch them on every call.
+        :param refresh_funding_source_on_error: <bool> Drop the cached payment methods when a payment that used
+        the default funding source fails, so the next payment resolves it again.
+        :param identity_map: <IdentityMap> [optional] Share the User objects across all the calls of this API.
+        By default they are shared within one response only.
+        :param lazy: <bool> Return lazy payments, that parse each field on its first access. Cheap when only a few
+        fields of many records are read.
+        :param keep_json: <bool> Keep the raw JSON of each model. Pass False to save memory on long histories;
+        to_json() then rebuilds it from the attributes.
+        """
         super().__init__()
         self.__profile = profile
         self.__api_client = api_client
+        self.__payment_methods_cache = LRUCache(max_size=1, ttl=payment_methods_ttl)
+        self.__refresh_funding_source_on_error = refresh_funding_source_on_error
+        self.__identity_map = identity_map
+        self.__lazy = lazy
+        self.__keep_json = keep_json
         self.__payment_error_codes = {
             "already_reminded_error": 2907,
             "no_pending_payment_error": 2901,
@@ -81,25 +104,50 @@ class PaymentApi(object):
                                                 action=action)
         return True
 
-    def get_payment_methods(self, callback=None) -> Union[List[PaymentMethod], None]:
+    def get_payment_methods(self, callback=None,
+                            force_update=False) -> Union[List[PaymentMethod], Future, None]:
         """
-        Get a list of available payment_methods
+        Get a list of available payment_methods. They are cached for payment_methods_ttl seconds.
         :param callback:
+        :param force_update: <bool> Skip the cache and fetch them again.
         :return:
         """
+        if not force_update:
+            payment_methods = self.__payment_methods_cache.get('payment_methods')
+            if payment_methods is not None:
+                return cached_result(list(payment_methods), callback=callback)
+
+        if callback:
+            user_callback = callback
+
+            def callback(payment_methods):
+                self.__payment_methods_cache.set('payment_methods', list(payment_methods))
+                return user_callback(payment_methods)
 
         wrapped_callback = wrap_callback(callback=callback,
-                                         data_type=PaymentMethod)
+                                         data_type=PaymentMethod,
+                                         identity_map=self.__identity_map,
+                                         keep_json=self.__keep_json)
 
         resource_path = '/payment-methods'
         response = self.__api_client.call_api(resource_path=resource_path,
                                               method='GET',
                                               callback=wrapped_callback)
-        # return the thread
+        # return the Future
         if callback:
-            return
+            return response
 
-        return deserialize(response=response, data_type=PaymentMethod)
+        payment_methods = deserialize(response=response, data_type=PaymentMethod, identity_map=self.__identity_map,
+                                      keep_json=self.__keep_json)
+        self.__payment_methods_cache.set('payment_methods', list(payment_methods))
+        return payment_methods
+
+    def invalidate_payment_methods(self):
+        """
+        Drop the cached payment methods. The next call fetches them (and the default funding source) again.
+        :return:
+        """
+        self.__payment_methods_cache.clear()
 
     def send_money(self, amount: float,
                    note: str,
@@ -107,7 +155,7 @@ class PaymentApi(object):
                    funding_source_id: str = None,
                    target_user: User = None,
                    privacy_setting: PaymentPrivacy = PaymentPrivacy.PRIVATE,
-                   callback=None) -> Union[bool, None]:
+                   callback=None) -> Union[bool, Future, None]:
         """
         send [amount] money with [note] to the ([target_user_id] or [target_user]) from the [funding_source_id]
         If no [funding_source_id] is provided, it will find the default source_id and uses that.
@@ -117,7 +165,7 @@ class PaymentApi(object):
         :param privacy_setting: <PaymentPrivacy> PRIVATE/FRIENDS/PUBLIC (enum)
         :param target_user_id: <str>
         :param target_user: <User>
-        :param callback: <function> Passing callback will run it in a distinct thread, and returns Thread
+        :param callback: <function> Passing callback will run it on the worker pool, and returns a Future
         :return: <bool> Either the transaction was successful or an exception will rise.
         """
 
@@ -135,7 +183,7 @@ class PaymentApi(object):
                       target_user_id: int = None,
                       privacy_setting: PaymentPrivacy = PaymentPrivacy.PRIVATE,
                       target_user: User = None,
-                      callback=None) -> Union[bool, None]:
+                      callback=None) -> Union[bool, Future, None]:
         """
         Request [amount] money with [note] from the ([target_user_id] or [target_user])
         :param amount: <float> amount of money to be requested
@@ -155,6 +203,28 @@ class PaymentApi(object):
                                             target_user=target_user,
                                             callback=callback)
 
+    def send_payouts(self, payouts: List[Payout],
+                     max_workers: int = 4,
+                     rate_limiter: RateLimiter = None,
+                     checkpoint_path: str = None,
+                     retry_failed: bool = False) -> List[PayoutResult]:
+        """
+        Send (or request) a batch of payouts with bounded concurrency. The default funding source is resolved once
+        for the whole batch. Failures don't stop the batch, each payout gets its own result.
+        :param payouts: <List[Payout]>
+        :param max_workers: <int> Number of payments in flight at the same time.
+        :param rate_limiter: <RateLimiter> [optional] Limits the payments per second of your account.
+        :param checkpoint_path: <str> [optional] File to record the progress in. Running the same batch again with
+        the same file skips the payouts that are already done.
+        :param retry_failed: <bool> On resume, send again the payouts that were rejected in the previous run.
+        :return: <List[PayoutResult]> one result per payout, in the same order
+        """
+        return PayoutBatch(payment_api=self,
+                           max_workers=max_workers,
+                           rate_limiter=rate_limiter,
+                           checkpoint_path=checkpoint_path,
+                           retry_failed=retry_failed).run(payouts)
+
     def __update_payment(self, action, payment_id):
 
         if not payment_id:
@@ -175,7 +245,8 @@ class PaymentApi(object):
         :return:
         """
         wrapped_callback = wrap_callback(callback=callback,
-                                         data_type=Payment)
+                                         data_type=Payment,
+                                         identity_map=self.__identity_map, lazy=self.__lazy, keep_json=self.__keep_json)
 
         resource_path = '/payments'
         parameters = {
@@ -188,9 +259,10 @@ class PaymentApi(object):
                                               method='GET',
                                               callback=wrapped_callback)
         if callback:
-            return
+            return response
 
-        return deserialize(response=response, data_type=Payment)
+        return deserialize(response=response, data_type=Payment, identity_map=self.__identity_map,
+                           lazy=self.__lazy, keep_json=self.__keep_json)
 
     def __send_or_request_money(self, amount: float,
                                 note: str,
@@ -198,7 +270,7 @@ class PaymentApi(object):
                                 funding_source_id: str = None,
                                 privacy_setting: str = PaymentPrivacy.PRIVATE.value,
                                 target_user_id: int = None, target_user: User = None,
-                                callback=None) -> Union[bool, None]:
+                                callback=None) -> Union[bool, Future, None]:
         """
         Generic method for sending and requesting money
         :param amount:
@@ -224,40 +296,60 @@ class PaymentApi(object):
             "note": note
         }
 
+        used_default_funding_source = False
         if is_send_money:
             if not funding_source_id:
                 funding_source_id = self.get_default_payment_method().id
+                used_default_funding_source = True
             body.update({"funding_source_id": funding_source_id})
 
         resource_path = '/payments'
 
-        wrapped_callback = wrap_callback(callback=callback,
-                                         data_type=None)
+        wrapped_callback = None
+        if callback:
+            def wrapped_callback(response):
+                self.__validate_payment_response(response, amount, target_user_id, used_default_funding_source)
+                return callback(True)
 
         result = self.__api_client.call_api(resource_path=resource_path,
                                             method='POST',
                                             body=body,
                                             callback=wrapped_callback)
-        # handle 200 status code errors
-        error_code = result['body']['data'].get('error_code')
+        if callback:
+            return result
+
+        self.__validate_payment_response(result, amount, target_user_id, used_default_funding_source)
+        # if no exception raises, then it was successful
+        return True
+
+    def __validate_payment_response(self, response, amount, target_user_id, used_default_funding_source=False):
+        """
+        Raise the matching exception if Venmo reported an error with a 200 status code
+        :param response: <dict> api_client response of the payment
+        :param amount:
+        :param target_user_id:
+        :param used_default_funding_source: <bool> The funding source was resolved from the cached payment methods
+        :return:
+        """
+        error_code = response['body']['data'].get('error_code')
         if error_code:
+            # The default funding source may have changed since it was cached
+            if used_default_funding_source and self.__refresh_funding_source_on_error:
+                self.invalidate_payment_methods()
+
             if error_code == self.__payment_error_codes['not_enough_balance_error']:
                 raise NotEnoughBalanceError(amount, target_user_id)
 
-            error = result['body']['data']
+            error = response['body']['data']
             raise GeneralPaymentError(f"{error.get('title')}\n{error.get('error_msg')}")
 
-        if callback:
-            return
-        # if no exception raises, then it was successful
-        return True
-
-    def get_default_payment_method(self) -> PaymentMethod:
+    def get_default_payment_method(self, force_update=False) -> PaymentMethod:
         """
         Search in all payment_methods and find the one that has payment_role of Default
+        :param force_update: <bool> Skip the cached payment methods.
         :return:
         """
-        payment_methods = self.get_payment_methods()
+        payment_methods = self.get_payment_methods(force_update=force_update)
 
         for p_method in payment_methods:
             if not p_method:
@@ -1,13 +1,108 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+# Whether the models built in the current thread or task keep their raw JSON, see BaseModel.keeping_json
+_keep_json = ContextVar('venmo_api_keep_json', default=True)
+
+
 class BaseModel(object):
-    def __init__(self):
-        self._json = None
+    # The models are slotted: no per-instance __dict__. The models built by deserialize(keep_json=False) (the apis
+    # of a Client(keep_json=False)) drop their raw JSON; to_json() then rebuilds it from the attributes.
+    __slots__ = ('_json', '_lazy')
+    # Loader of each field of a lazy model: {field name: function(parser, identity_map) -> value}
+    _lazy_fields = {}
+
+    def __init__(self, json=None):
+        self._json = json if _keep_json.get() else None
+
+    @staticmethod
+    @contextmanager
+    def keeping_json(keep_json: bool = True):
+        """
+        The models built inside the block (in this thread or task) keep their raw JSON, or not.
+        :param keep_json: <bool>
+        """
+        token = _keep_json.set(keep_json)
+        try:
+            yield
+        finally:
+            _keep_json.reset(token)
+
+    @classmethod
+    def _new_lazy(cls, parser, identity_map=None):
+        """
+        Create a model whose fields are parsed from the [parser] on first access, instead of in from_json.
+        :param parser: the JSONSchema parser of the raw JSON
+        :param identity_map: <IdentityMap> [optional] shares the nested users
+        :return: the lazy model
+        """
+        model = cls.__new__(cls)
+        model._json = parser.json if _keep_json.get() else None
+        model._lazy = (parser, identity_map)
+        return model
+
+    def __getattr__(self, name):
+        # Only called for an empty slot: parse the field of a lazy model the first time it is read
+        try:
+            lazy = object.__getattribute__(self, '_lazy')
+        except AttributeError:
+            lazy = None
+
+        loader = self._lazy_fields.get(name) if lazy else None
+        if loader is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        value = loader(*lazy)
+        setattr(self, name, value)
+        return value
+
+    def __getstate__(self):
+        # Copy and pickle support: the fields of a lazy model are all parsed first, as its parser and identity map
+        # are not copied along
+        if self._lazy_fields and hasattr(self, '_lazy'):
+            for name in self._lazy_fields:
+                getattr(self, name)
+
+        slots = {name: getattr(self, name) for name in _get_slots(type(self), private=True)
+                 if name != '_lazy' and hasattr(self, name)}
+        return getattr(self, '__dict__', None), slots
 
     def __str__(self):
         return f"{type(self).__name__}:" \
-               f" ({', '.join('%s=%s' % item for item in vars(self).items() if not item[0].startswith('_'))})"
+               f" ({', '.join('%s=%s' % item for item in self.__get_fields().items())})"
 
     def to_json(self, original=True):
         if self._json and original:
             return self._json
 
-        return dict(filter(lambda x: not x[0].startswith('_'), vars(self).items()))
+        return self.__get_fields()
+
+    def __get_fields(self):
+        """
+        Public attributes of the model, from its slots (and its __dict__, for models that are not slotted)
+        :return: <dict>
+        """
+        fields = {name: getattr(self, name) for name in _get_slots(type(self)) if hasattr(self, name)}
+        fields.update((name, value) for name, value in getattr(self, '__dict__', {}).items()
+                      if not name.startswith('_'))
+        return fields
+
+
+@lru_cache(maxsize=None)
+def _get_slots(cls, private=False):
+    """
+    Slot names of the class and its bases, base classes first
+    :param cls: <type>
+    :param private: <bool> Include the private slots (e.g. _json), but never __weakref__ and __dict__
+    :return: <tuple>
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ('__weakref__', '__dict__') or name.startswith('_') and not private:
+                continue
+            if name not in names:
+                names.append(name)
+    return tuple(names)
@@ -1,7 +1,16 @@
-from venmo_api import string_to_timestamp, BaseModel, User, Mention, JSONSchema
+from venmo_api import string_to_timestamp, BaseModel, User, Mention, JSONSchema, IdentityMap
 
 
 class Comment(BaseModel):
+    __slots__ = ('id', 'message', 'user', 'date_created', 'mentions')
+    _lazy_fields = {
+        'id': lambda parser, identity_map: parser.get_id(),
+        'message': lambda parser, identity_map: parser.get_message(),
+        'user': lambda parser, identity_map: User.from_json(parser.get_user(), identity_map=identity_map, lazy=True),
+        'date_created': lambda parser, identity_map: string_to_timestamp(parser.get_date_created()),
+        'mentions': lambda parser, identity_map: [Mention.from_json(mention, identity_map=identity_map, lazy=True)
+                                                  for mention in parser.get_mentions() or []]
+    }
 
     def __init__(self, id_, message, date_created, mentions, user, json=None):
         """
@@ -13,7 +22,7 @@ class Comment(BaseModel):
         :param user:
         :param json:
         """
-        super().__init__()
+        super().__init__(json=json)
 
         self.id = id_
         self.message = message
@@ -22,13 +31,14 @@ class Comment(BaseModel):
         self.date_created = date_created
 
         self.mentions = mentions
-        self._json = json
 
     @classmethod
-    def from_json(cls, json):
+    def from_json(cls, json, identity_map: IdentityMap = None, lazy: bool = False):
         """
         Create a new Comment from the given json.
         :param json:
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :param lazy: <bool> Parse each field (and nested model) on its first access instead of now.
         :return:
         """
 
@@ -37,12 +47,36 @@ class Comment(BaseModel):
 
         parser = JSONSchema.comment(json)
 
+        if lazy:
+            return cls._new_lazy(parser, identity_map)
+
         mentions_list = parser.get_mentions()
-        mentions = [Mention.from_json(mention) for mention in mentions_list] if mentions_list else []
+        mentions = [Mention.from_json(mention, identity_map=identity_map)
+                    for mention in mentions_list] if mentions_list else []
 
         return cls(id_=parser.get_id(),
                    message=parser.get_message(),
                    date_created=string_to_timestamp(parser.get_date_created()),
                    mentions=mentions,
-                   user=User.from_json(parser.get_user()),
+                   user=User.from_json(parser.get_user(), identity_map=identity_map),
                    json=json)
+
+    @classmethod
+    def from_struct(cls, struct, identity_map: IdentityMap = None):
+        """
+        Create a new Comment (and its mentions) from its typed_schema struct.
+        :param struct: <CommentStruct>
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :return:
+        """
+        if struct is None:
+            return
+
+        mentions = [Mention.from_struct(mention, identity_map=identity_map)
+                    for mention in struct.mentions.data] if struct.mentions else []
+
+        return cls(id_=struct.id,
+                   message=struct.message,
+                   date_created=string_to_timestamp(struct.date_created),
+                   mentions=mentions,
+                   user=User.from_struct(struct.user, identity_map=identity_map))
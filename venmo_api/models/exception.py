@@ -31,22 +31,39 @@ class ResourceNotFoundError(Exception):
 
 class HttpCodeError(Exception):
     """When status code is anything except 400 and 200s"""
-    def __init__(self, response=None, msg: str = None):
+    def __init__(self, response=None, msg: str = None, status_code: int = None, body=None):
         if response is None and msg is None:
             raise Exception("Neither response nor message for creating HttpCodeError was passed.")
-        status_code = response.status_code or "NA"
-        reason = response.reason or "Unknown reason"
-        try:
-            json = response.json()
-        except JSONDecodeError:
-            json = "Invalid Json"
-
-        self.msg = msg or f"HTTP Status code is invalid. Could not make the request because -> "\
-            f"{status_code} {reason}.\nError: {json}"
+        # The response is a requests.Response or an aiohttp.ClientResponse, body is its decoded JSON
+        self.response = response
+        if status_code is None:
+            status_code = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+        self.status_code = status_code
+        self.body = body
+        if msg is None:
+            status_code = response.status_code or "NA"
+            reason = response.reason or "Unknown reason"
+            try:
+                json = response.json()
+            except JSONDecodeError:
+                json = "Invalid Json"
+
+            msg = f"HTTP Status code is invalid. Could not make the request because -> "\
+                f"{status_code} {reason}.\nError: {json}"
+
+        self.msg = msg
 
         super(HttpCodeError, self).__init__(self.msg)
 
 
+class WorkerPoolFullError(Exception):
+    """Raised when an async call can't be queued because all the workers are busy and the queue is full"""
+
+    def __init__(self, msg: str = None, max_pending: int = None):
+        self.msg = msg or f"Too many async calls in flight. The queue of {max_pending} pending calls is full."
+        super(WorkerPoolFullError, self).__init__(self.msg)
+
+
 # ======= Methods Exceptions =======
 
 class InvalidArgumentError(Exception):
@@ -104,5 +121,5 @@ class GeneralPaymentError(Exception):
 __all__ = ["AuthenticationFailedError", "InvalidArgumentError", "InvalidHttpMethodError", "ArgumentMissingError",
            "JSONDecodeError", "ResourceNotFoundError", "HttpCodeError", "NoPaymentMethodFoundError",
            "AlreadyRemindedPaymentError", "NoPendingPaymentToUpdateError", "NotEnoughBalanceError",
-           "GeneralPaymentError"
+           "GeneralPaymentError", "WorkerPoolFullError"
            ]
@@ -1,7 +1,12 @@
-from venmo_api import BaseModel, User, JSONSchema
+from venmo_api import BaseModel, User, JSONSchema, IdentityMap
 
 
 class Mention(BaseModel):
+    __slots__ = ('username', 'user')
+    _lazy_fields = {
+        'username': lambda parser, identity_map: parser.get_username(),
+        'user': lambda parser, identity_map: User.from_json(parser.get_user(), identity_map=identity_map, lazy=True)
+    }
 
     def __init__(self, username, user, json=None):
         """
@@ -9,18 +14,18 @@ class Mention(BaseModel):
         :param username:
         :param user:
         """
-        super().__init__()
+        super().__init__(json=json)
 
         self.username = username
         self.user = user
 
-        self._json = json
-
     @classmethod
-    def from_json(cls, json):
+    def from_json(cls, json, identity_map: IdentityMap = None, lazy: bool = False):
         """
         Create a new Mention from the given json.
         :param json:
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :param lazy: <bool> Parse each field (and nested model) on its first access instead of now.
         :return:
         """
 
@@ -29,6 +34,22 @@ class Mention(BaseModel):
 
         parser = JSONSchema.mention(json)
 
+        if lazy:
+            return cls._new_lazy(parser, identity_map)
+
         return cls(username=parser.get_username(),
-                   user=User.from_json(parser.get_user()),
+                   user=User.from_json(parser.get_user(), identity_map=identity_map),
                    json=json)
+
+    @classmethod
+    def from_struct(cls, struct, identity_map: IdentityMap = None):
+        """
+        Create a new Mention from its typed_schema struct.
+        :param struct: <MentionStruct>
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :return:
+        """
+        if struct is None:
+            return
+
+        return cls(username=struct.username, user=User.from_struct(struct.user, identity_map=identity_map))
@@ -1,8 +1,24 @@
-from venmo_api import string_to_timestamp, User, BaseModel, JSONSchema
+from venmo_api import string_to_timestamp, User, BaseModel, JSONSchema, IdentityMap
 from enum import Enum
 
 
 class Payment(BaseModel):
+    __slots__ = ('id', 'actor', 'target', 'action', 'amount', 'audience', 'date_created', 'date_reminded',
+                 'date_completed', 'note', 'status')
+    _lazy_fields = {
+        'id': lambda parser, identity_map: parser.get_id(),
+        'actor': lambda parser, identity_map: User.from_json(parser.get_actor(), identity_map=identity_map, lazy=True),
+        'target': lambda parser, identity_map: User.from_json(parser.get_target(), identity_map=identity_map,
+                                                              lazy=True),
+        'action': lambda parser, identity_map: parser.get_action(),
+        'amount': lambda parser, identity_map: parser.get_amount(),
+        'audience': lambda parser, identity_map: parser.get_audience(),
+        'date_created': lambda parser, identity_map: string_to_timestamp(parser.get_date_created()),
+        'date_reminded': lambda parser, identity_map: string_to_timestamp(parser.get_date_reminded()),
+        'date_completed': lambda parser, identity_map: string_to_timestamp(parser.get_date_completed()),
+        'note': lambda parser, identity_map: parser.get_note(),
+        'status': lambda parser, identity_map: PaymentStatus(parser.get_status())
+    }
 
     def __init__(self, id_, actor, target, action, amount, audience, date_created, date_reminded, date_completed,
                  note, status, json=None):
@@ -21,7 +37,7 @@ class Payment(BaseModel):
         :param status:
         :param json:
         """
-        super().__init__()
+        super().__init__(json=json)
         self.id = id_
         self.actor = actor
         self.target = target
@@ -33,13 +49,14 @@ class Payment(BaseModel):
         self.date_completed = date_completed
         self.note = note
         self.status = status
-        self._json = json
 
     @classmethod
-    def from_json(cls, json):
+    def from_json(cls, json, identity_map: IdentityMap = None, lazy: bool = False):
         """
         init a new Payment form JSON
         :param json:
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :param lazy: <bool> Parse each field (and nested model) on its first access instead of now.
         :return:
         """
         if not json:
@@ -47,10 +64,13 @@ class Payment(BaseModel):
 
         parser = JSONSchema.payment(json)
 
+        if lazy:
+            return cls._new_lazy(parser, identity_map)
+
         return cls(
             id_=parser.get_id(),
-            actor=User.from_json(parser.get_actor()),
-            target=User.from_json(parser.get_target()),
+            actor=User.from_json(parser.get_actor(), identity_map=identity_map),
+            target=User.from_json(parser.get_target(), identity_map=identity_map),
             action=parser.get_action(),
             amount=parser.get_amount(),
             audience=parser.get_audience(),
@@ -62,6 +82,31 @@ class Payment(BaseModel):
             json=json
         )
 
+    @classmethod
+    def from_struct(cls, struct, identity_map: IdentityMap = None):
+        """
+        init a new Payment from its typed_schema struct
+        :param struct: <PaymentStruct>
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :return:
+        """
+        if struct is None:
+            return
+
+        return cls(
+            id_=struct.id,
+            actor=User.from_struct(struct.actor, identity_map=identity_map),
+            target=User.from_struct(struct.target.user if struct.target else None, identity_map=identity_map),
+            action=struct.action,
+            amount=struct.amount,
+            audience=struct.audience,
+            date_created=string_to_timestamp(struct.date_created),
+            date_reminded=string_to_timestamp(struct.date_reminded),
+            date_completed=string_to_timestamp(struct.date_completed),
+            note=struct.note,
+            status=PaymentStatus(struct.status)
+        )
+
 
 class PaymentStatus(Enum):
     SETTLED = 'settled'
@@ -5,6 +5,8 @@ import logging
 
 
 class PaymentMethod(BaseModel):
+    __slots__ = ('id', 'role', 'name', 'type')
+
     def __init__(self, pid: str, p_role: str, p_name: str, p_type: str, json=None):
         """
         Payment method model (with different types like, venmo balance, bank account, ...)
@@ -14,17 +16,21 @@ class PaymentMethod(BaseModel):
         :param p_type:
         :param json:
         """
-        super().__init__()
+        super().__init__(json=json)
 
         self.id = pid
         self.role = PaymentRole(p_role)
         self.name = p_name
         self.type = payment_type.get(p_type)
-        self._json = json
 
     @classmethod
-    def from_json(cls, json: Dict):
-
+    def from_json(cls, json: Dict, identity_map=None, lazy: bool = False):
+        """
+        :param json:
+        :param identity_map: Unused, payment methods hold no users. Accepted like the other models' from_json.
+        :param lazy: Unused, payment methods are always parsed right away.
+        :return:
+        """
         payment_parser = JSONSchema.payment_method(json)
 
         pid = payment_parser.get_id()
@@ -46,15 +52,21 @@ class PaymentMethod(BaseModel):
 
 
 class VenmoBalance(PaymentMethod, BaseModel):
+    __slots__ = ()
+
     def __init__(self, pid, p_role, p_name, p_type, json=None):
         super().__init__(pid, p_role, p_name, p_type, json)
 
 
 class BankAccount(PaymentMethod, BaseModel):
+    __slots__ = ()
+
     def __init__(self, pid, p_role, p_name, p_type, json=None):
         super().__init__(pid, p_role, p_name, p_type, json)
 
 class Card(PaymentMethod, BaseModel):
+    __slots__ = ()
+
     def __init__(self, pid, p_role, p_name, p_type, json=None):
         super().__init__(pid, p_role, p_name, p_type, json)
 
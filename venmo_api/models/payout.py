@@ -0,0 +1,80 @@
+from venmo_api import BaseModel, PaymentPrivacy
+from enum import Enum
+
+
+class Payout(BaseModel):
+    __slots__ = ('amount', 'note', 'target_user_id', 'action', 'privacy_setting', 'funding_source_id', 'key')
+
+    def __init__(self, amount: float, note: str, target_user_id: str,
+                 action: 'PayoutAction' = None,
+                 privacy_setting: PaymentPrivacy = PaymentPrivacy.PRIVATE,
+                 funding_source_id: str = None,
+                 key: str = None):
+        """
+        One payment of a payout batch
+        :param amount: <float>
+        :param note: <str>
+        :param target_user_id: <str>
+        :param action: <PayoutAction> SEND (default) or REQUEST
+        :param privacy_setting: <PaymentPrivacy>
+        :param funding_source_id: <str> [optional] Defaults to the funding source resolved for the batch.
+        :param key: <str> [optional] Unique key of this payout in the checkpoint file. Pass a stable key
+        (e.g. your own invoice id) if the list of payouts may change between runs.
+        """
+        super().__init__()
+
+        self.amount = amount
+        self.note = note
+        self.target_user_id = str(target_user_id)
+        self.action = action or PayoutAction.SEND
+        self.privacy_setting = privacy_setting
+        self.funding_source_id = funding_source_id
+        self.key = key
+
+    def get_default_key(self) -> str:
+        return f"{self.action.value}:{self.target_user_id}:{self.amount}:{self.note}"
+
+
+class PayoutResult(BaseModel):
+    __slots__ = ('payout', 'status', 'error', 'error_message', 'resumed')
+
+    def __init__(self, payout: Payout, status: 'PayoutStatus', error: Exception = None,
+                 error_message: str = None, resumed: bool = False):
+        """
+        Outcome of one payout of a batch
+        :param payout: <Payout>
+        :param status: <PayoutStatus>
+        :param error: <Exception> [optional] The exception raised by the payment.
+        :param error_message: <str> [optional] The error message, kept in the checkpoint file.
+        :param resumed: <bool> The outcome was read from the checkpoint of a previous run, the payout wasn't sent.
+        """
+        super().__init__()
+
+        self.payout = payout
+        self.status = status
+        self.error = error
+        self.error_message = error_message or (str(error) if error else None)
+        self.resumed = resumed
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status is PayoutStatus.SUCCEEDED
+
+
+class PayoutAction(Enum):
+    SEND = 'send'
+    REQUEST = 'request'
+
+
+class PayoutStatus(Enum):
+    SUCCEEDED = 'succeeded'
+    # NotEnoughBalanceError
+    NOT_ENOUGH_BALANCE = 'not_enough_balance'
+    # GeneralPaymentError
+    PAYMENT_ERROR = 'payment_error'
+    # The payment was rejected (4xx) or never sent (invalid arguments, connection refused or timed out)
+    FAILED = 'failed'
+    # The request may or may not have reached Venmo (e.g. connection lost, 5xx, invalid response, or the process
+    # died mid-payment).
+    # Check your Venmo history before sending it again.
+    UNKNOWN = 'unknown'
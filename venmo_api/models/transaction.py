@@ -1,8 +1,30 @@
-from venmo_api import string_to_timestamp, BaseModel, User, Comment, get_phone_model_from_json, JSONSchema
+from venmo_api import string_to_timestamp, BaseModel, User, Comment, get_phone_model_from_json, JSONSchema, \
+    IdentityMap
 from enum import Enum
 
 
 class Transaction(BaseModel):
+    __slots__ = ('id', 'payment_id', 'date_completed', 'date_created', 'date_updated', 'payment_type', 'amount',
+                 'audience', 'status', 'note', 'device_used', 'comments', 'actor', 'target')
+    _lazy_fields = {
+        'id': lambda parser, identity_map: parser.get_story_id(),
+        'payment_id': lambda parser, identity_map: parser.get_payment_id(),
+        'date_completed': lambda parser, identity_map: string_to_timestamp(parser.get_date_completed()),
+        'date_created': lambda parser, identity_map: string_to_timestamp(parser.get_date_created()),
+        'date_updated': lambda parser, identity_map: string_to_timestamp(parser.get_date_updated()),
+        'payment_type': lambda parser, identity_map: parser.get_type(),
+        'amount': lambda parser, identity_map: parser.get_amount(),
+        'audience': lambda parser, identity_map: parser.get_audience(),
+        'status': lambda parser, identity_map: parser.get_status(),
+        'note': lambda parser, identity_map: parser.get_story_note(),
+        'device_used': lambda parser, identity_map: get_phone_model_from_json(parser.get_actor_app()),
+        'comments': lambda parser, identity_map: [Comment.from_json(json=comment, identity_map=identity_map, lazy=True)
+                                                  for comment in parser.get_comments() or []],
+        'actor': lambda parser, identity_map: User.from_json(json=parser.get_actor(), identity_map=identity_map,
+                                                             lazy=True),
+        'target': lambda parser, identity_map: User.from_json(json=parser.get_target(), identity_map=identity_map,
+                                                              lazy=True)
+    }
 
     def __init__(self, story_id, payment_id, date_completed, date_created,
                  date_updated, payment_type, amount, audience, status,
@@ -25,7 +47,7 @@ class Transaction(BaseModel):
         :param comments:
         :param json:
         """
-        super().__init__()
+        super().__init__(json=json)
 
         self.id = story_id
         self.payment_id = payment_id
@@ -45,14 +67,15 @@ class Transaction(BaseModel):
 
         self.actor = actor
         self.target = target
-        self._json = json
 
     @classmethod
-    def from_json(cls, json):
+    def from_json(cls, json, identity_map: IdentityMap = None, lazy: bool = False):
         """
         Create a new Transaction from the given json.
         This only works for transactions, skipping refunds and bank transfers.
         :param json:
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :param lazy: <bool> Parse each field (and nested model) on its first access instead of now.
         :return:
         """
 
@@ -66,15 +89,19 @@ class Transaction(BaseModel):
         if transaction_type is not TransactionType.PAYMENT:
             return
 
+        if lazy:
+            return cls._new_lazy(parser, identity_map)
+
         date_created = string_to_timestamp(parser.get_date_created())
         date_updated = string_to_timestamp(parser.get_date_updated())
         date_completed = string_to_timestamp(parser.get_date_completed())
-        target = User.from_json(json=parser.get_target())
-        actor = User.from_json(json=parser.get_actor())
+        target = User.from_json(json=parser.get_target(), identity_map=identity_map)
+        actor = User.from_json(json=parser.get_actor(), identity_map=identity_map)
         device_used = get_phone_model_from_json(parser.get_actor_app())
 
         comments_list = parser.get_comments()
-        comments = [Comment.from_json(json=comment) for comment in comments_list] if comments_list else []
+        comments = [Comment.from_json(json=comment, identity_map=identity_map)
+                    for comment in comments_list] if comments_list else []
 
         return cls(story_id=parser.get_story_id(),
                    payment_id=parser.get_payment_id(),
@@ -92,6 +119,38 @@ class Transaction(BaseModel):
                    comments=comments,
                    json=json)
 
+    @classmethod
+    def from_struct(cls, struct, identity_map: IdentityMap = None):
+        """
+        Create a new Transaction (with its users, comments and mentions) from its typed_schema story struct.
+        Like from_json, only the payment stories make a Transaction.
+        :param struct: <StoryStruct>
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id.
+        :return:
+        """
+        if struct is None or TransactionType(struct.type) is not TransactionType.PAYMENT or struct.payment is None:
+            return
+
+        payment = struct.payment
+        comments = [Comment.from_struct(comment, identity_map=identity_map)
+                    for comment in struct.comments.data] if struct.comments else []
+
+        return cls(story_id=struct.id,
+                   payment_id=payment.id,
+                   date_completed=string_to_timestamp(payment.date_completed),
+                   date_created=string_to_timestamp(struct.date_created),
+                   date_updated=string_to_timestamp(struct.date_updated),
+                   payment_type=payment.action,
+                   amount=payment.amount,
+                   audience=struct.audience,
+                   note=payment.note,
+                   status=payment.status,
+                   device_used=get_phone_model_from_json({'id': struct.app.id} if struct.app else None),
+                   actor=User.from_struct(payment.actor, identity_map=identity_map),
+                   target=User.from_struct(payment.target.user if payment.target else None,
+                                           identity_map=identity_map),
+                   comments=comments)
+
 
 class TransactionType(Enum):
     PAYMENT = 'payment'
@@ -0,0 +1,83 @@
+from typing import List, Optional, Union
+import msgspec
+
+# msgspec structs of the Venmo JSON, the typed counterpart of json_schema. Only the fields the models use are
+# declared, msgspec skips the others while decoding.
+
+
+class UserStruct(msgspec.Struct):
+    id: str
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    display_name: Optional[str] = None
+    phone: Optional[str] = None
+    profile_picture_url: Optional[str] = None
+    about: Optional[str] = None
+    date_joined: Optional[str] = None
+    is_group: Optional[bool] = None
+    is_active: Optional[bool] = None
+
+
+class MentionStruct(msgspec.Struct):
+    username: Optional[str] = None
+    user: Optional[UserStruct] = None
+
+
+class MentionsStruct(msgspec.Struct):
+    data: List[MentionStruct] = []
+
+
+class CommentStruct(msgspec.Struct):
+    id: Union[str, int, None] = None
+    message: Optional[str] = None
+    date_created: Optional[str] = None
+    user: Optional[UserStruct] = None
+    mentions: Optional[MentionsStruct] = None
+
+
+class CommentsStruct(msgspec.Struct):
+    data: List[CommentStruct] = []
+
+
+class TargetStruct(msgspec.Struct):
+    user: Optional[UserStruct] = None
+
+
+class AppStruct(msgspec.Struct):
+    id: Union[int, str] = 0
+
+
+class PaymentStruct(msgspec.Struct):
+    id: str
+    status: Optional[str] = None
+    action: Optional[str] = None
+    amount: Optional[float] = None
+    audience: Optional[str] = None
+    note: Optional[str] = None
+    date_created: Optional[str] = None
+    date_reminded: Optional[str] = None
+    date_completed: Optional[str] = None
+    actor: Optional[UserStruct] = None
+    target: Optional[TargetStruct] = None
+
+
+class StoryStruct(msgspec.Struct):
+    id: str
+    type: str
+    date_created: Optional[str] = None
+    date_updated: Optional[str] = None
+    audience: Optional[str] = None
+    app: Optional[AppStruct] = None
+    comments: Optional[CommentsStruct] = None
+    payment: Optional[PaymentStruct] = None
+
+
+def get_envelope(struct_type):
+    """
+    The struct of a response body whose 'data' is one [struct_type] or a list of them
+    :param struct_type: <type>
+    :return: <type>
+    """
+    return msgspec.defstruct(f"{struct_type.__name__}Envelope",
+                             [('data', Union[List[struct_type], struct_type, None], None)])
@@ -1,7 +1,22 @@
-from venmo_api import string_to_timestamp, BaseModel, JSONSchema
+from venmo_api import string_to_timestamp, BaseModel, JSONSchema, IdentityMap
 
 
 class User(BaseModel):
+    __slots__ = ('id', 'username', 'first_name', 'last_name', 'display_name', 'phone', 'profile_picture_url', 'about',
+                 'date_joined', 'is_group', 'is_active', '__weakref__')
+    _lazy_fields = {
+        'id': lambda parser, identity_map: parser.get_user_id(),
+        'username': lambda parser, identity_map: parser.get_username(),
+        'first_name': lambda parser, identity_map: parser.get_first_name(),
+        'last_name': lambda parser, identity_map: parser.get_last_name(),
+        'display_name': lambda parser, identity_map: parser.get_full_name(),
+        'phone': lambda parser, identity_map: parser.get_phone(),
+        'profile_picture_url': lambda parser, identity_map: parser.get_picture_url(),
+        'about': lambda parser, identity_map: parser.get_about(),
+        'date_joined': lambda parser, identity_map: string_to_timestamp(parser.get_date_created()),
+        'is_group': lambda parser, identity_map: parser.get_is_group(),
+        'is_active': lambda parser, identity_map: parser.get_is_active()
+    }
 
     def __init__(self, user_id, username, first_name, last_name, display_name, phone,
                  profile_picture_url, about, date_joined, is_group, is_active, json=None):
@@ -21,7 +36,7 @@ class User(BaseModel):
         :param json: full_json
         :return:
         """
-        super().__init__()
+        super().__init__(json=json)
 
         self.id = user_id
         self.username = username
@@ -34,14 +49,15 @@ class User(BaseModel):
         self.date_joined = date_joined
         self.is_group = is_group
         self.is_active = is_active
-        self._json = json
 
     @classmethod
-    def from_json(cls, json, is_profile=False):
+    def from_json(cls, json, is_profile=False, identity_map: IdentityMap = None, lazy: bool = False):
         """
         init a new user form JSON
         :param json:
         :param is_profile:
+        :param identity_map: <IdentityMap> [optional] Return the user already built for this id, if any.
+        :param lazy: <bool> Parse each field on its first access instead of now.
         :return:
         """
         if not json:
@@ -49,6 +65,54 @@ class User(BaseModel):
 
         parser = JSONSchema.user(json, is_profile=is_profile)
 
+        if identity_map is not None:
+            user = identity_map.get(parser.get_user_id())
+            if user is not None:
+                return user
+
+        if lazy:
+            user = cls._new_lazy(parser)
+        else:
+            user = cls.__build(parser, json)
+
+        if identity_map is not None:
+            user = identity_map.setdefault(parser.get_user_id(), user)
+        return user
+
+    @classmethod
+    def from_struct(cls, struct, identity_map: IdentityMap = None):
+        """
+        init a new user from its typed_schema struct (decoded by TypedDecoder), the raw JSON is not kept
+        :param struct: <UserStruct>
+        :param identity_map: <IdentityMap> [optional] Return the user already built for this id, if any.
+        :return:
+        """
+        if struct is None:
+            return
+
+        if identity_map is not None:
+            user = identity_map.get(struct.id)
+            if user is not None:
+                return user
+
+        user = cls(user_id=struct.id,
+                   username=struct.username,
+                   first_name=struct.first_name,
+                   last_name=struct.last_name,
+                   display_name=struct.display_name,
+                   phone=struct.phone,
+                   profile_picture_url=struct.profile_picture_url,
+                   about=struct.about,
+                   date_joined=string_to_timestamp(struct.date_joined),
+                   is_group=struct.is_group,
+                   is_active=struct.is_active)
+
+        if identity_map is not None:
+            user = identity_map.setdefault(struct.id, user)
+        return user
+
+    @classmethod
+    def __build(cls, parser, json):
         date_joined_timestamp = string_to_timestamp(parser.get_date_created())
 
         return cls(user_id=parser.get_user_id(),
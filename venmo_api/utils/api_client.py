@@ -1,8 +1,12 @@
-from venmo_api import ResourceNotFoundError, InvalidHttpMethodError, HttpCodeError, validate_access_token
-from json import JSONDecodeError
-from typing import List
+from venmo_api import ResourceNotFoundError, InvalidHttpMethodError, HttpCodeError, validate_access_token, \
+    WorkerPool, PoolConfig, PooledHTTPAdapter, RateLimiter, RetryPolicy, HttpCache, SingleFlight, \
+    SharedResponse, RequestInfo, ApiResponse, MetricsCollector, JsonDecoder
+from venmo_api.utils.instrumentation import run_hooks
+from concurrent.futures import Future
+from typing import List, Union
 import requests
 import threading
+import time
 
 
 class ApiClient(object):
@@ -10,9 +14,25 @@ class ApiClient(object):
     Generic API Client for the Venmo API
     """
 
-    def __init__(self, access_token=None):
+    def __init__(self, access_token=None, max_workers: int = 8, max_pending_calls: int = 64,
+                 block_when_full: bool = True, pool_config: PoolConfig = None,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, http_cache: HttpCache = None,
+                 coalesce_requests: bool = True, metrics: MetricsCollector = None, json_decoder: JsonDecoder = None):
         """
         :param access_token: <str> access token you received for your account.
+        :param max_workers: <int> Number of worker threads that run the async (callback) calls.
+        :param max_pending_calls: <int> Number of async calls that can wait for a free worker.
+        :param block_when_full: <bool> Block the caller when the queue is full, or raise WorkerPoolFullError.
+        :param pool_config: <PoolConfig> [optional] Connection pool size, timeouts and keep-alive settings.
+        :param rate_limiter: <RateLimiter> [optional] Every request (and retry) of this client takes a token from it.
+        :param retry_policy: <RetryPolicy> [optional] When to retry throttled or failed requests. Defaults to
+        RetryPolicy(), pass RetryPolicy(max_retries=0) to disable the retries.
+        :param http_cache: <HttpCache> [optional] Cache for the GET responses, revalidated with ETag/Last-Modified.
+        :param coalesce_requests: <bool> Identical GETs made at the same time (from any thread) share one request,
+        and one deserialized result.
+        :param metrics: <MetricsCollector> [optional] Collects the timings, sizes and status codes of the requests.
+        :param json_decoder: <JsonDecoder> [optional] Decodes the response bodies. Defaults to the fastest installed
+        backend (orjson, msgspec, then json).
         """
         super().__init__()
 
@@ -25,24 +45,112 @@ class ApiClient(object):
         if self.access_token:
             self.default_headers.update({"Authorization": self.access_token})
 
+        # All the sessions (main thread and workers) share one adapter, and therefore one connection pool
+        self.pool_config = pool_config or PoolConfig()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.http_cache = http_cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.metrics = metrics
+        self.json_decoder = json_decoder or JsonDecoder()
+        self.__pre_request_hooks = []
+        self.__post_request_hooks = [metrics.after_request] if metrics else []
+        self.__adapter = self.__build_adapter(self.pool_config)
+
+        self.__worker_pool_config = {"max_workers": max_workers,
+                                     "max_pending": max_pending_calls,
+                                     "block": block_when_full}
+        self.__worker_pool = None
+        self.__worker_pool_lock = threading.Lock()
+        self.__state_lock = threading.Lock()
+        self.__local = threading.local()
+
+        # Every thread gets its own session (this one is the creating thread's), the headers are sent per request
         self.session = requests.Session()
-        self.session.headers.update(self.default_headers)
+        self.__mount_adapter(self.session)
+        self.__local.session = self.session
+        # Thread -> its session, for configure_pool() and shutdown(). The threads that exited are dropped.
+        self.__thread_sessions = {threading.current_thread(): self.session}
+
+    @property
+    def last_response(self):
+        """
+        The last response received by the current thread (a worker thread for the calls with a callback)
+        :return: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>} or <NoneType>
+        """
+        return getattr(self.__local, 'last_response', None)
 
     def update_access_token(self, access_token):
-        self.access_token = validate_access_token(access_token=access_token)
-        self.default_headers.update({"Authorization": self.access_token})
-        self.session.headers.update({"Authorization": self.access_token})
+        access_token = validate_access_token(access_token=access_token)
+        with self.__state_lock:
+            # Replaced, not mutated: a call reads default_headers once, so it sends either the old or the new token
+            self.default_headers = {**self.default_headers, "Authorization": access_token}
+            self.access_token = access_token
+
+    def add_pre_request_hook(self, hook):
+        """
+        Call [hook] with the RequestInfo of every request, before it is sent (and before the cache lookup).
+        :param hook: <function> hook(request_info), its exceptions are logged and ignored.
+        :return:
+        """
+        with self.__state_lock:
+            self.__pre_request_hooks = self.__pre_request_hooks + [hook]
+
+    def add_post_request_hook(self, hook):
+        """
+        Call [hook] with the RequestInfo of every request once it is done (failed ones included),
+        with its timings, status code, response size and retries.
+        :param hook: <function> hook(request_info), its exceptions are logged and ignored.
+        :return:
+        """
+        with self.__state_lock:
+            self.__post_request_hooks = self.__post_request_hooks + [hook]
+
+    def remove_request_hook(self, hook):
+        """
+        Remove a pre or post request hook
+        :param hook: <function>
+        :return:
+        """
+        with self.__state_lock:
+            self.__pre_request_hooks = [other for other in self.__pre_request_hooks if other != hook]
+            self.__post_request_hooks = [other for other in self.__post_request_hooks if other != hook]
+
+    def configure_pool(self, pool_config: PoolConfig):
+        """
+        Replace the connection pool with a new one built from [pool_config].
+        The connections of the previous pool are closed.
+        :param pool_config: <PoolConfig>
+        :return:
+        """
+        adapter = self.__build_adapter(pool_config)
+
+        with self.__worker_pool_lock:
+            old_adapter, self.__adapter = self.__adapter, adapter
+            self.pool_config = pool_config
+            for session in self.__thread_sessions.values():
+                self.__mount_adapter(session)
+
+        old_adapter.close()
+
+    def get_pool_stats(self) -> dict:
+        """
+        Connection pool usage since the pool was built.
+        :return: <dict> {'requests': <int>, 'new_connections': <int>, 'reused_connections': <int>}
+        """
+        return self.__adapter.get_stats()
 
     def call_api(self, resource_path: str, method: str,
                  header_params: dict = None,
                  params: dict = None,
                  body: dict = None,
                  callback=None,
-                 ok_error_codes: List[int] = None):
+                 ok_error_codes: List[int] = None) -> Union[dict, Future]:
 
         """
         Makes the HTTP request (Synchronous) and return the deserialized data.
-        To make it async multi-threaded, define a callback function.
+        To make it async multi-threaded, define a callback function. The call then runs on the worker pool
+        and a <Future> is returned; it resolves to the return value of the callback.
 
         :param resource_path: <str> Specific Venmo API path
         :param method: <str> HTTP request method
@@ -51,7 +159,7 @@ class ApiClient(object):
         :param body: <dict> request body will be send as JSON
         :param callback: <function> Needs to be provided for async
         :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
-        :return: response: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>}
+        :return: response: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>} or <Future> if async
         """
 
         if callback is None:
@@ -59,12 +167,36 @@ class ApiClient(object):
                                    header_params=header_params, params=params,
                                    body=body, callback=callback,
                                    ok_error_codes=ok_error_codes)
-        else:
-            thread = threading.Thread(target=self.__call_api,
-                                      args=(resource_path, method, header_params,
-                                            params, body, callback))
-        thread.start()
-        return thread
+
+        return self.get_worker_pool().submit(self.__call_api, resource_path, method, header_params,
+                                             params, body, callback, ok_error_codes)
+
+    def get_worker_pool(self) -> WorkerPool:
+        """
+        Get the pool running the async calls. It is created on the first async call.
+        :return: <WorkerPool>
+        """
+        with self.__worker_pool_lock:
+            if self.__worker_pool is None:
+                self.__worker_pool = WorkerPool(**self.__worker_pool_config)
+            return self.__worker_pool
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the worker pool (if any) and close the pooled sessions.
+        :param wait: <bool> Wait for the pending async calls to finish.
+        :return:
+        """
+        with self.__worker_pool_lock:
+            worker_pool, self.__worker_pool = self.__worker_pool, None
+            sessions = list(self.__thread_sessions.values())
+
+        if worker_pool:
+            worker_pool.shutdown(wait=wait)
+
+        for session in sessions:
+            session.close()
+        self.__adapter.close()
 
     def __call_api(self, resource_path, method,
                    header_params=None, params=None,
@@ -84,38 +216,101 @@ class ApiClient(object):
         """
 
         # Update the header with the required values
-        header_params = header_params or {}
+        header_params = {**self.default_headers, **(header_params or {})}
 
         if body:
             header_params.update({"Content-Type": "application/json"})
 
         url = self.configuration['host'] + resource_path
+        flight_key = self.__get_flight_key(method, url, header_params, params, ok_error_codes)
 
-        # Use a new session for multi-threaded
-        if callback:
-            session = requests.Session()
-            session.headers.update(self.default_headers)
+        # Each thread keeps its own session, so its connections are reused by the next calls
+        session = self.__get_session()
+        request_info = self.__new_request_info(method, resource_path, url, params)
 
-        else:
-            session = self.session
+        def perform_request():
+            return self.request(method, url, session,
+                                header_params=header_params, params=params,
+                                body=body, ok_error_codes=ok_error_codes, request_info=request_info)
 
         # perform request and return response
-        processed_response = self.request(method, url, session,
-                                          header_params=header_params, params=params,
-                                          body=body, ok_error_codes=ok_error_codes)
+        if flight_key:
+            processed_response = self.single_flight.do(flight_key, lambda: SharedResponse(perform_request()))
+        else:
+            processed_response = perform_request()
 
-        self.last_response = processed_response
+        self.__local.last_response = processed_response
 
         if callback:
-            callback(processed_response)
-        else:
-            return processed_response
+            return callback(processed_response)
+
+        return processed_response
+
+    def __new_request_info(self, method, resource_path, url, params):
+        """
+        The RequestInfo of a new request, or None if nothing listens to it
+        :return: <RequestInfo> or <NoneType>
+        """
+        if not self.__pre_request_hooks and not self.__post_request_hooks:
+            return None
+
+        return RequestInfo(method, resource_path, url, params,
+                           deserialize_listeners=[self.metrics.after_deserialize] if self.metrics else None)
+
+    def __get_flight_key(self, method, url, header_params, params, ok_error_codes):
+        """
+        The key of identical GETs, or None if the request must not be coalesced
+        :return: <tuple> or <NoneType>
+        """
+        if not self.single_flight or method != 'GET':
+            return None
+
+        # The headers include the token, the calls of different tokens are not coalesced
+        return (url, tuple(sorted(header_params.items())),
+                tuple(sorted((str(name), str(value)) for name, value in (params or {}).items())),
+                tuple(ok_error_codes or ()))
+
+    def __get_session(self):
+        """
+        Get the session of the current thread, create one the first time.
+        :return: <requests.Session>
+        """
+        session = getattr(self.__local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            with self.__worker_pool_lock:
+                self.__mount_adapter(session)
+                # Helpers start short-lived executors: forget the sessions of the threads that exited. They are not
+                # closed, that would close the shared adapter, and they hold no connection of their own.
+                for thread in [thread for thread in self.__thread_sessions if not thread.is_alive()]:
+                    del self.__thread_sessions[thread]
+                self.__thread_sessions[threading.current_thread()] = session
+            self.__local.session = session
+
+        return session
+
+    def __mount_adapter(self, session):
+        """
+        Make the session use the shared connection pool
+        :param session: <requests.Session>
+        :return:
+        """
+        session.mount('https://', self.__adapter)
+        session.mount('http://', self.__adapter)
+        session.headers.update({"Connection": "keep-alive" if self.pool_config.keep_alive else "close"})
+
+    @staticmethod
+    def __build_adapter(pool_config: PoolConfig) -> PooledHTTPAdapter:
+        return PooledHTTPAdapter(pool_connections=pool_config.get_num_pools(),
+                           pool_maxsize=pool_config.max_connections_per_host,
+                           pool_block=pool_config.block)
 
     def request(self, method, url, session,
                 header_params=None,
                 params=None,
                 body=None,
-                ok_error_codes: List[int] = None):
+                ok_error_codes: List[int] = None,
+                request_info: RequestInfo = None):
         """
         Make a request with the provided information using a requests.session
         :param method:
@@ -125,6 +320,8 @@ class ApiClient(object):
         :param params:
         :param body:
         :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
+        :param request_info: <RequestInfo> [optional] Filled in with the timings and outcome of the request,
+        and passed to the request hooks.
 
         :return:
         """
@@ -132,39 +329,145 @@ class ApiClient(object):
         if method not in ['POST', 'PUT', 'GET', 'DELETE']:
             raise InvalidHttpMethodError()
 
-        response = session.request(
-            method=method, url=url, headers=header_params, params=params, json=body)
+        if request_info is None:
+            return self.__request(method, url, session, header_params, params, body, ok_error_codes)
+
+        run_hooks(self.__pre_request_hooks, request_info)
+        start = time.perf_counter()
+        try:
+            return ApiResponse(self.__request(method, url, session, header_params, params, body, ok_error_codes,
+                                              request_info=request_info), request_info)
+        except Exception as e:
+            request_info.error = e
+            raise
+        finally:
+            request_info.total_time = time.perf_counter() - start
+            run_hooks(self.__post_request_hooks, request_info)
+
+    def __request(self, method, url, session, header_params, params, body, ok_error_codes,
+                  request_info: RequestInfo = None):
+
+        cache_key = cached_entry = None
+        if self.http_cache:
+            access_token = (header_params or {}).get('Authorization', self.access_token)
+            cache_key = self.http_cache.get_key(access_token, url, params)
+            if method == 'GET':
+                cached_entry = self.http_cache.get(cache_key)
+                if cached_entry and self.http_cache.is_fresh(cached_entry):
+                    if request_info:
+                        request_info.cache = 'hit'
+                    return self.http_cache.serve(cached_entry, json_decoder=self.json_decoder)
+                if cached_entry:
+                    header_params = {**(header_params or {}),
+                                     **self.http_cache.get_conditional_headers(cached_entry)}
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            if request_info:
+                request_info.retries = attempt
+                self.__adapter.pop_connect_times()
+
+            try:
+                response = session.request(
+                    method=method, url=url, headers=header_params, params=params, json=body,
+                    timeout=self.pool_config.get_timeout())
+            except requests.exceptions.RequestException as e:
+                if not self.retry_policy.should_retry(method, attempt, error=e):
+                    raise
+                delay = self.retry_policy.get_backoff(attempt)
+            else:
+                if request_info:
+                    self.__record_response(request_info, response)
+                self.__report_throttling(response.status_code)
+                if not self.retry_policy.should_retry(method, attempt, status_code=response.status_code):
+                    break
+                delay = self.retry_policy.get_backoff(attempt, retry_after=response.headers.get('Retry-After'))
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+        if cached_entry and response.status_code == 304:
+            if request_info:
+                request_info.cache = 'revalidated'
+            return self.http_cache.serve(self.http_cache.refresh(cache_key, cached_entry, response.headers),
+                                         revalidated=True, json_decoder=self.json_decoder)
+
+        # The body is decoded once, here
+        try:
+            body = self.json_decoder.decode_body(response.content)
+            headers = response.headers
+        except ValueError:
+            body = {}
+            headers = {}
 
         # Only accepts the 20x status codes.
-        validated_response = self.__validate_response(response, ok_error_codes=ok_error_codes)
+        validated_response = self.__validate_response(response, body, headers, ok_error_codes=ok_error_codes)
+
+        if cache_key and method == 'GET':
+            self.http_cache.store(cache_key, response.status_code, response.headers, response.text,
+                                  path_key=self.http_cache.get_path_key(access_token, url))
+        elif cache_key:
+            # The resource changed, drop its cached GETs, whatever their params
+            self.http_cache.invalidate_path(access_token, url)
 
         return validated_response
 
+    def __record_response(self, request_info: RequestInfo, response):
+        """
+        Record the timings of the last attempt
+        :param request_info: <RequestInfo>
+        :param response: <requests.Response>
+        :return:
+        """
+        # urllib3 resolves the host while connecting, so the DNS lookup is part of connect_time
+        connect_times = self.__adapter.pop_connect_times()
+        request_info.connect_time = connect_times.get('connect_time', 0.0)
+        request_info.tls_time = connect_times.get('tls_time', 0.0) if response.url.startswith('https') else None
+        request_info.status_code = response.status_code
+        # From sending the request to parsing the response headers
+        request_info.ttfb = response.elapsed.total_seconds()
+        request_info.response_size = len(response.content)
+
+    def __report_throttling(self, status_code: int):
+        """
+        Let an adaptive rate limiter slow down on 429 and speed up again on success
+        :param status_code: <int>
+        :return:
+        """
+        if not self.rate_limiter:
+            return
+
+        if status_code == 429:
+            self.rate_limiter.on_throttled()
+        elif status_code < 500:
+            self.rate_limiter.on_success()
+
     @staticmethod
-    def __validate_response(response, ok_error_codes: List[int] = None):
+    def __validate_response(response, body, headers, ok_error_codes: List[int] = None):
         """
         Validate and build a new validated response.
-        :param response:
+        :param response: <requests.Response>
+        :param body: <dict> decoded response body
+        :param headers: response headers
         :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
         :return:
         """
-        try:
-            body = response.json()
-            headers = response.headers
-        except JSONDecodeError:
-            body = {}
-            headers = {}
-
         built_response = {"status_code": response.status_code, "headers": headers, "body": body}
 
-        if response.status_code in range(200, 205) and response.json:
+        if response.status_code in range(200, 205):
             return built_response
 
-        elif response.status_code == 400 and response.json().get('error').get('code') == 283:
+        error = body.get('error') or {}
+        if response.status_code == 400 and error.get('code') == 283:
             raise ResourceNotFoundError()
 
-        else:
-            if body and ok_error_codes and body.get('error').get('code') in ok_error_codes:
-                return built_response
+        if body and ok_error_codes and error.get('code') in ok_error_codes:
+            return built_response
 
-            raise HttpCodeError(response=response)
+        raise HttpCodeError(response=response, status_code=response.status_code, body=body,
+                            msg=f"HTTP Status code is invalid. Could not make the request because -> "
+                                f"{response.status_code} {response.reason or 'Unknown reason'}.\n"
+                                f"Error: {body if headers else 'Invalid Json'}")
@@ -1,7 +1,9 @@
-from venmo_api import ArgumentMissingError, User, Page
+from venmo_api import ArgumentMissingError, BaseModel, User, Page, IdentityMap, SharedResponse, LazyBody
+from concurrent.futures import Future
 from enum import Enum
 from typing import Dict, List
 import re
+import time
 
 
 def validate_access_token(access_token):
@@ -19,15 +21,58 @@ def validate_access_token(access_token):
     return f"Bearer {access_token}"
 
 
-def deserialize(response: Dict, data_type, nested_response: List[str] = None):
+def deserialize(response: Dict, data_type, nested_response: List[str] = None, identity_map: IdentityMap = None,
+                lazy: bool = False, keep_json: bool = True):
     """Extract one or a list of Objects from the api_client structured response.
     :param response: <Dict>
     :param data_type: <Generic>
     :param nested_response: <List[str]> Optional. Loop through the body
+    :param identity_map: <IdentityMap> Optional. Users are shared through it. Defaults to a new map for this call,
+    so a user appearing in many records of the response is built once.
+    :param lazy: <bool> Optional. Build lazy models, that parse each field on its first access.
+    :param keep_json: <bool> Optional. Keep the raw JSON in the models, pass False to save memory.
     :return: a single <Object> or a <Page> of objects (Objects can be User/Transaction/Payment/PaymentMethod)
     """
 
+    def build():
+        with BaseModel.keeping_json(keep_json):
+            return __timed_deserialize(response, data_type, nested_response, identity_map, lazy)
+
+    # A response shared by coalesced calls is deserialized once for all of them
+    if isinstance(response, SharedResponse):
+        result = response.get_deserialized((data_type, tuple(nested_response or ()), identity_map, lazy, keep_json),
+                                           build)
+        # Each caller gets its own Page, the apis set their paging method on it
+        return __copy_page(result) if isinstance(result, Page) else result
+
+    return build()
+
+
+def __timed_deserialize(response: Dict, data_type, nested_response: List[str] = None,
+                        identity_map: IdentityMap = None, lazy: bool = False):
+    """
+    __deserialize, reporting its time to the RequestInfo of the response when the client is instrumented
+    """
+    request_info = getattr(response, 'request_info', None)
+    if request_info is None:
+        return __deserialize(response, data_type, nested_response, identity_map, lazy)
+
+    start = time.perf_counter()
+    result = __deserialize(response, data_type, nested_response, identity_map, lazy)
+    request_info.record_deserialize(time.perf_counter() - start, len(result) if isinstance(result, list) else 1)
+    return result
+
+
+def __deserialize(response: Dict, data_type, nested_response: List[str] = None, identity_map: IdentityMap = None,
+                  lazy: bool = False):
     body = response.get('body')
+    # A TypedDecoder body goes from its raw bytes to the models in one typed pass, when it has a schema for them.
+    # Not for lazy models, they parse the raw JSON that the typed pass doesn't keep.
+    if isinstance(body, LazyBody) and not nested_response and not lazy:
+        result = body.deserialize(data_type, identity_map=identity_map)
+        if result is not NotImplemented:
+            return result
+
     if not body:
         raise Exception("Can't get an empty response body.")
 
@@ -39,18 +84,25 @@ def deserialize(response: Dict, data_type, nested_response: List[str] = None):
             raise ValueError(f"Couldn't find {nested} in the {data}.")
         data = temp
 
+    if identity_map is None:
+        identity_map = IdentityMap()
+
     # Return a list of <class> data_type
     if isinstance(data, list):
-        return __get_objs_from_json_list(json_list=data, data_type=data_type)
+        return __get_objs_from_json_list(json_list=data, data_type=data_type, identity_map=identity_map, lazy=lazy)
 
-    return data_type.from_json(json=data)
+    return data_type.from_json(json=data, identity_map=identity_map, lazy=lazy)
 
 
-def wrap_callback(callback, data_type, nested_response: List[str] = None):
+def wrap_callback(callback, data_type, nested_response: List[str] = None, identity_map: IdentityMap = None,
+                  lazy: bool = False, keep_json: bool = True):
     """
     :param callback: <function> Function that was provided by the user
     :param data_type: <class> It can be either User or Transaction
     :param nested_response: <List[str]> Optional. Loop through the body
+    :param identity_map: <IdentityMap> Optional. Users are shared through it.
+    :param lazy: <bool> Optional. Build lazy models.
+    :param keep_json: <bool> Optional. Keep the raw JSON in the models.
     :return wrapped_callback: <function> or <NoneType> The user callback wrapped for json parsing.
     """
     if not callback:
@@ -61,21 +113,43 @@ def wrap_callback(callback, data_type, nested_response: List[str] = None):
         if not data_type:
             return callback(True)
 
-        deserialized_data = deserialize(response=response, data_type=data_type, nested_response=nested_response)
+        deserialized_data = deserialize(response=response, data_type=data_type, nested_response=nested_response,
+                                        identity_map=identity_map, lazy=lazy, keep_json=keep_json)
         return callback(deserialized_data)
 
     return wrapper
 
 
-def __get_objs_from_json_list(json_list, data_type):
+def cached_result(data, callback=None):
+    """
+    Return data that was served without a request (e.g. from a cache) the same way as fetched data:
+    as is, or through the callback as a done <Future>.
+    :param data:
+    :param callback: <function> or <NoneType>
+    :return: data or <Future>
+    """
+    if not callback:
+        return data
+
+    future = Future()
+    try:
+        future.set_result(callback(data))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def __get_objs_from_json_list(json_list, data_type, identity_map: IdentityMap = None, lazy: bool = False):
     """Process JSON for User/Transaction
     :param json_list: <list> a list of objs
     :param data_type: <class> User/Transaction/Payment/PaymentMethod
+    :param identity_map: <IdentityMap> shared by all the objs
+    :param lazy: <bool> build lazy objs
     :return: <page>
     """
     result = Page()
     for obj in json_list:
-        data_obj = data_type.from_json(obj)
+        data_obj = data_type.from_json(obj, identity_map=identity_map, lazy=lazy)
         if not data_obj:
             continue
         result.append(data_obj)
@@ -83,6 +157,12 @@ def __get_objs_from_json_list(json_list, data_type):
     return result
 
 
+def __copy_page(page: Page) -> Page:
+    result = Page()
+    result.extend(page)
+    return result
+
+
 class Colors(Enum):
     HEADER = '\033[95m'
     OKBLUE = '\033[94m'
@@ -0,0 +1,379 @@
+from venmo_api import ResourceNotFoundError, InvalidHttpMethodError, HttpCodeError, validate_access_token, \
+    PoolConfig, RateLimiter, RetryPolicy, HttpCache, AsyncSingleFlight, SharedResponse, RequestInfo, ApiResponse, \
+    MetricsCollector, JsonDecoder
+from venmo_api.utils.instrumentation import run_hooks
+from contextvars import ContextVar
+from typing import List
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncApiClient(object):
+    """
+    Generic asyncio API Client for the Venmo API.
+    All the requests run on the caller's event loop and share one aiohttp session (one connection pool).
+    """
+
+    def __init__(self, access_token=None, pool_config: PoolConfig = None,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, http_cache: HttpCache = None,
+                 coalesce_requests: bool = True, metrics: MetricsCollector = None, json_decoder: JsonDecoder = None):
+        """
+        :param access_token: <str> access token you received for your account.
+        :param pool_config: <PoolConfig> [optional] Connection pool size, timeouts and keep-alive settings.
+        :param rate_limiter: <RateLimiter> [optional] Every request (and retry) of this client takes a token from it.
+        :param retry_policy: <RetryPolicy> [optional] When to retry throttled or failed requests. Defaults to
+        RetryPolicy(), pass RetryPolicy(max_retries=0) to disable the retries.
+        :param http_cache: <HttpCache> [optional] Cache for the GET responses, revalidated with ETag/Last-Modified.
+        :param coalesce_requests: <bool> Identical GETs awaited at the same time share one request,
+        and one deserialized result.
+        :param metrics: <MetricsCollector> [optional] Collects the timings, sizes and status codes of the requests.
+        :param json_decoder: <JsonDecoder> [optional] Decodes the response bodies. Defaults to the fastest installed
+        backend (orjson, msgspec, then json).
+        """
+        super().__init__()
+
+        if aiohttp is None:
+            raise ImportError("AsyncApiClient requires aiohttp. Install it with: pip3 install venmo-api[async]")
+
+        access_token = validate_access_token(access_token=access_token)
+
+        self.access_token = access_token
+        self.configuration = {"host": "https://api.venmo.com/v1"}
+        self.pool_config = pool_config or PoolConfig()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.http_cache = http_cache
+        self.single_flight = AsyncSingleFlight() if coalesce_requests else None
+        self.metrics = metrics
+        self.json_decoder = json_decoder or JsonDecoder()
+        self.__pre_request_hooks = []
+        self.__post_request_hooks = [metrics.after_request] if metrics else []
+
+        self.default_headers = {"User-Agent": "Venmo/7.44.0 (iPhone; iOS 13.0; Scale/2.0)"}
+        if self.access_token:
+            self.default_headers.update({"Authorization": self.access_token})
+
+        self.session = None
+        # Each task sees its own last response
+        self.__last_response = ContextVar(f"venmo_api_last_response_{id(self)}", default=None)
+
+    @property
+    def last_response(self):
+        """
+        The last response received by the current task
+        :return: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>} or <NoneType>
+        """
+        return self.__last_response.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def update_access_token(self, access_token):
+        access_token = validate_access_token(access_token=access_token)
+        # Replaced, not mutated: a call reads default_headers once, so it sends either the old or the new token
+        self.default_headers = {**self.default_headers, "Authorization": access_token}
+        self.access_token = access_token
+
+    def add_pre_request_hook(self, hook):
+        """
+        Call [hook] with the RequestInfo of every request, before it is sent (and before the cache lookup).
+        :param hook: <function> hook(request_info), its exceptions are logged and ignored.
+        :return:
+        """
+        self.__pre_request_hooks = self.__pre_request_hooks + [hook]
+
+    def add_post_request_hook(self, hook):
+        """
+        Call [hook] with the RequestInfo of every request once it is done (failed ones included),
+        with its timings, status code, response size and retries.
+        :param hook: <function> hook(request_info), its exceptions are logged and ignored.
+        :return:
+        """
+        self.__post_request_hooks = self.__post_request_hooks + [hook]
+
+    def remove_request_hook(self, hook):
+        """
+        Remove a pre or post request hook
+        :param hook: <function>
+        :return:
+        """
+        self.__pre_request_hooks = [other for other in self.__pre_request_hooks if other != hook]
+        self.__post_request_hooks = [other for other in self.__post_request_hooks if other != hook]
+
+    async def close(self):
+        """
+        Close the shared session and release all the pooled connections.
+        :return:
+        """
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def call_api(self, resource_path: str, method: str,
+                       header_params: dict = None,
+                       params: dict = None,
+                       body: dict = None,
+                       ok_error_codes: List[int] = None):
+        """
+        Makes the HTTP request (awaitable) and return the deserialized data.
+
+        :param resource_path: <str> Specific Venmo API path
+        :param method: <str> HTTP request method
+        :param header_params: <dict> request headers
+        :param params: <dict> request parameters (?=)
+        :param body: <dict> request body will be send as JSON
+        :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
+        :return: response: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>}
+        """
+
+        # Update the header with the required values
+        headers = dict(self.default_headers)
+        headers.update(header_params or {})
+
+        if body:
+            headers.update({"Content-Type": "application/json"})
+
+        url = self.configuration['host'] + resource_path
+        request_info = None
+        if self.__pre_request_hooks or self.__post_request_hooks:
+            request_info = RequestInfo(method, resource_path, url, params,
+                                       deserialize_listeners=[self.metrics.after_deserialize] if self.metrics else None)
+
+        async def perform_request():
+            return await self.request(method, url, self.__get_session(),
+                                      header_params=headers, params=params,
+                                      body=body, ok_error_codes=ok_error_codes, request_info=request_info)
+
+        # perform request and return response
+        if self.single_flight and method == 'GET':
+            flight_key = (url, tuple(sorted(headers.items())),
+                          tuple(sorted((str(name), str(value)) for name, value in (params or {}).items())),
+                          tuple(ok_error_codes or ()))
+            processed_response = await self.single_flight.do(flight_key,
+                                                             lambda: self.__share(perform_request()))
+        else:
+            processed_response = await perform_request()
+
+        self.__last_response.set(processed_response)
+        return processed_response
+
+    async def request(self, method, url, session,
+                      header_params=None,
+                      params=None,
+                      body=None,
+                      ok_error_codes: List[int] = None,
+                      request_info: RequestInfo = None):
+        """
+        Make a request with the provided information using an aiohttp.ClientSession
+        :param method:
+        :param url:
+        :param session:
+        :param header_params:
+        :param params:
+        :param body:
+        :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
+        :param request_info: <RequestInfo> [optional] Filled in with the timings and outcome of the request,
+        and passed to the request hooks.
+
+        :return:
+        """
+
+        if method not in ['POST', 'PUT', 'GET', 'DELETE']:
+            raise InvalidHttpMethodError()
+
+        if request_info is None:
+            return await self.__request(method, url, session, header_params, params, body, ok_error_codes)
+
+        run_hooks(self.__pre_request_hooks, request_info)
+        start = time.perf_counter()
+        try:
+            return ApiResponse(await self.__request(method, url, session, header_params, params, body,
+                                                    ok_error_codes, request_info=request_info), request_info)
+        except BaseException as e:
+            request_info.error = e
+            raise
+        finally:
+            request_info.total_time = time.perf_counter() - start
+            run_hooks(self.__post_request_hooks, request_info)
+
+    async def __request(self, method, url, session, header_params, params, body, ok_error_codes,
+                        request_info: RequestInfo = None):
+
+        cache_key = cached_entry = None
+        if self.http_cache:
+            access_token = (header_params or {}).get('Authorization', self.access_token)
+            cache_key = self.http_cache.get_key(access_token, url, params)
+            if method == 'GET':
+                cached_entry = self.http_cache.get(cache_key)
+                if cached_entry and self.http_cache.is_fresh(cached_entry):
+                    if request_info:
+                        request_info.cache = 'hit'
+                    return self.http_cache.serve(cached_entry, json_decoder=self.json_decoder)
+                if cached_entry:
+                    header_params = {**(header_params or {}),
+                                     **self.http_cache.get_conditional_headers(cached_entry)}
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+            if request_info:
+                # The trace callbacks set the timings of the new connections, a reused one costs nothing
+                request_info.retries = attempt
+                request_info.dns_time = request_info.connect_time = 0.0
+
+            try:
+                async with session.request(method=method, url=url, headers=header_params, params=params, json=body,
+                                           trace_request_ctx=request_info) as response:
+                    if request_info:
+                        request_info.status_code = response.status
+                        request_info.response_size = len(await response.read())
+                    self.__report_throttling(response.status)
+                    if self.retry_policy.should_retry(method, attempt, status_code=response.status):
+                        delay = self.retry_policy.get_backoff(attempt,
+                                                              retry_after=response.headers.get('Retry-After'))
+                    elif cached_entry and response.status == 304:
+                        if request_info:
+                            request_info.cache = 'revalidated'
+                        return self.http_cache.serve(self.http_cache.refresh(cache_key, cached_entry,
+                                                                             response.headers),
+                                                     revalidated=True, json_decoder=self.json_decoder)
+                    else:
+                        # The body is read and decoded once, here
+                        content = await response.read()
+                        try:
+                            response_body = self.json_decoder.decode_body(content)
+                            headers = response.headers
+                        except ValueError:
+                            response_body = {}
+                            headers = {}
+
+                        # Only accepts the 20x status codes.
+                        validated_response = self.__validate_response(response, response_body, headers,
+                                                                      ok_error_codes=ok_error_codes)
+                        if cache_key and method == 'GET':
+                            self.http_cache.store(cache_key, response.status, response.headers,
+                                                  content.decode(response.get_encoding(), errors='replace'),
+                                                  path_key=self.http_cache.get_path_key(access_token, url))
+                        elif cache_key:
+                            # The resource changed, drop its cached GETs, whatever their params
+                            self.http_cache.invalidate_path(access_token, url)
+
+                        return validated_response
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not self.retry_policy.should_retry(method, attempt, error=e):
+                    raise
+                delay = self.retry_policy.get_backoff(attempt)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def __share(coroutine):
+        return SharedResponse(await coroutine)
+
+    def __report_throttling(self, status_code: int):
+        """
+        Let an adaptive rate limiter slow down on 429 and speed up again on success
+        :param status_code: <int>
+        :return:
+        """
+        if not self.rate_limiter:
+            return
+
+        if status_code == 429:
+            self.rate_limiter.on_throttled()
+        elif status_code < 500:
+            self.rate_limiter.on_success()
+
+    def __get_session(self):
+        """
+        Create the shared session lazily, so it is bound to the running event loop.
+        :return: <aiohttp.ClientSession>
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_config.max_connections,
+                                             limit_per_host=self.pool_config.max_connections_per_host,
+                                             force_close=not self.pool_config.keep_alive)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.pool_config.connect_timeout,
+                                            sock_read=self.pool_config.read_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                 trace_configs=[self.__build_trace_config()])
+
+        return self.session
+
+    @staticmethod
+    def __build_trace_config():
+        """
+        Times the DNS lookup, the connection (TLS handshake included) and the first byte of the requests made
+        with a RequestInfo as trace_request_ctx.
+        :return: <aiohttp.TraceConfig>
+        """
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.start = time.perf_counter()
+
+        async def on_dns_resolvehost_start(session, context, params):
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, context, params):
+            if isinstance(context.trace_request_ctx, RequestInfo):
+                context.trace_request_ctx.dns_time = time.perf_counter() - context.dns_start
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_start = time.perf_counter()
+
+        async def on_connection_create_end(session, context, params):
+            request_info = context.trace_request_ctx
+            if isinstance(request_info, RequestInfo):
+                request_info.connect_time = time.perf_counter() - context.connect_start - request_info.dns_time
+
+        async def on_request_end(session, context, params):
+            # Called once the response headers are received
+            if isinstance(context.trace_request_ctx, RequestInfo):
+                context.trace_request_ctx.ttfb = time.perf_counter() - context.start
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    @staticmethod
+    def __validate_response(response, body, headers, ok_error_codes: List[int] = None):
+        """
+        Validate and build a new validated response.
+        :param response: <aiohttp.ClientResponse>
+        :param body: <dict> decoded response body
+        :param headers: response headers
+        :param ok_error_codes: <List[int]> A list of integer error codes that you don't want an exception for.
+        :return:
+        """
+        built_response = {"status_code": response.status, "headers": headers, "body": body}
+
+        if response.status in range(200, 205):
+            return built_response
+
+        error = body.get('error') or {}
+        if response.status == 400 and error.get('code') == 283:
+            raise ResourceNotFoundError()
+
+        if body and ok_error_codes and error.get('code') in ok_error_codes:
+            return built_response
+
+        raise HttpCodeError(response=response, status_code=response.status, body=body,
+                            msg=f"HTTP Status code is invalid. Could not make the request because -> "
+                                f"{response.status} {response.reason or 'Unknown reason'}.\n"
+                                f"Error: {body if headers else 'Invalid Json'}")
@@ -0,0 +1,199 @@
+from venmo_api import User
+from collections import OrderedDict
+from typing import Iterable, List, Union
+import threading
+import time
+
+
+class LRUCache(object):
+    """
+    Thread-safe, size-bounded LRU cache with a per-entry time to live and hit/miss counters.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = None, timer=time.monotonic):
+        """
+        :param max_size: <int> Max number of entries. The least recently used entry is evicted beyond that.
+        :param ttl: <float> [optional] Default seconds an entry stays valid. None keeps it until evicted.
+        :param timer: <function> Clock used for the expiration.
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.__timer = timer
+        self.__entries = OrderedDict()
+        self.__lock = threading.RLock()
+        self.__stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key, default=None):
+        """
+        Get the value of [key], or [default] if it is missing or expired.
+        :param key:
+        :param default:
+        :return:
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__stats['misses'] += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.__timer():
+                del self.__entries[key]
+                self.__stats['expirations'] += 1
+                self.__stats['misses'] += 1
+                return default
+
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Store [value] under [key].
+        :param key:
+        :param value:
+        :param ttl: <float> [optional] Seconds this entry stays valid, overrides the default ttl.
+        :return:
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.__timer() + ttl if ttl is not None else None
+
+        with self.__lock:
+            self.__entries[key] = (value, expires_at)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.__stats['evictions'] += 1
+
+    def invalidate(self, key) -> bool:
+        """
+        Remove [key] from the cache.
+        :param key:
+        :return: <bool> True if it was cached
+        """
+        with self.__lock:
+            return self.__entries.pop(key, None) is not None
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> {'hits', 'misses', 'evictions', 'expirations', 'size', 'max_size', 'hit_ratio'}
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['size'] = len(self.__entries)
+
+        stats['max_size'] = self.max_size
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def __contains__(self, key):
+        return self.get(key, default=None) is not None
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class UserCache(object):
+    """
+    Cache of <User>s for the UserApi lookups. Users are indexed by id and username, so a username lookup
+    can be answered by a user that was cached by id and vice versa. Search results are cached separately.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 3600, max_searches: int = 256, search_ttl: float = 300):
+        """
+        :param max_size: <int> Max number of cached users.
+        :param ttl: <float> Seconds a cached user stays valid.
+        :param max_searches: <int> Max number of cached search results.
+        :param search_ttl: <float> Seconds a cached search result stays valid.
+        """
+        super().__init__()
+        self.__users = LRUCache(max_size=max_size, ttl=ttl)
+        self.__usernames = LRUCache(max_size=max_size, ttl=ttl)
+        self.__searches = LRUCache(max_size=max_searches, ttl=search_ttl)
+
+    def get_by_id(self, user_id) -> Union[User, None]:
+        return self.__users.get(str(user_id))
+
+    def get_by_username(self, username: str) -> Union[User, None]:
+        user_id = self.__usernames.get(username.lower())
+        if user_id is None:
+            return None
+
+        user = self.__users.get(user_id)
+        # The user was evicted or refreshed with another username
+        if user is None or (user.username or '').lower() != username.lower():
+            self.__usernames.invalidate(username.lower())
+            return None
+
+        return user
+
+    def put(self, user: User):
+        """
+        Cache [user] under its id and its username.
+        :param user: <User>
+        :return:
+        """
+        if not user or user.id is None:
+            return
+
+        user_id = str(user.id)
+        self.__users.set(user_id, user)
+        if user.username:
+            self.__usernames.set(user.username.lower(), user_id)
+
+    def put_many(self, users: Iterable[User]):
+        for user in users or []:
+            self.put(user)
+
+    def get_search(self, key) -> Union[List[User], None]:
+        return self.__searches.get(key)
+
+    def put_search(self, key, users: List[User]):
+        """
+        Cache the result of a search, and each user of it.
+        :param key: hashable key of the search (query, offset, ...)
+        :param users: <List[User]>
+        :return:
+        """
+        users = list(users)
+        self.__searches.set(key, users)
+        self.put_many(users)
+
+    def invalidate(self, user_id=None, username: str = None):
+        """
+        Drop a user from the cache, by id and/or username. Both indexes are cleaned.
+        :param user_id:
+        :param username:
+        :return:
+        """
+        if username:
+            cached = self.get_by_username(username)
+            self.__usernames.invalidate(username.lower())
+            if cached is not None and user_id is None:
+                user_id = cached.id
+
+        if user_id is not None:
+            cached = self.__users.get(str(user_id))
+            self.__users.invalidate(str(user_id))
+            if cached is not None and cached.username:
+                self.__usernames.invalidate(cached.username.lower())
+
+    def clear(self):
+        self.__users.clear()
+        self.__usernames.clear()
+        self.__searches.clear()
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> hit/miss counters of the users, usernames and searches indexes
+        """
+        return {"users": self.__users.get_stats(),
+                "usernames": self.__usernames.get_stats(),
+                "searches": self.__searches.get_stats()}
@@ -0,0 +1,134 @@
+from venmo_api import string_to_timestamp
+from venmo_api.models.json_schema import transaction_json_format, payment_json_format, user_json_format
+from typing import Dict, List
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TransactionColumns(object):
+    """
+    Columnar builder for /stories JSON pages. The fields go straight from the JSON into one list per column,
+    without building a Transaction per row. Like Transaction.from_json, only the payment stories are kept.
+    Export the columns with to_numpy() (structured array) or to_arrow() (RecordBatch), e.g. for pandas.
+    """
+
+    columns = ('id', 'payment_id', 'date_created', 'date_updated', 'date_completed', 'action', 'amount', 'status',
+               'audience', 'actor_id', 'target_id')
+    date_columns = ('date_created', 'date_updated', 'date_completed')
+
+    def __init__(self):
+        super().__init__()
+        self.__columns = {name: [] for name in self.columns}
+        # id of the last story seen (payment or not), the before_id of the next page
+        self.last_story_id = None
+
+    def __len__(self):
+        return len(self.__columns['id'])
+
+    def add_response(self, response: Dict) -> int:
+        """
+        Add the stories of an api_client response
+        :param response: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>}
+        :return: <int> number of rows added
+        """
+        return self.add_page(response['body'].get('data') or [])
+
+    def add_page(self, stories: List[Dict]) -> int:
+        """
+        Add a page of raw stories (the 'data' list of a /stories response)
+        :param stories: <List[Dict]>
+        :return: <int> number of rows added
+        """
+        columns = self.__columns
+        payment_key = transaction_json_format['payment']
+        target_key = payment_json_format['target']
+        actor_key = payment_json_format['actor']
+        user_id_key = user_json_format['user_id']
+        added = 0
+
+        for story in stories:
+            self.last_story_id = story.get(transaction_json_format['story_id'])
+            if story.get(transaction_json_format['transaction_type']) != 'payment':
+                continue
+
+            payment = story.get(payment_key) or {}
+            actor = payment.get(actor_key) or {}
+            target = (payment.get(target_key) or {}).get('user') or {}
+
+            columns['id'].append(self.last_story_id)
+            columns['payment_id'].append(payment.get(payment_json_format['payment_id']))
+            columns['date_created'].append(string_to_timestamp(story.get(transaction_json_format['date_created'])))
+            columns['date_updated'].append(string_to_timestamp(story.get(transaction_json_format['date_updated'])))
+            columns['date_completed'].append(string_to_timestamp(payment.get(payment_json_format['date_completed'])))
+            columns['action'].append(payment.get(payment_json_format['type']))
+            columns['amount'].append(payment.get(payment_json_format['amount']))
+            columns['status'].append(payment.get(payment_json_format['status']))
+            columns['audience'].append(story.get(transaction_json_format['aud']))
+            columns['actor_id'].append(actor.get(user_id_key))
+            columns['target_id'].append(target.get(user_id_key))
+            added += 1
+
+        return added
+
+    def to_pydict(self) -> Dict[str, list]:
+        """
+        The columns as plain lists. Dates are timestamps (like Transaction's), missing values are None.
+        :return: <Dict[str, list]>
+        """
+        return {name: list(values) for name, values in self.__columns.items()}
+
+    def to_numpy(self):
+        """
+        Export the columns as a NumPy structured array. Strings are fixed-width unicode ('' if missing),
+        dates are datetime64[s] (NaT if missing) and amount is float64 (nan if missing).
+        :return: <numpy.ndarray>
+        """
+        if numpy is None:
+            raise ImportError("to_numpy requires numpy. Install it with: pip3 install venmo-api[numpy]")
+
+        arrays = {}
+        for name, values in self.__columns.items():
+            if name in self.date_columns:
+                nat = numpy.iinfo(numpy.int64).min
+                arrays[name] = numpy.array([nat if value is None else value for value in values],
+                                           dtype=numpy.int64).view('datetime64[s]')
+            elif name == 'amount':
+                arrays[name] = numpy.array([numpy.nan if value is None else value for value in values],
+                                           dtype=numpy.float64)
+            else:
+                values = ['' if value is None else str(value) for value in values]
+                arrays[name] = numpy.array(values, dtype=f"U{max(map(len, values), default=0) or 1}")
+
+        result = numpy.empty(len(self), dtype=[(name, arrays[name].dtype) for name in self.columns])
+        for name in self.columns:
+            result[name] = arrays[name]
+        return result
+
+    def to_arrow(self):
+        """
+        Export the columns as an Arrow RecordBatch. Dates are timestamp[s], missing values are nulls.
+        :return: <pyarrow.RecordBatch>
+        """
+        if pyarrow is None:
+            raise ImportError("to_arrow requires pyarrow. Install it with: pip3 install venmo-api[arrow]")
+
+        arrays = []
+        for name in self.columns:
+            values = self.__columns[name]
+            if name in self.date_columns:
+                arrays.append(pyarrow.array(values, type=pyarrow.timestamp('s')))
+            elif name == 'amount':
+                arrays.append(pyarrow.array(values, type=pyarrow.float64()))
+            else:
+                arrays.append(pyarrow.array([None if value is None else str(value) for value in values],
+                                            type=pyarrow.string()))
+
+        return pyarrow.RecordBatch.from_arrays(arrays, names=list(self.columns))
@@ -0,0 +1,177 @@
+from venmo_api import User, LocalStore, RateLimiter
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Union
+import csv
+import threading
+
+
+class EdgeSink(ABC):
+    """
+    Where a FriendsCrawler streams the edges it finds. Subclass it and implement write (and close if needed).
+    The crawler calls write from one thread at a time.
+    """
+
+    @abstractmethod
+    def write(self, user_id: str, friends: List[User], depth: int):
+        """
+        :param user_id: <str> the user whose friends list this is
+        :param friends: <List[User]> a page of the friends list
+        :param depth: <int> BFS depth of [user_id], 0 for the seeds
+        :return:
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CallbackEdgeSink(EdgeSink):
+    """
+    Hands every page of edges to a function: callback(user_id, friends, depth)
+    """
+
+    def __init__(self, callback):
+        super().__init__()
+        self.__callback = callback
+
+    def write(self, user_id: str, friends: List[User], depth: int):
+        self.__callback(user_id, friends, depth)
+
+
+class CSVEdgeSink(EdgeSink):
+    """
+    Appends the edges to a CSV file: user_id, friend_id, friend_username, depth
+    """
+
+    header = ('user_id', 'friend_id', 'friend_username', 'depth')
+
+    def __init__(self, path: str):
+        """
+        :param path: <str> The header is written if the file is new or empty.
+        """
+        super().__init__()
+        self.path = path
+        self.__file = open(path, 'a', newline='', encoding='utf-8')
+        self.__writer = csv.writer(self.__file)
+        if self.__file.tell() == 0:
+            self.__writer.writerow(self.header)
+
+    def write(self, user_id: str, friends: List[User], depth: int):
+        self.__writer.writerows((user_id, friend.id, friend.username, depth) for friend in friends)
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+class SQLiteEdgeSink(EdgeSink):
+    """
+    Stores the edges and the users in a LocalStore (friendships and users tables).
+    """
+
+    def __init__(self, store: Union[LocalStore, str]):
+        """
+        :param store: <LocalStore> or <str> path of the SQLite file.
+        """
+        super().__init__()
+        self.__owns_store = not isinstance(store, LocalStore)
+        self.store = LocalStore(store) if self.__owns_store else store
+
+    def write(self, user_id: str, friends: List[User], depth: int):
+        self.store.put_friends(user_id, friends)
+
+    def close(self):
+        if self.__owns_store:
+            self.store.close()
+
+
+class FriendsCrawler(object):
+    """
+    Bounded-depth BFS over the friends graph, from seed users. The friends lists of one BFS level are fetched
+    with [max_workers] users in flight, page by page, and each page is streamed to the sink as soon as it
+    arrives. Only the ids of the users seen are kept in memory, to skip the users already visited.
+    """
+
+    def __init__(self, user_api, sink: EdgeSink, max_depth: int = 2, max_workers: int = 4,
+                 page_size: int = 500, rate_limiter: RateLimiter = None, max_users: int = None):
+        """
+        :param user_api: <UserApi>
+        :param sink: <EdgeSink> CSVEdgeSink, SQLiteEdgeSink, CallbackEdgeSink, ...
+        :param max_depth: <int> 1 crawls the friends lists of the seeds, 2 those of their friends too, ...
+        :param max_workers: <int> Number of friends lists fetched at the same time.
+        :param page_size: <int> Friends per request.
+        :param rate_limiter: <RateLimiter> [optional] Every page request takes a token from it.
+        :param max_users: <int> [optional] Stop after crawling the friends lists of that many users.
+        """
+        super().__init__()
+        self.user_api = user_api
+        self.sink = sink
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.rate_limiter = rate_limiter
+        self.max_users = max_users
+
+        self.__lock = threading.Lock()
+
+    def crawl(self, seeds: Iterable[Union[str, User]]) -> Dict:
+        """
+        Run the crawl. The sink is not closed.
+        :param seeds: <Iterable[str]> or <Iterable[User]> user ids or users to start from
+        :return: <dict> {'users': <int> friends lists fully crawled, 'edges': <int>,
+        'depth': <int> deepest level crawled, 'errors': <Dict[str, Exception]> by user id}
+        """
+        stats = {"users": 0, "edges": 0, "depth": 0, "errors": {}}
+        frontier = list(dict.fromkeys(str(seed.id if isinstance(seed, User) else seed) for seed in seeds))
+        visited = set(frontier)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='venmo-api-crawler') as executor:
+            for depth in range(self.max_depth):
+                if self.max_users is not None:
+                    frontier = frontier[:max(self.max_users - stats['users'], 0)]
+                if not frontier:
+                    break
+
+                stats['depth'] = depth
+                next_frontier = []
+                futures = {executor.submit(self.__crawl_user, user_id, depth, visited, next_frontier, stats): user_id
+                           for user_id in frontier}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        stats['errors'][futures[future]] = e
+
+                frontier = next_frontier
+
+        return stats
+
+    def __crawl_user(self, user_id: str, depth: int, visited: set, next_frontier: list, stats: Dict):
+        """
+        Stream the friends list of [user_id] to the sink, page by page, and queue the new users for the next level
+        """
+        offset = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            friends = self.user_api.get_user_friends_list(user_id=user_id, offset=offset, limit=self.page_size)
+            if not friends:
+                break
+
+            with self.__lock:
+                self.sink.write(user_id, friends, depth)
+                stats['edges'] += len(friends)
+                for friend in friends:
+                    friend_id = str(friend.id)
+                    if friend_id not in visited:
+                        visited.add(friend_id)
+                        next_frontier.append(friend_id)
+
+            if len(friends) < self.page_size:
+                break
+            offset += len(friends)
+
+        with self.__lock:
+            stats['users'] += 1
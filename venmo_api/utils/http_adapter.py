@@ -0,0 +1,106 @@
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import threading
+import time
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    requests' HTTPAdapter that counts the requests it sends and the connections it opens,
+    so the connection reuse of the pool can be reported. It also times the connections opened by each thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.__lock = threading.Lock()
+        self.__stats = {"requests": 0, "new_connections": 0}
+        self.__local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+
+        adapter = self
+
+        class CountingHTTPConnection(HTTPConnection):
+            def _new_conn(self):
+                # DNS lookup and TCP connect, urllib3 resolves the host while connecting
+                start = time.perf_counter()
+                conn = super()._new_conn()
+                adapter.record_connect_time('connect_time', time.perf_counter() - start)
+                return conn
+
+            def connect(self):
+                adapter.record('new_connections')
+                return super().connect()
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            # Connect time of this connection, a request may open several (retries, redirects)
+            tcp_connect_time = 0.0
+
+            def _new_conn(self):
+                start = time.perf_counter()
+                conn = super()._new_conn()
+                self.tcp_connect_time = time.perf_counter() - start
+                adapter.record_connect_time('connect_time', self.tcp_connect_time)
+                return conn
+
+            def connect(self):
+                adapter.record('new_connections')
+                self.tcp_connect_time = 0.0
+                start = time.perf_counter()
+                result = super().connect()
+                # the rest of the connect of this connection is its TLS handshake
+                adapter.record_connect_time('tls_time', time.perf_counter() - start - self.tcp_connect_time)
+                return result
+
+        # The pool classes are looked up on the pool manager instance, so they can be swapped per adapter
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CountingHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": CountingHTTPConnection}),
+            "https": type("CountingHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": CountingHTTPSConnection}),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.record('requests')
+        return super().send(request, *args, **kwargs)
+
+    def record(self, key: str, value: int = 1):
+        with self.__lock:
+            self.__stats[key] = self.__stats.get(key, 0) + value
+
+    def record_connect_time(self, name: str, seconds: float):
+        """
+        Add [seconds] to the [name] timing of the current thread, the timings of all its new connections add up
+        :param name: <str> 'connect_time' or 'tls_time'
+        :param seconds: <float>
+        :return:
+        """
+        timings = self.__get_connect_times()
+        timings[name] = timings.get(name, 0.0) + seconds
+
+    def pop_connect_times(self) -> dict:
+        """
+        The connect timings of the connections opened by the current thread since the last call, summed over them
+        :return: <dict> {'connect_time': <float>, 'tls_time': <float>}, empty if no connection was opened
+        """
+        timings = self.__get_connect_times()
+        self.__local.connect_times = {}
+        return timings
+
+    def __get_connect_times(self) -> dict:
+        timings = getattr(self.__local, 'connect_times', None)
+        if timings is None:
+            timings = self.__local.connect_times = {}
+        return timings
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> {'requests': <int>, 'new_connections': <int>, 'reused_connections': <int>}
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+
+        stats['reused_connections'] = max(0, stats['requests'] - stats['new_connections'])
+        return stats
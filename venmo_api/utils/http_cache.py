@@ -0,0 +1,295 @@
+from venmo_api import LRUCache, JsonDecoder
+from email.utils import parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+from typing import Dict, Union
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class MemoryCacheBackend(object):
+    """
+    Keeps the cached responses in memory, the least recently used one is evicted beyond [max_size].
+    """
+
+    def __init__(self, max_size: int = 1024):
+        super().__init__()
+        self.__entries = LRUCache(max_size=max_size)
+
+    def get(self, key: str) -> Union[Dict, None]:
+        return self.__entries.get(key)
+
+    def set(self, key: str, entry: Dict):
+        self.__entries.set(key, entry)
+
+    def delete(self, key: str):
+        self.__entries.invalidate(key)
+
+    def clear(self):
+        self.__entries.clear()
+
+
+class DiskCacheBackend(object):
+    """
+    Keeps the cached responses in a directory, one JSON file per response, so they outlive the process.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: <str> It is created if missing.
+        """
+        super().__init__()
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str) -> Union[Dict, None]:
+        try:
+            with open(self.__get_path(key), encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, entry: Dict):
+        # Write a temporary file and swap it in, so a concurrent reader never sees a half-written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.venmo-cache-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding="utf-8") as tmp_file:
+                json.dump(entry, tmp_file)
+            os.replace(tmp_path, self.__get_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.__get_path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.json'):
+                self.delete(file_name[:-len('.json')])
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+
+class HttpCache(object):
+    """
+    HTTP-level cache for the GET requests of an ApiClient. Responses are stored by access token, path and params.
+    Cache-Control (no-store, no-cache, max-age) and Expires are honored. A stale response that has an ETag or a
+    Last-Modified is revalidated with a conditional request, and served again on 304 Not Modified.
+    A successful POST, PUT or DELETE drops the cached GETs of the same path, whatever their params.
+    """
+
+    cacheable_status_codes = (200, 203)
+
+    def __init__(self, backend=None, default_ttl: float = 0, timer=time.time):
+        """
+        :param backend: <MemoryCacheBackend> or <DiskCacheBackend> [optional] Defaults to MemoryCacheBackend().
+        :param default_ttl: <float> Seconds a response without any freshness header stays fresh. With 0, it is
+        only kept when it can be revalidated (ETag or Last-Modified).
+        :param timer: <function> Wall clock, the entries can be stored on disk.
+        """
+        super().__init__()
+        self.backend = backend or MemoryCacheBackend()
+        self.default_ttl = default_ttl
+
+        self.__timer = timer
+        self.__lock = threading.Lock()
+        self.__stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def get_key(access_token: str, url: str, params: dict = None) -> str:
+        """
+        :param access_token: <str> Two accounts never share a response.
+        :param url: <str>
+        :param params: <dict> [optional]
+        :return: <str>
+        """
+        params = sorted((str(name), str(value)) for name, value in (params or {}).items())
+        raw_key = json.dumps([access_token or '', url, params])
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_path_key(access_token: str, url: str) -> str:
+        """
+        Key of the index of the cached GETs of [url], all params included
+        :param access_token: <str>
+        :param url: <str>
+        :return: <str>
+        """
+        raw_key = json.dumps(['path', access_token or '', url])
+        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Union[Dict, None]:
+        """
+        Get the cached entry of [key], fresh or stale.
+        :param key: <str>
+        :return: <dict> or <NoneType>
+        """
+        return self.backend.get(key)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return entry['expires_at'] > self.__timer()
+
+    @staticmethod
+    def get_conditional_headers(entry: Dict) -> Dict[str, str]:
+        """
+        The headers to revalidate a stale [entry] with
+        :param entry: <dict>
+        :return: <dict>
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def serve(self, entry: Dict, revalidated: bool = False, json_decoder: JsonDecoder = None) -> Dict:
+        """
+        Build the api_client response of a cached [entry] and count the hit
+        :param entry: <dict>
+        :param revalidated: <bool> The entry was confirmed by a 304.
+        :param json_decoder: <JsonDecoder> [optional] The decoder of the client, defaults to the json module.
+        :return: <dict> {'status_code': <int>, 'headers': <dict>, 'body': <dict>}
+        """
+        self.__count('revalidated' if revalidated else 'hits')
+        content = entry['content']
+        return {"status_code": entry['status_code'],
+                "headers": CaseInsensitiveDict(entry['headers']),
+                "body": (json_decoder.decode_body(content) if json_decoder else json.loads(content)) if content else {}}
+
+    def refresh(self, key: str, entry: Dict, headers) -> Dict:
+        """
+        Renew the freshness of [entry] after a 304, from the headers of the 304
+        :param key: <str>
+        :param entry: <dict>
+        :param headers: headers of the 304 response
+        :return: <dict> the updated entry
+        """
+        merged_headers = CaseInsensitiveDict(entry['headers'])
+        merged_headers.update({name: value for name, value in headers.items()
+                               if name.lower() in ('cache-control', 'expires', 'etag', 'last-modified', 'date')})
+
+        entry = dict(entry)
+        entry['headers'] = dict(merged_headers)
+        entry['etag'] = merged_headers.get('ETag')
+        entry['last_modified'] = merged_headers.get('Last-Modified')
+        entry['expires_at'] = self.__get_expires_at(merged_headers)
+        self.backend.set(key, entry)
+        return entry
+
+    def store(self, key: str, status_code: int, headers, content: str, path_key: str = None):
+        """
+        Count the miss and store the response if its status and headers allow it
+        :param key: <str>
+        :param status_code: <int>
+        :param headers: response headers
+        :param content: <str> response body
+        :param path_key: <str> [optional] get_path_key() of the request, so invalidate_path() finds the entry
+        :return:
+        """
+        self.__count('misses')
+        if status_code not in self.cacheable_status_codes:
+            return
+
+        headers = CaseInsensitiveDict(headers)
+        if 'no-store' in self.__get_directives(headers):
+            self.backend.delete(key)
+            return
+
+        entry = {"status_code": status_code,
+                 "headers": dict(headers),
+                 "content": content,
+                 "etag": headers.get('ETag'),
+                 "last_modified": headers.get('Last-Modified'),
+                 "expires_at": self.__get_expires_at(headers)}
+
+        if entry['expires_at'] > self.__timer() or entry['etag'] or entry['last_modified']:
+            if path_key:
+                # The index is kept in the backend too, a disk cache is invalidated across processes
+                with self.__lock:
+                    index = self.backend.get(path_key) or {"keys": []}
+                    if key not in index['keys']:
+                        self.backend.set(path_key, {"keys": index['keys'] + [key]})
+            self.backend.set(key, entry)
+            self.__count('stores')
+
+    def invalidate(self, key: str):
+        self.backend.delete(key)
+
+    def invalidate_path(self, access_token: str, url: str):
+        """
+        Drop every cached GET of [url], whatever its params
+        :param access_token: <str>
+        :param url: <str>
+        :return:
+        """
+        path_key = self.get_path_key(access_token, url)
+        with self.__lock:
+            index = self.backend.get(path_key)
+            self.backend.delete(path_key)
+
+        for key in (index or {}).get('keys', []):
+            self.backend.delete(key)
+        # The GET without params may have been stored before the index existed
+        self.backend.delete(self.get_key(access_token, url))
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> {'hits', 'revalidated', 'misses', 'stores', 'hit_ratio'}. Revalidated responses count as
+        hits in the ratio, they cost a request but not the body.
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_ratio'] = (stats['hits'] + stats['revalidated']) / lookups if lookups else 0.0
+        return stats
+
+    def __count(self, name: str):
+        with self.__lock:
+            self.__stats[name] += 1
+
+    def __get_expires_at(self, headers) -> float:
+        headers = CaseInsensitiveDict(headers)
+        now = self.__timer()
+        directives = self.__get_directives(headers)
+
+        if 'no-cache' in directives:
+            return now
+
+        if 'max-age' in directives:
+            try:
+                age = int(headers.get('Age') or 0)
+                return now + max(int(directives['max-age']) - age, 0)
+            except ValueError:
+                return now
+
+        if headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                # An invalid Expires means already expired
+                return now
+
+        return now + self.default_ttl
+
+    @staticmethod
+    def __get_directives(headers) -> Dict[str, str]:
+        directives = {}
+        for directive in (headers.get('Cache-Control') or '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name:
+                directives[name.lower()] = value.strip('"')
+        return directives
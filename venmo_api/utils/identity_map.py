@@ -0,0 +1,43 @@
+import threading
+import weakref
+
+
+class IdentityMap(object):
+    """
+    One shared object per id, so a user that appears in many records is parsed and allocated once.
+    The objects are held weakly: the map never keeps alive what the caller dropped. Thread-safe.
+    The first object built for an id wins; clear() the map to pick up later changes of a user.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__objects = weakref.WeakValueDictionary()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :param key: id of the object
+        :return: the shared object, or <NoneType>
+        """
+        with self.__lock:
+            return self.__objects.get(key)
+
+    def setdefault(self, key, obj):
+        """
+        Register [obj] for [key], unless another thread registered one first.
+        :param key: id of the object
+        :param obj: the object just built
+        :return: the shared object for [key]
+        """
+        with self.__lock:
+            return self.__objects.setdefault(key, obj)
+
+    def clear(self):
+        with self.__lock:
+            self.__objects.clear()
+
+    def __len__(self):
+        return len(self.__objects)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
@@ -0,0 +1,294 @@
+from typing import Dict, List
+import copy
+import logging
+import re
+import threading
+import time
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+def get_path_template(resource_path: str) -> str:
+    """
+    The resource path with its ids replaced, so all the users (payments, ...) share one metric
+    e.g. '/users/2859950549165568970/friends' -> '/users/{id}/friends'
+    :param resource_path: <str>
+    :return: <str>
+    """
+    return re.sub(r'/\d+(?=/|$)', '/{id}', resource_path)
+
+
+class RequestInfo(object):
+    """
+    What the hooks get about one api call: the request, then its timings (seconds) and outcome.
+    dns_time, connect_time and tls_time are 0 when a pooled connection was reused, and None when unknown.
+    ttfb is measured from sending the request, the connection setup included.
+    """
+
+    __slots__ = ('method', 'resource_path', 'path_template', 'url', 'params', 'start_time', 'status_code', 'error',
+                 'retries', 'cache', 'total_time', 'dns_time', 'connect_time', 'tls_time', 'ttfb', 'response_size',
+                 'deserialize_time', 'records', '__deserialize_listeners')
+
+    def __init__(self, method: str, resource_path: str, url: str, params: dict = None,
+                 deserialize_listeners: List = None):
+        """
+        :param method: <str>
+        :param resource_path: <str> e.g. '/users/2859950549165568970'
+        :param url: <str>
+        :param params: <dict> [optional]
+        :param deserialize_listeners: <List[function]> [optional] Called with this RequestInfo once the response
+        is deserialized.
+        """
+        super().__init__()
+        self.method = method
+        self.resource_path = resource_path
+        self.path_template = get_path_template(resource_path)
+        self.url = url
+        self.params = params
+        # wall clock, for the exporters
+        self.start_time = time.time()
+        self.status_code = None
+        self.error = None
+        self.retries = 0
+        # 'hit' or 'revalidated' when served by the HttpCache
+        self.cache = None
+        self.total_time = None
+        self.dns_time = None
+        self.connect_time = None
+        self.tls_time = None
+        self.ttfb = None
+        self.response_size = None
+        self.deserialize_time = None
+        self.records = None
+        self.__deserialize_listeners = deserialize_listeners or []
+
+    def record_deserialize(self, seconds: float, records: int):
+        """
+        Called by deserialize() with the time it took to build the models of this response
+        :param seconds: <float>
+        :param records: <int> number of models built
+        :return:
+        """
+        self.deserialize_time = seconds
+        self.records = records
+        run_hooks(self.__deserialize_listeners, self)
+
+    def to_json(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('__')}
+
+    def __str__(self):
+        return f"RequestInfo: {self.method} {self.resource_path} {self.status_code} " \
+               f"{self.total_time * 1000 if self.total_time is not None else '-'}ms"
+
+
+class ApiResponse(dict):
+    """
+    The api_client response ({'status_code', 'headers', 'body'}) of an instrumented client, carrying its RequestInfo
+    so the deserialization time can be reported too.
+    """
+
+    __slots__ = ('request_info',)
+
+    def __init__(self, response: Dict, request_info: RequestInfo = None):
+        super().__init__(response)
+        self.request_info = request_info if request_info is not None else getattr(response, 'request_info', None)
+
+
+def run_hooks(hooks, request_info: RequestInfo):
+    """
+    Run the hooks one after the other. A failing hook is logged, it never fails the api call.
+    """
+    for hook in hooks:
+        try:
+            hook(request_info)
+        except Exception:
+            logging.exception("A Venmo API instrumentation hook failed.")
+
+
+class MetricsCollector(object):
+    """
+    Aggregates the RequestInfos per method and path template: requests, errors, retries, status codes, response
+    bytes, and histograms of the total, connect, TTFB and deserialize times. Pass it to ApiClient(metrics=...).
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    timings = ('total_time', 'dns_time', 'connect_time', 'tls_time', 'ttfb', 'deserialize_time')
+
+    def __init__(self, buckets=None):
+        """
+        :param buckets: <tuple> [optional] Upper bounds (seconds) of the histogram buckets.
+        """
+        super().__init__()
+        if buckets:
+            self.buckets = tuple(sorted(buckets))
+        self.__lock = threading.Lock()
+        self.__routes = {}
+
+    def after_request(self, request_info: RequestInfo):
+        with self.__lock:
+            route = self.__get_route(request_info)
+            route['requests'] += 1
+            route['retries'] += request_info.retries
+            if request_info.error is not None:
+                route['errors'] += 1
+            if request_info.cache:
+                route['cache_' + request_info.cache] += 1
+            status = str(request_info.status_code) if request_info.status_code is not None else 'error'
+            route['status_codes'][status] = route['status_codes'].get(status, 0) + 1
+            route['response_bytes'] += request_info.response_size or 0
+            for timing in self.timings[:-1]:
+                self.__observe(route[timing], getattr(request_info, timing))
+
+    def after_deserialize(self, request_info: RequestInfo):
+        with self.__lock:
+            route = self.__get_route(request_info)
+            route['records'] += request_info.records or 0
+            self.__observe(route['deserialize_time'], request_info.deserialize_time)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        :return: <dict> by 'METHOD /path/{id}': {'requests', 'errors', 'retries', 'cache_hit', 'cache_revalidated',
+        'status_codes', 'response_bytes', 'records', and per timing {'count', 'sum', 'mean', 'max', 'buckets'}}
+        """
+        with self.__lock:
+            stats = {}
+            for (method, path), route in self.__routes.items():
+                route_stats = dict(route, status_codes=dict(route['status_codes']))
+                for timing in self.timings:
+                    histogram = dict(route[timing], buckets=list(route[timing]['buckets']))
+                    histogram['mean'] = histogram['sum'] / histogram['count'] if histogram['count'] else 0.0
+                    route_stats[timing] = histogram
+                stats[f"{method} {path}"] = route_stats
+            return stats
+
+    def reset(self):
+        with self.__lock:
+            self.__routes = {}
+
+    def to_prometheus(self, prefix: str = 'venmo_api') -> str:
+        """
+        Export the metrics in the Prometheus text exposition format
+        :param prefix: <str> metric name prefix
+        :return: <str>
+        """
+        # A deep copy: after_request() keeps updating the histograms and status codes while they are exported
+        with self.__lock:
+            routes = copy.deepcopy(self.__routes)
+
+        lines = []
+
+        def counter(name, help_text, values):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in values:
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+        def labels_of(method, path, **extra):
+            labels = {"method": method, "path": path, **extra}
+            return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        counter('requests_total', "Venmo API requests.",
+                [(labels_of(method, path, status=status), count) for (method, path), route in routes.items()
+                 for status, count in sorted(route['status_codes'].items())])
+        counter('request_errors_total', "Venmo API requests that failed.",
+                [(labels_of(method, path), route['errors']) for (method, path), route in routes.items()])
+        counter('request_retries_total', "Retries of the Venmo API requests.",
+                [(labels_of(method, path), route['retries']) for (method, path), route in routes.items()])
+        counter('response_bytes_total', "Size of the Venmo API response bodies.",
+                [(labels_of(method, path), route['response_bytes']) for (method, path), route in routes.items()])
+
+        for timing, name, help_text in (
+                ('total_time', 'request_duration_seconds', "Time of the Venmo API calls, retries included."),
+                ('dns_time', 'dns_duration_seconds', "DNS lookup time of the new connections."),
+                ('connect_time', 'connect_duration_seconds', "Connect time of the new connections."),
+                ('tls_time', 'tls_duration_seconds', "TLS handshake time of the new connections."),
+                ('ttfb', 'ttfb_seconds', "Time to the first byte of the responses."),
+                ('deserialize_time', 'deserialize_duration_seconds', "Time to build the models of the responses.")):
+            name = f"{prefix}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, path), route in routes.items():
+                histogram = route[timing]
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels_of(method, path, le=bound)}}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels_of(method, path, le="+Inf")}}} {histogram["count"]}')
+                lines.append(f"{name}_sum{{{labels_of(method, path)}}} {histogram['sum']}")
+                lines.append(f"{name}_count{{{labels_of(method, path)}}} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def __call__(self, request_info: RequestInfo):
+        self.after_request(request_info)
+
+    def __get_route(self, request_info: RequestInfo) -> Dict:
+        key = (request_info.method, request_info.path_template)
+        route = self.__routes.get(key)
+        if route is None:
+            route = self.__routes[key] = {"requests": 0, "errors": 0, "retries": 0, "cache_hit": 0,
+                                          "cache_revalidated": 0, "status_codes": {}, "response_bytes": 0,
+                                          "records": 0}
+            for timing in self.timings:
+                route[timing] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(self.buckets)}
+        return route
+
+    def __observe(self, histogram: Dict, value):
+        if value is None:
+            return
+        histogram['count'] += 1
+        histogram['sum'] += value
+        histogram['max'] = max(histogram['max'], value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram['buckets'][i] += 1
+                break
+
+
+class OpenTelemetryExporter(object):
+    """
+    Post-request hook that records one OpenTelemetry span per api call, with its timings as attributes.
+    Requires opentelemetry-api (pip3 install venmo-api[otel]) and a configured tracer provider.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: <opentelemetry.trace.Tracer> [optional] Defaults to the tracer of the global provider.
+        """
+        super().__init__()
+        if otel_trace is None:
+            raise ImportError("OpenTelemetryExporter requires opentelemetry-api. "
+                              "Install it with: pip3 install venmo-api[otel]")
+        self.tracer = tracer or otel_trace.get_tracer('venmo_api')
+
+    def __call__(self, request_info: RequestInfo):
+        start_time = int(request_info.start_time * 1e9)
+        span = self.tracer.start_span(f"{request_info.method} {request_info.path_template}",
+                                      kind=otel_trace.SpanKind.CLIENT, start_time=start_time)
+        attributes = {"http.method": request_info.method,
+                      "http.url": request_info.url,
+                      "http.route": request_info.path_template,
+                      "venmo.retries": request_info.retries}
+        if request_info.status_code is not None:
+            attributes["http.status_code"] = request_info.status_code
+        if request_info.cache:
+            attributes["venmo.cache"] = request_info.cache
+        for name in ('dns_time', 'connect_time', 'tls_time', 'ttfb'):
+            value = getattr(request_info, name)
+            if value is not None:
+                attributes[f"venmo.{name}"] = value
+        if request_info.response_size is not None:
+            attributes["http.response_content_length"] = request_info.response_size
+        span.set_attributes(attributes)
+
+        if request_info.error is not None:
+            span.record_exception(request_info.error)
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(request_info.error)))
+
+        span.end(end_time=start_time + int((request_info.total_time or 0) * 1e9))
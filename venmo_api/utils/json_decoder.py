@@ -0,0 +1,81 @@
+from typing import Union
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonDecoder(object):
+    """
+    Decodes the response bodies, once per response. 'auto' picks the fastest installed backend:
+    orjson, then msgspec, then the standard json module.
+    """
+
+    backends = ('orjson', 'msgspec', 'json')
+
+    def __init__(self, backend: str = 'auto', decode=None):
+        """
+        :param backend: <str> 'auto', 'orjson', 'msgspec' or 'json'.
+        :param decode: <function> [optional] Your own decoder (e.g. simdjson), decode(<bytes>) -> object.
+        It must raise a ValueError on invalid JSON. Overrides [backend].
+        """
+        super().__init__()
+        if decode:
+            self.backend = getattr(decode, '__name__', 'custom')
+            self.__decode = decode
+            return
+
+        if backend == 'auto':
+            backend = 'orjson' if orjson else 'msgspec' if msgspec else 'json'
+
+        if backend == 'orjson':
+            if orjson is None:
+                raise ImportError("The orjson backend requires orjson. Install it with: pip3 install venmo-api[fast]")
+            self.__decode = orjson.loads
+        elif backend == 'msgspec':
+            if msgspec is None:
+                raise ImportError("The msgspec backend requires msgspec. "
+                                  "Install it with: pip3 install venmo-api[msgspec]")
+            self.__decode = self.__msgspec_decode
+        elif backend == 'json':
+            self.__decode = json.loads
+        else:
+            raise ValueError(f"Unknown JSON backend {backend}, choose one of {', '.join(self.backends)}.")
+
+        self.backend = backend
+
+    def decode(self, content: Union[bytes, str]):
+        """
+        :param content: <bytes> or <str> the response body
+        :return: the decoded JSON, {} for an empty body
+        :raises ValueError: if the body is not valid JSON
+        """
+        if not content:
+            return {}
+        return self.__decode(content)
+
+    def decode_body(self, content: Union[bytes, str]):
+        """
+        Decode the body of an api_client response
+        :param content: <bytes> or <str>
+        :return: <dict> the decoded body, {} for an empty (or null) one
+        :raises ValueError: if the body is not valid JSON
+        """
+        return self.decode(content) or {}
+
+    @staticmethod
+    def __msgspec_decode(content):
+        try:
+            return msgspec.json.decode(content)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def __repr__(self):
+        return f"JsonDecoder(backend={self.backend!r})"
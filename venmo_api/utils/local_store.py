@@ -0,0 +1,353 @@
+from venmo_api import User, Transaction, Payment, PaymentStatus, Comment, Mention, IdentityMap, SyncStateStore
+from datetime import datetime
+from typing import Iterable, List, Union
+import json
+import sqlite3
+import threading
+
+
+class LocalStore(SyncStateStore):
+    """
+    Local SQLite mirror of the Transactions, Payments, Users and friendships, queried without touching the network.
+    The rows are indexed by story id, payment id, actor/target id and date. The raw JSON of a model is stored
+    along (when it was kept) so the model is rebuilt in full. The models without it (keep_json=False, TypedDecoder)
+    are rebuilt from the columns, and the comments of their transactions from the comments table.
+    It is also a SyncStateStore, so an incremental sync can keep its high-water marks in the same file:
+
+        store.put_transactions(client.user.sync_user_transactions(store, user_id=user_id))
+    """
+
+    __schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY, username TEXT, first_name TEXT, last_name TEXT, display_name TEXT, phone TEXT,
+            profile_picture_url TEXT, about TEXT, date_joined INTEGER, is_group INTEGER, is_active INTEGER, json TEXT
+        );
+        CREATE INDEX IF NOT EXISTS users_username ON users (username);
+
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY, payment_id TEXT, date_created INTEGER, date_updated INTEGER, date_completed INTEGER,
+            payment_type TEXT, amount REAL, audience TEXT, status TEXT, note TEXT, device_used TEXT,
+            actor_id TEXT, target_id TEXT, json TEXT
+        );
+        CREATE INDEX IF NOT EXISTS transactions_payment_id ON transactions (payment_id);
+        CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date_created);
+        CREATE INDEX IF NOT EXISTS transactions_actor_date ON transactions (actor_id, date_created);
+        CREATE INDEX IF NOT EXISTS transactions_target_date ON transactions (target_id, date_created);
+
+        CREATE TABLE IF NOT EXISTS comments (
+            story_id TEXT, position INTEGER, id TEXT, message TEXT, date_created INTEGER, user_id TEXT, mentions TEXT,
+            PRIMARY KEY (story_id, position)
+        );
+
+        CREATE TABLE IF NOT EXISTS payments (
+            id TEXT PRIMARY KEY, action TEXT, amount REAL, audience TEXT, date_created INTEGER,
+            date_reminded INTEGER, date_completed INTEGER, note TEXT, status TEXT,
+            actor_id TEXT, target_id TEXT, json TEXT
+        );
+        CREATE INDEX IF NOT EXISTS payments_date ON payments (date_created);
+        CREATE INDEX IF NOT EXISTS payments_actor_date ON payments (actor_id, date_created);
+        CREATE INDEX IF NOT EXISTS payments_target_date ON payments (target_id, date_created);
+
+        CREATE TABLE IF NOT EXISTS friendships (
+            user_id TEXT, friend_id TEXT, PRIMARY KEY (user_id, friend_id)
+        );
+        CREATE INDEX IF NOT EXISTS friendships_friend_id ON friendships (friend_id);
+
+        CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    __user_columns = ('id', 'username', 'first_name', 'last_name', 'display_name', 'phone', 'profile_picture_url',
+                      'about', 'date_joined', 'is_group', 'is_active')
+    __transaction_columns = ('id', 'payment_id', 'date_created', 'date_updated', 'date_completed', 'payment_type',
+                             'amount', 'audience', 'status', 'note', 'device_used')
+    __payment_columns = ('id', 'action', 'amount', 'audience', 'date_created', 'date_reminded', 'date_completed',
+                         'note', 'status')
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        :param path: <str> SQLite database file. Defaults to an in-memory database.
+        """
+        super().__init__()
+        self.path = path
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.executescript(self.__schema)
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def put_users(self, users: Iterable[User]) -> int:
+        """
+        Insert or replace the users
+        :param users: <Iterable[User]>
+        :return: <int> number of users stored
+        """
+        with self.__lock, self.__connection:
+            return self.__put_users(users)
+
+    def put_transactions(self, transactions: Iterable[Transaction]) -> int:
+        """
+        Insert or replace the transactions, and their actor and target users
+        :param transactions: <Iterable[Transaction]>
+        :return: <int> number of transactions stored
+        """
+        rows = []
+        users = []
+        comment_rows = []
+        for transaction in transactions:
+            if not transaction:
+                continue
+            json_text = _dump_json(transaction)
+            rows.append([getattr(transaction, name) for name in self.__transaction_columns]
+                        + [_get_id(transaction.actor), _get_id(transaction.target), json_text])
+            users.extend((transaction.actor, transaction.target))
+            # The raw JSON holds the comments, without it they are stored in their own table
+            if json_text is None:
+                for position, comment in enumerate(transaction.comments or []):
+                    comment_rows.append(self.__get_comment_row(transaction.id, position, comment))
+                    users.append(comment.user)
+                    users.extend(mention.user for mention in comment.mentions or [])
+
+        with self.__lock, self.__connection:
+            self.__put_users(users)
+            self.__connection.executemany(
+                f"INSERT OR REPLACE INTO transactions ({', '.join(self.__transaction_columns)}, actor_id, target_id, "
+                f"json) VALUES ({', '.join('?' * (len(self.__transaction_columns) + 3))})", rows)
+            self.__connection.executemany("DELETE FROM comments WHERE story_id = ?", [(row[0],) for row in rows])
+            self.__connection.executemany(
+                "INSERT INTO comments (story_id, position, id, message, date_created, user_id, mentions) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", comment_rows)
+        return len(rows)
+
+    def put_payments(self, payments: Iterable[Payment]) -> int:
+        """
+        Insert or replace the payments, and their actor and target users
+        :param payments: <Iterable[Payment]>
+        :return: <int> number of payments stored
+        """
+        rows = []
+        users = []
+        for payment in payments:
+            if not payment:
+                continue
+            values = [getattr(payment, name) for name in self.__payment_columns]
+            values[-1] = payment.status.value if isinstance(payment.status, PaymentStatus) else payment.status
+            rows.append(values + [_get_id(payment.actor), _get_id(payment.target), _dump_json(payment)])
+            users.extend((payment.actor, payment.target))
+
+        with self.__lock, self.__connection:
+            self.__put_users(users)
+            self.__connection.executemany(
+                f"INSERT OR REPLACE INTO payments ({', '.join(self.__payment_columns)}, actor_id, target_id, json) "
+                f"VALUES ({', '.join('?' * (len(self.__payment_columns) + 3))})", rows)
+        return len(rows)
+
+    def put_friends(self, user_id: str, friends: Iterable[User]) -> int:
+        """
+        Store the friendships of [user_id] with [friends], and the friends
+        :param user_id: <str>
+        :param friends: <Iterable[User]>
+        :return: <int> number of friendships stored
+        """
+        friends = [friend for friend in friends if friend]
+        with self.__lock, self.__connection:
+            self.__put_users(friends)
+            self.__connection.executemany("INSERT OR IGNORE INTO friendships (user_id, friend_id) VALUES (?, ?)",
+                                          [(str(user_id), str(friend.id)) for friend in friends])
+        return len(friends)
+
+    def get_friends(self, user_id: str) -> List[User]:
+        """
+        The stored friends of [user_id]
+        :param user_id: <str>
+        :return: <List[User]>
+        """
+        rows = self.__select("SELECT users.* FROM friendships JOIN users ON users.id = friendships.friend_id "
+                             "WHERE friendships.user_id = ? ORDER BY users.id", (str(user_id),))
+        return [self.__to_user(row) for row in rows]
+
+    def get_user(self, user_id: str) -> Union[User, None]:
+        rows = self.__select("SELECT * FROM users WHERE id = ?", (str(user_id),))
+        return self.__to_user(rows[0]) if rows else None
+
+    def get_user_by_username(self, username: str) -> Union[User, None]:
+        rows = self.__select("SELECT * FROM users WHERE username = ?", (username,))
+        return self.__to_user(rows[0]) if rows else None
+
+    def get_transaction(self, story_id: str) -> Union[Transaction, None]:
+        rows = self.__select("SELECT * FROM transactions WHERE id = ?", (str(story_id),))
+        return self.__to_transaction(rows[0], IdentityMap()) if rows else None
+
+    def get_transaction_by_payment_id(self, payment_id: str) -> Union[Transaction, None]:
+        rows = self.__select("SELECT * FROM transactions WHERE payment_id = ?", (str(payment_id),))
+        return self.__to_transaction(rows[0], IdentityMap()) if rows else None
+
+    def get_payment(self, payment_id: str) -> Union[Payment, None]:
+        rows = self.__select("SELECT * FROM payments WHERE id = ?", (str(payment_id),))
+        return self.__to_payment(rows[0], IdentityMap()) if rows else None
+
+    def query_transactions(self, user_id: str = None, start: Union[datetime, float] = None,
+                           end: Union[datetime, float] = None, status: str = None,
+                           limit: int = None) -> List[Transaction]:
+        """
+        Stored transactions, newest first. E.g. all the transactions with a user in March:
+        query_transactions(user_id=user_id, start=datetime(2020, 3, 1), end=datetime(2020, 4, 1))
+        :param user_id: <str> [optional] the user is the actor or the target
+        :param start: <datetime> or timestamp [optional] date_created >= start
+        :param end: <datetime> or timestamp [optional] date_created < end
+        :param status: <str> [optional] e.g. 'settled'
+        :param limit: <int> [optional]
+        :return: <List[Transaction]>
+        """
+        rows = self.__query('transactions', user_id, start, end, status, limit)
+        identity_map = IdentityMap()
+        return [self.__to_transaction(row, identity_map) for row in rows]
+
+    def query_payments(self, user_id: str = None, start: Union[datetime, float] = None,
+                       end: Union[datetime, float] = None, status: PaymentStatus = None,
+                       limit: int = None) -> List[Payment]:
+        """
+        Stored payments, newest first. Same filters as query_transactions.
+        :return: <List[Payment]>
+        """
+        status = status.value if isinstance(status, PaymentStatus) else status
+        rows = self.__query('payments', user_id, start, end, status, limit)
+        identity_map = IdentityMap()
+        return [self.__to_payment(row, identity_map) for row in rows]
+
+    def get(self, key: str):
+        rows = self.__select("SELECT value FROM sync_state WHERE key = ?", (key,))
+        return rows[0]['value'] if rows else None
+
+    def set(self, key: str, value: str):
+        with self.__lock, self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    def __query(self, table, user_id, start, end, status, limit):
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("date_created >= ?")
+            params.append(_to_timestamp(start))
+        if end is not None:
+            conditions.append("date_created < ?")
+            params.append(_to_timestamp(end))
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+
+        where = " AND ".join(conditions)
+        if user_id is None:
+            sql = f"SELECT * FROM {table}" + (f" WHERE {where}" if where else "")
+        else:
+            # A UNION of the two sides, so each side uses its (actor/target, date) index
+            user_filter = f" AND {where}" if where else ""
+            sql = f"SELECT * FROM {table} WHERE actor_id = ?{user_filter} " \
+                  f"UNION SELECT * FROM {table} WHERE target_id = ?{user_filter}"
+            params = [str(user_id)] + params + [str(user_id)] + params
+
+        sql += " ORDER BY date_created DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return self.__select(sql, params)
+
+    def __select(self, sql, params=()):
+        with self.__lock:
+            return self.__connection.execute(sql, params).fetchall()
+
+    def __put_users(self, users: Iterable[User]) -> int:
+        rows = {}
+        for user in users:
+            if user:
+                rows[str(user.id)] = [getattr(user, name) for name in self.__user_columns] + [_dump_json(user)]
+
+        self.__connection.executemany(
+            f"INSERT OR REPLACE INTO users ({', '.join(self.__user_columns)}, json) "
+            f"VALUES ({', '.join('?' * (len(self.__user_columns) + 1))})", list(rows.values()))
+        return len(rows)
+
+    @staticmethod
+    def __get_comment_row(story_id, position: int, comment: Comment) -> list:
+        mentions = [{"username": mention.username, "user_id": _get_id(mention.user)}
+                    for mention in comment.mentions or []]
+        return [story_id, position, None if comment.id is None else str(comment.id), comment.message,
+                comment.date_created, _get_id(comment.user), json.dumps(mentions)]
+
+    def __get_comments(self, story_id, identity_map: IdentityMap) -> List[Comment]:
+        rows = self.__select("SELECT * FROM comments WHERE story_id = ? ORDER BY position", (story_id,))
+        return [Comment(id_=row['id'], message=row['message'], date_created=row['date_created'],
+                        mentions=[Mention(username=mention['username'],
+                                          user=self.__get_user(mention['user_id'], identity_map))
+                                  for mention in json.loads(row['mentions'] or '[]')],
+                        user=self.__get_user(row['user_id'], identity_map))
+                for row in rows]
+
+    def __to_user(self, row, identity_map: IdentityMap = None) -> User:
+        if row['json']:
+            return User.from_json(json.loads(row['json']), identity_map=identity_map)
+
+        return User(user_id=row['id'], username=row['username'], first_name=row['first_name'],
+                    last_name=row['last_name'], display_name=row['display_name'], phone=row['phone'],
+                    profile_picture_url=row['profile_picture_url'], about=row['about'],
+                    date_joined=row['date_joined'], is_group=_to_bool(row['is_group']),
+                    is_active=_to_bool(row['is_active']))
+
+    def __get_user(self, user_id, identity_map: IdentityMap) -> Union[User, None]:
+        if user_id is None:
+            return None
+        user = identity_map.get(user_id)
+        if user is None:
+            rows = self.__select("SELECT * FROM users WHERE id = ?", (user_id,))
+            user = identity_map.setdefault(user_id, self.__to_user(rows[0])) if rows else None
+        return user
+
+    def __to_transaction(self, row, identity_map: IdentityMap) -> Transaction:
+        if row['json']:
+            return Transaction.from_json(json.loads(row['json']), identity_map=identity_map)
+
+        return Transaction(story_id=row['id'], payment_id=row['payment_id'], date_completed=row['date_completed'],
+                           date_created=row['date_created'], date_updated=row['date_updated'],
+                           payment_type=row['payment_type'], amount=row['amount'], audience=row['audience'],
+                           status=row['status'], note=row['note'], device_used=row['device_used'],
+                           actor=self.__get_user(row['actor_id'], identity_map),
+                           target=self.__get_user(row['target_id'], identity_map),
+                           comments=self.__get_comments(row['id'], identity_map))
+
+    def __to_payment(self, row, identity_map: IdentityMap) -> Payment:
+        if row['json']:
+            return Payment.from_json(json.loads(row['json']), identity_map=identity_map)
+
+        return Payment(id_=row['id'], action=row['action'], amount=row['amount'], audience=row['audience'],
+                       date_created=row['date_created'], date_reminded=row['date_reminded'],
+                       date_completed=row['date_completed'], note=row['note'],
+                       status=PaymentStatus(row['status']) if row['status'] else None,
+                       actor=self.__get_user(row['actor_id'], identity_map),
+                       target=self.__get_user(row['target_id'], identity_map))
+
+
+def _get_id(user):
+    return str(user.id) if user is not None and user.id is not None else None
+
+
+def _dump_json(model):
+    return json.dumps(model._json) if model._json else None
+
+
+def _to_timestamp(date) -> float:
+    return date.timestamp() if isinstance(date, datetime) else date
+
+
+def _to_bool(value):
+    return None if value is None else bool(value)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from random import randint, choice
 from string import ascii_uppercase
 
@@ -11,6 +12,54 @@ def string_to_timestamp(utc):
     """
     if not utc:
         return
+
+    # Fast path for the two fixed-width Venmo formats: slice the fields instead of running strptime
+    length = len(utc)
+    if (length == 19 or 21 <= length <= 26 and utc[19] == '.' and utc[20:].isdigit()) \
+            and utc[10] == 'T' and utc[13] == ':' and utc[16] == ':' \
+            and (utc[11:13] + utc[14:16] + utc[17:19]).isdigit():
+        hour = int(utc[11:13])
+        minute = int(utc[14:16])
+        second = int(utc[17:19])
+        if hour < 24 and minute < 60 and second < 60:
+            day_timestamp = _day_to_timestamp(utc[:10])
+            if day_timestamp is not None:
+                microsecond = int(utc[20:].ljust(6, '0')) if length > 19 else 0
+                if day_timestamp is _IRREGULAR_DAY:
+                    date = datetime(int(utc[:4]), int(utc[5:7]), int(utc[8:10]), hour, minute, second, microsecond)
+                    return int(date.timestamp())
+                return int(day_timestamp + hour * 3600 + minute * 60 + second + microsecond / 1e6)
+
+    return _strptime_to_timestamp(utc)
+
+
+# Marks a day on which the local UTC offset changes (DST)
+_IRREGULAR_DAY = object()
+
+
+@lru_cache(maxsize=4096)
+def _day_to_timestamp(day):
+    """
+    Timestamp of the start of the day, interpreted like a naive datetime (local time).
+    A history spans few distinct days compared to its number of dates, so they are memoized.
+    :param day: String, Format "2019-02-07"
+    :return: int, timestamp, _IRREGULAR_DAY, or None if the format doesn't match
+    """
+    if day[4] != '-' or day[7] != '-' or not (day[:4] + day[5:7] + day[8:10]).isdigit():
+        return None
+
+    start = datetime(int(day[:4]), int(day[5:7]), int(day[8:10]))
+    start_timestamp = start.timestamp()
+    if start.replace(hour=23, minute=59, second=59).timestamp() - start_timestamp != 86399:
+        return _IRREGULAR_DAY
+
+    return int(start_timestamp)
+
+
+def _strptime_to_timestamp(utc):
+    """
+    Slow path of string_to_timestamp, for the strings that don't match the fixed-width formats.
+    """
     try:
         _date = datetime.strptime(utc, '%Y-%m-%dT%H:%M:%S')
     # This except was added for comments (on transactions) - they display the date_created down to the microsecond
@@ -0,0 +1,207 @@
+from venmo_api import Page
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator
+import asyncio
+import queue
+import sys
+import threading
+
+
+def iter_pages(page: Page, prefetch: int = 0) -> Iterator[Page]:
+    """
+    Iterate over [page] and every page after it, until an empty page.
+    :param page: <Page> the first page, returned by a paginated api method
+    :param prefetch: <int> Number of pages to fetch ahead in the background. 0 fetches one page at a time.
+    :return: <Iterator[Page]>
+    """
+    if prefetch < 1 or not page:
+        while page:
+            yield page
+            page = page.get_next_page()
+        return
+
+    if page.current_offset > -1:
+        yield from __iter_offset_pages(page, prefetch)
+    else:
+        yield from __iter_cursor_pages(page, prefetch)
+
+
+async def async_iter_pages(page: Page, prefetch: int = 0) -> AsyncIterator[Page]:
+    """
+    asyncio version of iter_pages(), for the pages of the async apis.
+    :param page: <Page> the first page, returned by an awaited paginated api method
+    :param prefetch: <int> Number of pages to fetch ahead as background tasks. 0 fetches one page at a time.
+    :return: <AsyncIterator[Page]>
+    """
+    if prefetch < 1 or not page:
+        while page:
+            yield page
+            page = await page.get_next_page()
+        return
+
+    if page.current_offset > -1:
+        pages = __async_iter_offset_pages(page, prefetch)
+    else:
+        pages = __async_iter_cursor_pages(page, prefetch)
+
+    async for next_page in pages:
+        yield next_page
+
+
+def __iter_cursor_pages(page: Page, prefetch: int) -> Iterator[Page]:
+    """
+    before_id paging: each request needs the last id of the previous page, so the pages are fetched in a chain
+    by a background thread that runs at most [prefetch] pages ahead of the consumer.
+    """
+    pages = queue.Queue(maxsize=prefetch)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            next_page = page.get_next_page()
+            while next_page and put(next_page):
+                next_page = next_page.get_next_page()
+            put(None)
+        except BaseException as e:
+            put(e)
+
+    # The next page is requested right away, while the consumer works on the first one
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        yield page
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+def __iter_offset_pages(page: Page, prefetch: int) -> Iterator[Page]:
+    """
+    offset paging: the offsets are known in advance, so up to [prefetch] pages are fetched in parallel.
+    The step is the size of the first page (the server may serve less than the limit).
+    A page shorter than that is the last one.
+    A first page shorter than the limit is most likely the whole result, so nothing is prefetched for it.
+    """
+    if __is_short_page(page):
+        while page:
+            yield page
+            page = page.get_next_page()
+        return
+
+    step = len(page)
+    next_offsets = iter(range(page.current_offset + step, sys.maxsize, step))
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix='venmo-api-prefetch')
+    in_flight = deque()
+
+    def fill():
+        while len(in_flight) < prefetch:
+            in_flight.append(executor.submit(page.method, **{**page.kwargs, 'offset': next(next_offsets)}))
+
+    try:
+        fill()
+        yield page
+        while in_flight:
+            next_page = in_flight.popleft().result()
+            if not next_page:
+                return
+            if len(next_page) == step:
+                fill()
+            yield next_page
+            if len(next_page) < step:
+                return
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def __async_iter_cursor_pages(page: Page, prefetch: int) -> AsyncIterator[Page]:
+    """
+    before_id paging: a background task fetches the chain of pages, at most [prefetch] pages ahead of the consumer.
+    """
+    pages = asyncio.Queue(maxsize=prefetch)
+
+    async def produce():
+        try:
+            next_page = await page.get_next_page()
+            while next_page:
+                await pages.put(next_page)
+                next_page = await next_page.get_next_page()
+            await pages.put(None)
+        except Exception as e:
+            await pages.put(e)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        yield page
+        while True:
+            item = await pages.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+
+async def __async_iter_offset_pages(page: Page, prefetch: int) -> AsyncIterator[Page]:
+    """
+    offset paging: up to [prefetch] offsets are requested concurrently, unless the first page is short.
+    """
+    if __is_short_page(page):
+        while page:
+            yield page
+            page = await page.get_next_page()
+        return
+
+    step = len(page)
+    next_offsets = iter(range(page.current_offset + step, sys.maxsize, step))
+    in_flight = deque()
+
+    def fill():
+        while len(in_flight) < prefetch:
+            offset = next(next_offsets)
+            in_flight.append(asyncio.ensure_future(page.method(**{**page.kwargs, 'offset': offset})))
+
+    try:
+        fill()
+        yield page
+        while in_flight:
+            next_page = await in_flight.popleft()
+            if not next_page:
+                return
+            if len(next_page) == step:
+                fill()
+            yield next_page
+            if len(next_page) < step:
+                return
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+def __is_short_page(page: Page) -> bool:
+    """
+    The page has fewer items than the limit it was requested with. The pages after it are fetched one at a time,
+    the way the sequential iteration would, instead of spending [prefetch] requests (and rate limit) on them.
+    :param page: <Page> first page of an offset paginated route
+    :return: <bool>
+    """
+    limit = page.kwargs.get('limit')
+    return bool(limit) and len(page) < limit
@@ -0,0 +1,222 @@
+from venmo_api import NotEnoughBalanceError, GeneralPaymentError, HttpCodeError, ResourceNotFoundError, \
+    InvalidArgumentError, ArgumentMissingError, NoPaymentMethodFoundError, Payout, PayoutAction, PayoutResult, \
+    PayoutStatus, RateLimiter, RetryPolicy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import json
+import os
+import threading
+
+
+class PayoutBatch(object):
+    """
+    Send or request a list of payouts with bounded concurrency and a rate limit.
+    With a checkpoint file, a batch that died partway through can be run again: the payouts that are already
+    done are not sent twice.
+    """
+
+    def __init__(self, payment_api, max_workers: int = 4,
+                 rate_limiter: RateLimiter = None,
+                 checkpoint_path: str = None,
+                 retry_failed: bool = False):
+        """
+        :param payment_api: <PaymentApi> the payments are made with it
+        :param max_workers: <int> Number of payments in flight at the same time.
+        :param rate_limiter: <RateLimiter> [optional] Limits the payments per second of the account. Share the same
+        RateLimiter between the batches of one account.
+        :param checkpoint_path: <str> [optional] File to record the progress in, and resume from.
+        :param retry_failed: <bool> On resume, send again the payouts that were rejected in the previous run
+        (NOT_ENOUGH_BALANCE, PAYMENT_ERROR, FAILED). UNKNOWN payouts are never sent again.
+        """
+        super().__init__()
+        self.__payment_api = payment_api
+        self.__max_workers = max_workers
+        self.__rate_limiter = rate_limiter
+        self.__checkpoint = _PayoutCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.__retry_failed = retry_failed
+
+    def run(self, payouts: List[Payout]) -> List[PayoutResult]:
+        """
+        Run the batch
+        :param payouts: <List[Payout]>
+        :return: <List[PayoutResult]> one result per payout, in the same order
+        """
+        keys = self.__get_keys(payouts)
+        recorded = self.__checkpoint.load() if self.__checkpoint else {}
+
+        results = [None] * len(payouts)
+        pending = []
+        for index, (payout, key) in enumerate(zip(payouts, keys)):
+            resumed_result = self.__get_resumed_result(payout, recorded.get(key))
+            if resumed_result:
+                results[index] = resumed_result
+            else:
+                pending.append(index)
+
+        self.__resolve_funding_source([payouts[index] for index in pending])
+
+        def run_one(index):
+            results[index] = self.__run_payout(payouts[index], keys[index])
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix='venmo-api-payout') as executor:
+            list(executor.map(run_one, pending))
+
+        return results
+
+    def __run_payout(self, payout: Payout, key: str) -> PayoutResult:
+        if self.__rate_limiter:
+            self.__rate_limiter.acquire()
+
+        # Record the attempt first: if the process dies now, the payout is UNKNOWN instead of sent twice
+        self.__record(key, 'started')
+        try:
+            if payout.action is PayoutAction.REQUEST:
+                self.__payment_api.request_money(amount=payout.amount,
+                                                 note=payout.note,
+                                                 target_user_id=payout.target_user_id,
+                                                 privacy_setting=payout.privacy_setting)
+            else:
+                self.__payment_api.send_money(amount=payout.amount,
+                                              note=payout.note,
+                                              target_user_id=payout.target_user_id,
+                                              funding_source_id=payout.funding_source_id,
+                                              privacy_setting=payout.privacy_setting)
+            result = PayoutResult(payout=payout, status=PayoutStatus.SUCCEEDED)
+
+        except NotEnoughBalanceError as e:
+            result = PayoutResult(payout=payout, status=PayoutStatus.NOT_ENOUGH_BALANCE, error=e)
+        except GeneralPaymentError as e:
+            result = PayoutResult(payout=payout, status=PayoutStatus.PAYMENT_ERROR, error=e)
+        except Exception as e:
+            result = PayoutResult(payout=payout, status=self.__get_error_status(e), error=e)
+
+        self.__record(key, 'done', status=result.status, error_message=result.error_message)
+        return result
+
+    @staticmethod
+    def __get_error_status(error: Exception) -> PayoutStatus:
+        """
+        FAILED only if the payment surely never went through, UNKNOWN if the request may have reached Venmo.
+        :param error: <Exception> raised while sending the payout
+        :return: <PayoutStatus>
+        """
+        # Raised before anything is sent: bad arguments, no funding source, or the connection couldn't be opened
+        # (refused, unresolved host or connect timeout, see RetryPolicy.is_connect_error). A connection that broke
+        # after it was opened is UNKNOWN, the request may have been sent.
+        if isinstance(error, (InvalidArgumentError, ArgumentMissingError, NoPaymentMethodFoundError,
+                              ResourceNotFoundError)) or RetryPolicy.is_connect_error(error):
+            return PayoutStatus.FAILED
+
+        # Venmo rejected the payment (4xx). A 5xx (or no status at all) may come after the money moved.
+        if isinstance(error, HttpCodeError):
+            if error.status_code is not None and 400 <= error.status_code < 500:
+                return PayoutStatus.FAILED
+
+        return PayoutStatus.UNKNOWN
+
+    def __resolve_funding_source(self, payouts: List[Payout]):
+        """
+        Fetch the default funding source once for the whole batch, if any payout needs it. The payouts without a
+        funding source then use the cached default of the PaymentApi, which is resolved again after a failed payment
+        (refresh_funding_source_on_error), so the next payouts pick up a changed default.
+        :param payouts: <List[Payout]> the payouts that are going to be sent
+        :return:
+        """
+        if any(payout.action is PayoutAction.SEND and not payout.funding_source_id for payout in payouts):
+            self.__payment_api.get_default_payment_method(force_update=True)
+
+    def __get_resumed_result(self, payout: Payout, record: Dict):
+        """
+        Build the result of a payout from the checkpoint of a previous run, if it must not be sent again.
+        :param payout: <Payout>
+        :param record: <Dict> last checkpoint record of this payout
+        :return: <PayoutResult> or <NoneType>
+        """
+        if not record:
+            return None
+
+        if record['state'] == 'started':
+            return PayoutResult(payout=payout, status=PayoutStatus.UNKNOWN, resumed=True,
+                                error_message="The previous run stopped while sending this payout.")
+
+        status = PayoutStatus(record['status'])
+        if self.__retry_failed and status in (PayoutStatus.NOT_ENOUGH_BALANCE,
+                                              PayoutStatus.PAYMENT_ERROR,
+                                              PayoutStatus.FAILED):
+            return None
+
+        return PayoutResult(payout=payout, status=status, error_message=record.get('error'), resumed=True)
+
+    def __record(self, key, state, status: PayoutStatus = None, error_message: str = None):
+        if self.__checkpoint:
+            self.__checkpoint.record(key, state, status=status, error_message=error_message)
+
+    @staticmethod
+    def __get_keys(payouts: List[Payout]) -> List[str]:
+        """
+        Checkpoint key of each payout. Identical payouts without an explicit key are numbered.
+        :param payouts: <List[Payout]>
+        :return: <List[str]>
+        """
+        keys = []
+        seen = {}
+        for payout in payouts:
+            key = payout.key or payout.get_default_key()
+            count = seen.get(key, 0)
+            seen[key] = count + 1
+            keys.append(key if count == 0 else f"{key}#{count}")
+
+        if len(set(keys)) != len(keys):
+            raise ValueError("Each payout of a batch must have a unique key.")
+
+        return keys
+
+
+class _PayoutCheckpoint(object):
+    """
+    Append-only JSON lines file. The last line of a key wins.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict]:
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, encoding="utf-8") as checkpoint:
+            lines = checkpoint.readlines()
+
+        # Terminate a line cut short by a crash, so the next record starts on its own line
+        if lines and not lines[-1].endswith("\n"):
+            with open(self.path, 'a', encoding="utf-8") as checkpoint:
+                checkpoint.write("\n")
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash
+                continue
+            records[record['key']] = record
+
+        return records
+
+    def record(self, key: str, state: str, status: PayoutStatus = None, error_message: str = None):
+        line = {"key": key, "state": state}
+        if status is not None:
+            line["status"] = status.value
+        if error_message:
+            line["error"] = error_message
+
+        with self.__lock:
+            with open(self.path, 'a', encoding="utf-8") as checkpoint:
+                checkpoint.write(json.dumps(line) + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
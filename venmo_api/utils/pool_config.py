@@ -0,0 +1,47 @@
+class PoolConfig(object):
+
+    def __init__(self, max_connections: int = 100,
+                 max_connections_per_host: int = 10,
+                 block: bool = False,
+                 connect_timeout: float = None,
+                 read_timeout: float = None,
+                 keep_alive: bool = True):
+        """
+        Connection pool settings shared by ApiClient and AsyncApiClient
+        :param max_connections: <int> Max number of connections kept in the pool, across all hosts.
+        :param max_connections_per_host: <int> Max number of connections to the same host. Keep it at least as
+        large as the number of worker threads, otherwise the extra connections are closed after each request.
+        :param block: <bool> When all the connections to a host are busy, wait for one instead of opening
+        a throwaway connection.
+        :param connect_timeout: <float> [optional] Seconds to wait for establishing a connection.
+        :param read_timeout: <float> [optional] Seconds to wait for the server to send data.
+        :param keep_alive: <bool> Keep connections open between requests. Pass False to close them after each one.
+        """
+        super().__init__()
+
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.block = block
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+
+    def get_num_pools(self) -> int:
+        """
+        Number of per-host pools to keep, so that all pools together hold at most max_connections.
+        :return: <int>
+        """
+        return max(1, self.max_connections // max(1, self.max_connections_per_host))
+
+    def get_timeout(self):
+        """
+        Timeout in the (connect, read) format that requests expects.
+        :return: <tuple> or <NoneType>
+        """
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+
+        return self.connect_timeout, self.read_timeout
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join('%s=%s' % item for item in vars(self).items())})"
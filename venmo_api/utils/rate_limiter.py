@@ -0,0 +1,142 @@
+from venmo_api import InvalidArgumentError
+import asyncio
+import threading
+import time
+
+
+class RateLimiter(object):
+    """
+    Thread-safe token bucket. Tokens refill at [rate] per second, up to [burst] tokens.
+    An adaptive limiter halves its rate when Venmo throttles (429) and slowly climbs back to [rate] on success.
+    """
+
+    def __init__(self, rate: float, burst: float = None, timer=time.monotonic, sleep=time.sleep,
+                 adaptive: bool = False, min_rate: float = None):
+        """
+        :param rate: <float> Tokens (requests) per second.
+        :param burst: <float> [optional] Bucket size, the number of requests that can go out at once. Defaults to
+        max(1, rate).
+        :param timer: <function> Clock of the bucket.
+        :param sleep: <function> Function used to wait for tokens.
+        :param adaptive: <bool> Follow the throttling signals given to on_throttled() and on_success().
+        :param min_rate: <float> [optional] The adaptive rate never goes below it. Defaults to rate / 16.
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be a positive number.")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.adaptive = adaptive
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.__max_rate = rate
+
+        self.__timer = timer
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__tokens = self.burst
+        self.__updated_at = timer()
+
+    def acquire(self, tokens: float = 1, blocking: bool = True, timeout: float = None) -> bool:
+        """
+        Take [tokens] from the bucket, waiting for them if needed.
+        :param tokens: <float>
+        :param blocking: <bool> Wait for the tokens. If False, return False right away when there are not enough.
+        :param timeout: <float> [optional] Max seconds to wait.
+        :return: <bool> True if the tokens were taken
+        :raises InvalidArgumentError: if [tokens] is more than the bucket can ever hold
+        """
+        deadline = self.__timer() + timeout if timeout is not None else None
+
+        while True:
+            wait = self.__take(tokens)
+            if wait == 0:
+                return True
+
+            if not blocking:
+                return False
+            if deadline is not None:
+                remaining = deadline - self.__timer()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            self.__sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1):
+        """
+        Take [tokens] from the bucket, waiting for them without blocking the event loop.
+        :param tokens: <float>
+        :return:
+        :raises InvalidArgumentError: if [tokens] is more than the bucket can ever hold
+        """
+        while True:
+            wait = self.__take(tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def on_throttled(self):
+        """
+        Venmo answered 429: halve the rate (down to min_rate) and empty the bucket.
+        :return:
+        """
+        if not self.adaptive:
+            return
+
+        with self.__lock:
+            self.__refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.__tokens = 0
+
+    def on_success(self):
+        """
+        A request went through: give back a bit of the rate lost to throttling.
+        :return:
+        """
+        if not self.adaptive or self.rate >= self.__max_rate:
+            return
+
+        with self.__lock:
+            self.__refill()
+            self.rate = min(self.__max_rate, self.rate + self.__max_rate / 20)
+
+    def set_rate(self, rate: float, burst: float = None):
+        """
+        Change the refill rate (and optionally the bucket size) on the fly.
+        :param rate: <float> Tokens per second.
+        :param burst: <float> [optional] New bucket size.
+        :return:
+        """
+        if rate <= 0:
+            raise ValueError("rate must be a positive number.")
+
+        with self.__lock:
+            self.__refill()
+            self.rate = rate
+            self.__max_rate = rate
+            if burst is not None:
+                self.burst = burst
+                self.__tokens = min(self.__tokens, burst)
+
+    def __take(self, tokens: float) -> float:
+        """
+        Take the tokens if there are enough.
+        :return: <float> 0 if they were taken, otherwise the seconds to wait for them
+        :raises InvalidArgumentError: if [tokens] is more than the bucket can ever hold, they would never come
+        """
+        with self.__lock:
+            # Checked under the lock, set_rate() may shrink the bucket while a caller waits
+            if tokens > self.burst:
+                raise InvalidArgumentError(argument_name='tokens',
+                                           reason=f"{tokens} tokens can't be taken from a bucket of {self.burst}.")
+            self.__refill()
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return 0
+            return (tokens - self.__tokens) / self.rate
+
+    def __refill(self):
+        now = self.__timer()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__updated_at) * self.rate)
+        self.__updated_at = now
@@ -0,0 +1,127 @@
+from email.utils import parsedate_to_datetime
+from typing import Iterable
+import asyncio
+import datetime
+import random
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class RetryPolicy(object):
+    """
+    When and how long to wait before retrying a request.
+    Idempotent methods (GET by default) are retried on the listed status codes and on connection errors, with
+    jittered exponential backoff (or the server's Retry-After, up to max_backoff). Other methods (POST, and PUT
+    which reminds or cancels a payment) are only retried when the connection could not be established, i.e. when
+    the request certainly never reached Venmo.
+    """
+
+    def __init__(self, max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 idempotent_methods: Iterable[str] = ('GET',),
+                 respect_retry_after: bool = True):
+        """
+        :param max_retries: <int> Max number of retries of one request. 0 disables the retries.
+        :param backoff_factor: <float> The n-th retry waits a random time in [0, backoff_factor * 2^n] seconds.
+        :param max_backoff: <float> Upper bound of the backoff, in seconds. A longer Retry-After is cut down to it.
+        :param retry_statuses: <Iterable[int]> Status codes worth retrying for the idempotent methods.
+        :param idempotent_methods: <Iterable[str]> Methods that are safe to send twice. Add 'PUT' to retry the
+        reminders and cancellations too.
+        :param respect_retry_after: <bool> Wait for the Retry-After header of the response, when there is one.
+        """
+        super().__init__()
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, method: str, attempt: int, status_code: int = None, error: Exception = None) -> bool:
+        """
+        :param method: <str> HTTP method of the request
+        :param attempt: <int> Number of retries that were already made
+        :param status_code: <int> [optional] Status code of the response
+        :param error: <Exception> [optional] The exception raised instead of a response
+        :return: <bool>
+        """
+        if attempt >= self.max_retries:
+            return False
+
+        if error is not None:
+            if self.is_connect_error(error):
+                return True
+            return method in self.idempotent_methods and self.__is_transport_error(error)
+
+        return method in self.idempotent_methods and status_code in self.retry_statuses
+
+    def get_backoff(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Seconds to wait before the retry number [attempt] + 1.
+        :param attempt: <int> Number of retries that were already made
+        :param retry_after: <str> [optional] Value of the Retry-After header
+        :return: <float>
+        """
+        if self.respect_retry_after and retry_after:
+            seconds = self.parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_backoff)
+
+        # "Full jitter": spreads the retries of concurrent callers instead of synchronizing them
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def parse_retry_after(retry_after: str):
+        """
+        Parse a Retry-After header, either delay-seconds or an HTTP-date.
+        :param retry_after: <str>
+        :return: <float> seconds, or <NoneType> if it can't be parsed
+        """
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+        if date is None:
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+    @staticmethod
+    def is_connect_error(error: Exception) -> bool:
+        """
+        The connection could not be established (refused, unresolved host, connect timeout), so nothing was sent.
+        :param error: <Exception>
+        :return: <bool>
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+
+        if isinstance(error, requests.exceptions.ConnectionError):
+            reason = error.args[0] if error.args else None
+            reason = getattr(reason, 'reason', reason)
+            return type(reason).__name__ in ('NewConnectionError', 'NameResolutionError')
+
+        return aiohttp is not None and isinstance(error, aiohttp.ClientConnectorError)
+
+    @staticmethod
+    def __is_transport_error(error: Exception) -> bool:
+        """
+        The request failed before a response was received. It may or may not have reached Venmo.
+        """
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, asyncio.TimeoutError)):
+            return True
+
+        return aiohttp is not None and isinstance(error, aiohttp.ClientError)
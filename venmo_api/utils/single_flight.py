@@ -0,0 +1,128 @@
+from venmo_api import ApiResponse
+from concurrent.futures import Future
+from typing import Dict, Hashable
+import asyncio
+import threading
+
+
+class SharedResponse(ApiResponse):
+    """
+    An api_client response that is shared by coalesced calls. It remembers what it was deserialized into,
+    so the callers sharing it also share one deserialized result.
+    """
+
+    __slots__ = ('__lock', '__deserialized')
+
+    def __init__(self, response: Dict):
+        super().__init__(response)
+        self.__lock = threading.Lock()
+        self.__deserialized = {}
+
+    def get_deserialized(self, key: Hashable, build):
+        """
+        Get the result deserialized under [key], build it the first time.
+        :param key: <Hashable> Everything the result depends on (data type, identity map, ...)
+        :param build: <function> Builds the result.
+        :return:
+        """
+        with self.__lock:
+            if key not in self.__deserialized:
+                self.__deserialized[key] = build()
+            return self.__deserialized[key]
+
+
+class SingleFlight(object):
+    """
+    Runs one call per key at a time: the threads asking for a key that is already in flight wait for that call
+    and share its result (or its exception) instead of making their own.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__calls = {}
+        self.__lock = threading.Lock()
+        self.__stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, function):
+        """
+        :param key: <Hashable> Identifies identical calls.
+        :param function: <function> Makes the call, it runs once for all the concurrent callers of [key].
+        :return: the result of [function]
+        """
+        with self.__lock:
+            future = self.__calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.__calls[key] = Future()
+                self.__stats['calls'] += 1
+            else:
+                self.__stats['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> {'calls': <int> calls made, 'coalesced': <int> calls that joined one in flight}
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+
+class AsyncSingleFlight(object):
+    """
+    SingleFlight for coroutines. The coroutines asking for a key that is already in flight await that call.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__calls = {}
+        self.__stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, coroutine_function):
+        """
+        :param key: <Hashable> Identifies identical calls.
+        :param coroutine_function: <function> Returns the coroutine making the call.
+        :return: the result of the coroutine
+        """
+        future = self.__calls.get(key)
+        if future is not None:
+            self.__stats['coalesced'] += 1
+            # A waiter being cancelled must not cancel the call the others are waiting for
+            return await asyncio.shield(future)
+
+        future = self.__calls[key] = asyncio.get_event_loop().create_future()
+        self.__stats['calls'] += 1
+        try:
+            result = await coroutine_function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark it retrieved, there might be nobody else waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.__calls[key]
+
+    def get_stats(self) -> dict:
+        """
+        :return: <dict> {'calls': <int> calls made, 'coalesced': <int> calls that joined one in flight}
+        """
+        return dict(self.__stats)
@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from itertools import takewhile
+from typing import Dict, List
+import json
+import os
+import tempfile
+import threading
+
+
+class SyncStateStore(ABC):
+    """
+    Where the incremental syncs keep their high-water marks (the newest story id synced, per user or user pair).
+    Subclass it and implement get and set to keep them somewhere else (a database, redis, ...).
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """
+        :param key: <str>
+        :return: <str> the high-water mark, or <NoneType> if the key was never synced
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """
+        :param key: <str>
+        :param value: <str> the new high-water mark, or <NoneType> to clear the key
+        :return:
+        """
+        raise NotImplementedError
+
+
+class MemoryStateStore(SyncStateStore):
+    """
+    Keeps the high-water marks for the life of the process.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__state = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.__lock:
+            return self.__state.get(key)
+
+    def set(self, key: str, value: str):
+        with self.__lock:
+            self.__state[key] = value
+
+
+class JSONFileStateStore(SyncStateStore):
+    """
+    Keeps the high-water marks in a JSON file. Every update rewrites the file atomically.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: <str> The file is created on the first update.
+        """
+        super().__init__()
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__state = None
+
+    def get(self, key: str):
+        with self.__lock:
+            return self.__load().get(key)
+
+    def set(self, key: str, value: str):
+        with self.__lock:
+            state = dict(self.__load())
+            state[key] = value
+            self.__write(state)
+            self.__state = state
+
+    def __load(self) -> Dict[str, str]:
+        if self.__state is None:
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as state_file:
+                    self.__state = json.load(state_file)
+            else:
+                self.__state = {}
+        return self.__state
+
+    def __write(self, state: Dict[str, str]):
+        # Write a temporary file next to the target and swap it in, so a crash never leaves a half-written file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.venmo-sync-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding="utf-8") as tmp_file:
+                json.dump(state, tmp_file, indent=2, sort_keys=True)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class StorySync(object):
+    """
+    The state of one run of an incremental story sync, paging backward from the newest story.
+    A run stopped by max_pages before it reached the previous high-water mark keeps the mark where it was, and
+    records a resume cursor (the oldest story reached) and the pending mark (the newest story of that run) in
+    "<key>:cursor" and "<key>:pending". The next runs page on from the cursor, and the pending mark becomes the
+    high-water mark once they reach the old one (or the end of the history), so no story is skipped.
+    """
+
+    def __init__(self, state_store: SyncStateStore, key: str):
+        """
+        :param state_store: <SyncStateStore>
+        :param key: <str> key of the high-water mark
+        """
+        super().__init__()
+        self.complete = False
+        self.__state_store = state_store
+        self.__key = key
+        self.__high_water_mark = state_store.get(key)
+        self.__pending_mark = state_store.get(f"{key}:pending")
+        self.before_id = state_store.get(f"{key}:cursor")
+        self.resuming = self.before_id is not None
+        self.__newest_id = None
+
+    def add_page(self, stories: List[Dict]) -> List[Dict]:
+        """
+        Read a page of stories, newest first
+        :param stories: <List[Dict]> the 'data' of the page
+        :return: <List[Dict]> the stories of the page that are newer than the high-water mark
+        """
+        high_water_mark = self.__high_water_mark
+        new_stories = list(takewhile(lambda story: is_newer_story(story.get('id'), high_water_mark), stories))
+        if new_stories and self.__newest_id is None:
+            self.__newest_id = new_stories[0].get('id')
+
+        if len(new_stories) < len(stories) or not stories:
+            self.complete = True
+        else:
+            self.before_id = stories[-1].get('id')
+        return new_stories
+
+    def commit(self):
+        """
+        Save the progress of the run, once its stories were handed over
+        :return:
+        """
+        key, state_store = self.__key, self.__state_store
+        if self.complete:
+            new_mark = self.__pending_mark if self.resuming else self.__newest_id
+            if new_mark is not None:
+                state_store.set(key, new_mark)
+            if self.resuming:
+                state_store.set(f"{key}:cursor", None)
+                state_store.set(f"{key}:pending", None)
+        elif self.before_id is not None:
+            # Stopped by max_pages: the mark waits until the older stories are synced too
+            if not self.resuming:
+                state_store.set(f"{key}:pending", self.__newest_id)
+            state_store.set(f"{key}:cursor", self.before_id)
+
+
+def is_newer_story(story_id, high_water_mark) -> bool:
+    """
+    Whether [story_id] is newer than the [high_water_mark]. Story ids grow over time; they are compared as numbers
+    when both are numeric, otherwise only the high-water mark itself is known data.
+    :param story_id: <str>
+    :param high_water_mark: <str> or <NoneType>
+    :return: <bool>
+    """
+    if high_water_mark is None:
+        return True
+
+    story_id, high_water_mark = str(story_id), str(high_water_mark)
+    if story_id.isdigit() and high_water_mark.isdigit():
+        return int(story_id) > int(high_water_mark)
+
+    return story_id != high_water_mark
@@ -0,0 +1,150 @@
+from venmo_api import JsonDecoder, User, Transaction, Payment, Page, IdentityMap
+from collections.abc import Mapping
+from typing import Union
+import threading
+
+try:
+    import msgspec
+    from venmo_api.models import typed_schema
+except ImportError:
+    msgspec = typed_schema = None
+
+
+class LazyBody(Mapping):
+    """
+    A response body kept as raw bytes: read like a dict it is decoded (once) on the first access, while
+    deserialize() decodes it straight into typed structs when the TypedDecoder has a schema for the data type.
+    """
+
+    __slots__ = ('content', '__typed_decoder', '__decoded')
+
+    def __init__(self, content: Union[bytes, str], typed_decoder):
+        """
+        :param content: <bytes> the raw body
+        :param typed_decoder: <TypedDecoder>
+        """
+        super().__init__()
+        self.content = content
+        self.__typed_decoder = typed_decoder
+        self.__decoded = None
+
+    def deserialize(self, data_type, identity_map: IdentityMap = None):
+        """
+        Build the models of the body in one typed pass
+        :param data_type: <class> User, Transaction or Payment
+        :param identity_map: <IdentityMap> [optional]
+        :return: a single model, a <Page> of models, or NotImplemented when there is no typed schema for the
+        data type (or the body does not match it)
+        """
+        return self.__typed_decoder.deserialize(self.content, data_type, identity_map=identity_map)
+
+    def to_dict(self) -> dict:
+        if self.__decoded is None:
+            try:
+                self.__decoded = self.__typed_decoder.decode(self.content) or {}
+            except ValueError:
+                self.__decoded = {}
+        return self.__decoded
+
+    def __getitem__(self, key):
+        return self.to_dict()[key]
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return len(self.to_dict())
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class TypedDecoder(JsonDecoder):
+    """
+    JsonDecoder that decodes the users, transactions and payments straight from the response bytes into typed
+    msgspec structs, in one pass, and builds the models from them (Model.from_struct) instead of going through
+    the JSONSchema parsers. The other bodies are decoded like JsonDecoder does. Requires msgspec
+    (pip3 install venmo-api[msgspec]).
+
+    The models it builds do NOT keep their raw JSON: to_json() rebuilds a dict from their attributes, which is
+    not the Venmo JSON and can't be read back with from_json. LocalStore stores them from their fields (and
+    their comments in a table of their own). The apis called with lazy=True skip it, as lazy models parse the
+    raw JSON. Use JsonDecoder when you need the raw JSON.
+    """
+
+    def __init__(self, backend: str = 'auto', decode=None, data_types=(User, Transaction, Payment)):
+        """
+        :param backend: <str> The backend of the untyped bodies, see JsonDecoder.
+        :param decode: <function> [optional] The decoder of the untyped bodies, see JsonDecoder.
+        :param data_types: <tuple> The models decoded in the typed pass, among User, Transaction and Payment. The
+        others go through from_json. Compare both paths on your payloads with benchmarks/run_benchmarks.py.
+        """
+        if msgspec is None:
+            raise ImportError("TypedDecoder requires msgspec. Install it with: pip3 install venmo-api[msgspec]")
+        super().__init__(backend=backend, decode=decode)
+
+        schemas = {User: typed_schema.UserStruct,
+                   Transaction: typed_schema.StoryStruct,
+                   Payment: typed_schema.PaymentStruct}
+        unknown = [data_type for data_type in data_types if data_type not in schemas]
+        if unknown:
+            raise ValueError(f"No typed schema for {', '.join(data_type.__name__ for data_type in unknown)}.")
+        self.schemas = {data_type: schemas[data_type] for data_type in data_types}
+        self.__decoders = {}
+        self.__lock = threading.Lock()
+
+    def decode_body(self, content: Union[bytes, str]):
+        """
+        :param content: <bytes> or <str>
+        :return: <LazyBody> decoded on demand
+        """
+        return LazyBody(content, self) if content else {}
+
+    def deserialize(self, content: Union[bytes, str], data_type, identity_map: IdentityMap = None):
+        """
+        Decode a response body straight into models
+        :param content: <bytes> or <str> the raw body
+        :param data_type: <class> User, Transaction or Payment
+        :param identity_map: <IdentityMap> [optional] Defaults to a new map, shared by the models of this body.
+        :return: a single model, a <Page> of models, or NotImplemented when there is no typed schema for the
+        data type (or the body does not match it)
+        """
+        decoder = self.__get_decoder(data_type)
+        if decoder is None:
+            return NotImplemented
+
+        try:
+            data = decoder.decode(content).data
+        except msgspec.DecodeError:
+            # Including the validation errors: an unexpected shape goes through from_json instead
+            return NotImplemented
+
+        if identity_map is None:
+            identity_map = IdentityMap()
+
+        if not isinstance(data, list):
+            return data_type.from_struct(data, identity_map=identity_map)
+
+        result = Page()
+        for struct in data:
+            model = data_type.from_struct(struct, identity_map=identity_map)
+            if model:
+                result.append(model)
+        return result
+
+    def __get_decoder(self, data_type):
+        """
+        The compiled msgspec decoder of the bodies of [data_type], built the first time
+        :return: <msgspec.json.Decoder> or <NoneType>
+        """
+        decoder = self.__decoders.get(data_type)
+        if decoder is None and data_type in self.schemas:
+            with self.__lock:
+                decoder = self.__decoders.get(data_type)
+                if decoder is None:
+                    envelope = typed_schema.get_envelope(self.schemas[data_type])
+                    decoder = self.__decoders[data_type] = msgspec.json.Decoder(envelope)
+        return decoder
+
+    def __repr__(self):
+        return f"TypedDecoder(backend={self.backend!r})"
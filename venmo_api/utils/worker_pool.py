@@ -0,0 +1,59 @@
+from venmo_api import WorkerPoolFullError
+from concurrent.futures import ThreadPoolExecutor, Future
+import logging
+import threading
+
+
+class WorkerPool(object):
+    """
+    A fixed number of worker threads with a bounded queue of pending calls.
+    Once the queue is full, submit() blocks (backpressure) or raises WorkerPoolFullError.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, block: bool = True, timeout: float = None):
+        """
+        :param max_workers: <int> Number of worker threads.
+        :param max_pending: <int> Number of calls that can wait in the queue for a free worker.
+        :param block: <bool> Wait for room in the queue when it is full, instead of raising WorkerPoolFullError.
+        :param timeout: <float> [optional] Max seconds to wait for room in the queue, if block is True.
+        """
+        super().__init__()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.block = block
+        self.timeout = timeout
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='venmo-api')
+        self.__slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Schedule fn(*args, **kwargs) on a worker thread.
+        :return: <Future> resolves to the return value of fn
+        """
+        if not self.__slots.acquire(blocking=self.block, timeout=self.timeout if self.block else None):
+            raise WorkerPoolFullError(max_pending=self.max_pending)
+
+        try:
+            future = self.__executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self.__slots.release()
+            raise
+
+        future.add_done_callback(self.__on_done)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting new calls and release the worker threads.
+        :param wait: <bool> Wait for the pending calls to finish.
+        :return:
+        """
+        self.__executor.shutdown(wait=wait)
+
+    def __on_done(self, future: Future):
+        self.__slots.release()
+
+        # Don't let a failed callback go unnoticed, threads used to print their traceback
+        if not future.cancelled() and future.exception():
+            logging.error("An async Venmo API call failed.", exc_info=future.exception())
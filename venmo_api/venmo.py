@@ -1,20 +1,40 @@
-from venmo_api import ApiClient, UserApi, PaymentApi, AuthenticationApi, validate_access_token
+from venmo_api import ApiClient, UserApi, PaymentApi, AuthenticationApi, PoolConfig, UserCache, RateLimiter, \
+    RetryPolicy, IdentityMap, HttpCache, MetricsCollector, JsonDecoder, validate_access_token
 
 
 class Client(object):
 
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, pool_config: PoolConfig = None, user_cache: UserCache = None,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None,
+                 identity_map: IdentityMap = None, lazy: bool = False, http_cache: HttpCache = None,
+                 metrics: MetricsCollector = None, json_decoder: JsonDecoder = None, keep_json: bool = True):
         """
         VenmoAPI Client
         :param access_token: <str> Need access_token to work with the API.
+        :param pool_config: <PoolConfig> [optional] Connection pool size, timeouts and keep-alive settings.
+        :param user_cache: <UserCache> [optional] Cache for the user lookups.
+        :param rate_limiter: <RateLimiter> [optional] Shared by all the requests of this client.
+        :param retry_policy: <RetryPolicy> [optional] When to retry throttled or failed requests.
+        :param identity_map: <IdentityMap> [optional] Share one User object per user id across all the calls.
+        :param lazy: <bool> Return lazy models, that parse each field on its first access.
+        :param http_cache: <HttpCache> [optional] Cache for the GET responses, revalidated with ETag/Last-Modified.
+        :param metrics: <MetricsCollector> [optional] Collects the timings, sizes and status codes of the requests.
+        :param json_decoder: <JsonDecoder> [optional] Decodes the response bodies (orjson when installed).
+        :param keep_json: <bool> Keep the raw JSON of each model. Pass False to save memory on long histories.
         """
         super().__init__()
         self.__access_token = validate_access_token(access_token=access_token)
-        self.__api_client = ApiClient(access_token=access_token)
-        self.user = UserApi(self.__api_client)
+        self.__api_client = ApiClient(access_token=access_token, pool_config=pool_config,
+                                      rate_limiter=rate_limiter, retry_policy=retry_policy, http_cache=http_cache,
+                                      metrics=metrics, json_decoder=json_decoder)
+        self.user = UserApi(self.__api_client, user_cache=user_cache, identity_map=identity_map, lazy=lazy,
+                            keep_json=keep_json)
         self.__profile = self.user.get_my_profile()
         self.payment = PaymentApi(profile=self.__profile,
-                                  api_client=self.__api_client)
+                                  api_client=self.__api_client,
+                                  identity_map=identity_map,
+                                  lazy=lazy,
+                                  keep_json=keep_json)
 
     def my_profile(self, force_update=False):
         """
@@ -26,6 +46,21 @@ class Client(object):
 
         return self.__profile
 
+    def configure_pool(self, pool_config: PoolConfig):
+        """
+        Rebuild the connection pool with the new settings.
+        :param pool_config: <PoolConfig>
+        :return:
+        """
+        self.__api_client.configure_pool(pool_config=pool_config)
+
+    def get_pool_stats(self) -> dict:
+        """
+        Get the number of requests, new connections and reused connections of the connection pool.
+        :return: <dict>
+        """
+        return self.__api_client.get_pool_stats()
+
     @staticmethod
     def get_access_token(username: str, password: str, device_id: str = None) -> str:
         """